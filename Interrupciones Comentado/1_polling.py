@@ -1,8 +1,11 @@
 import gpiod  # Importa la biblioteca gpiod para interactuar con los pines GPIO del sistema
-import time  # Importa la biblioteca time para gestionar retardos
+
+from polling import AdaptivePoller  # Motor de polling con vencimientos absolutos y retroceso en reposo
 
 # Definición de la propiedad que representa el pin donde está conectado el botón
 BUTTON_PIN = 17  # El pin GPIO 17 se utilizará para detectar el estado del botón
+POLL_RATE = 100  # Frecuencia objetivo de muestreo (Hz) mientras el botón está activo
+IDLE_RATE = 10  # Frecuencia mínima (Hz) a la que se retrocede cuando el botón está en reposo
 
 # Crea un objeto `chip` que representa el chip de control GPIO
 # En términos de POO, este objeto es la instancia de la clase `Chip`, que interactúa con el hardware
@@ -16,24 +19,23 @@ button_line = chip.get_line(BUTTON_PIN)  # Obtiene la línea GPIO del pin 17
 # El método `request()` actúa como un constructor que establece la dirección de la línea (entrada)
 button_line.request(consumer='Button', type=gpiod.LINE_REQ_DIR_IN)  # Configura el pin 17 como entrada
 
-# Define una propiedad `pressed` que actúa como un estado booleano para saber si el botón ha sido presionado
-pressed = False  # Inicializa el estado del botón como no presionado
+# Callback que se llama solo cuando el valor de la línea cambia
+def button_changed(value, timestamp_ns):
+    if value:  # Si el valor del pin es 1 (botón presionado)
+        print("Botón presionado")  # Imprime un mensaje indicando que el botón fue presionado
+    else:  # Si el valor del pin es 0 (botón no presionado)
+        print("Botón liberado")  # Imprime un mensaje indicando que el botón fue liberado
+
+# Crea el motor de polling; el método `get_value()` actúa como método de acceso al valor de la línea GPIO
+poller = AdaptivePoller(button_line.get_value, button_changed, rate_hz=POLL_RATE, min_rate_hz=IDLE_RATE)
 
-# Bucle que verifica el estado del botón continuamente
+# Bucle que verifica el estado del botón a la frecuencia objetivo, sin deriva y avisando solo de los cambios
 try:
-    while True:
-        # Método `get_value()` que actúa como un método de acceso para verificar el valor de la línea GPIO
-        if button_line.get_value():  # Si el valor del pin es 1 (botón presionado)
-            if not pressed:  # Verifica si el botón no ha sido registrado como presionado aún
-                print(f"Botón presionado")  # Imprime un mensaje indicando que el botón fue presionado
-                pressed = True  # Actualiza el estado de `pressed` a verdadero
-        else:  # Si el valor del pin es 0 (botón no presionado)
-            print("Botón liberado")  # Imprime un mensaje indicando que el botón fue liberado
-            pressed = False  # Actualiza el estado de `pressed` a falso
-        time.sleep(0.1)  # Pausa de 100 milisegundos para reducir la frecuencia de lectura
+    poller.run()
 except KeyboardInterrupt:
     # Captura la interrupción por teclado (CTRL + C) para finalizar el programa
     print("Programa terminado")
+    print(poller.stats())  # Muestra frecuencia lograda, jitter y coste de CPU para compararlo con los eventos
 finally:
     # Libera los recursos de la línea GPIO y cierra el chip, como si fueran destructores en POO
     button_line.release()  # Libera la línea GPIO del botón
@@ -1,49 +1,77 @@
-import gpiod  # Importa la biblioteca gpiod para interactuar con los pines GPIO del sistema
-import signal  # Importa la biblioteca signal para manejar señales del sistema, como CTRL+C
-import sys  # Importa la biblioteca sys para manejar la terminación del programa
+import signal  # Importa la biblioteca signal para esperar señales sin consumir CPU
+
+from async_log import AsyncLog  # Registro por lotes en un hilo aparte, sin print() en el camino caliente
+from dispatcher import ThreadedDispatcher  # Hilo lector dedicado y trabajadores para los callbacks
+from edge_recorder import EdgeRecorder, RecordingReader  # Grabación de los flancos en un fichero binario rotado
+from line_group import INPUT  # Dirección de las líneas
+from line_manager import LineManager, exit_on_signals  # Dueño del chip y de las líneas, con limpieza garantizada
+from metrics import InstrumentedReader, Registry, instrument, serve_http  # Contadores, histogramas y endpoint de métricas
 
 # Define la propiedad que representa el pin donde está conectado el botón
 BUTTON_PIN = 17  # El pin GPIO 17 se utilizará para detectar eventos en el botón
+METRICS_PORT = 9100  # Puerto local en el que se exportan las métricas
+# Hilos trabajadores que ejecutan los callbacks. Con un solo botón el reparto por línea usa un único
+# trabajador; con más de uno, el callback se ejecuta en varios hilos a la vez y `log` (un solo productor)
+# necesita un cerrojo, ver `ThreadedDispatcher`
+WORKERS = 1
+READER_CPU = None  # CPU a la que se fija el hilo lector (None = sin fijar)
+READER_PRIORITY = None  # Prioridad SCHED_FIFO del hilo lector (None = normal; requiere CAP_SYS_NICE)
+RECORD_FILE = None  # Fichero donde se graban los flancos para reproducirlos después (None = sin grabar)
+
+# Crea el gestor de líneas, dueño del chip y de todas las peticiones del programa
+# En POO, este objeto actúa como el destructor de todos los recursos: al salir del bloque `with` (por
+# CTRL+C, SIGTERM o una excepción) detiene el despachador, cierra la grabación, libera las líneas,
+# cierra el chip y vuelca el registro
+lines = LineManager(consumer='Button')
+
+# Solicita la línea del botón como entrada con interrupciones por flanco de subida
+# El gestor abre el chip GPIO 4 la primera vez y crea el lector que vacía la cola del kernel en cada despertar
+button = lines.request('gpiochip4', BUTTON_PIN, INPUT, edge='rising')
 
-# Crea un objeto `chip` que representa el chip de control GPIO
-# En términos de POO, este objeto es una instancia de la clase `Chip`, que interactúa con el hardware GPIO
-chip = gpiod.Chip('gpiochip4')  # Inicializa el chip GPIO correspondiente (gpiochip4)
+# Crea el registro asíncrono: los callbacks solo anotan en un buffer y un hilo aparte escribe por lotes
+# Las limpiezas se ejecutan en orden inverso al de registro: el registro se vuelca el último
+log = AsyncLog()
+lines.callback(log.close)
 
-# Crea un objeto `button_line` que representa la línea GPIO correspondiente al pin del botón
-# Este objeto encapsula la lógica de la línea GPIO para el botón
-button_line = chip.get_line(BUTTON_PIN)  # Obtiene la línea GPIO del pin 17
+# Crea el registro de métricas y lo exporta en http://127.0.0.1:METRICS_PORT/ en formato Prometheus
+registry = Registry()
+serve_http(registry, METRICS_PORT)
 
-# Solicita acceso a la línea GPIO para manejar interrupciones por flanco de subida
-# En POO, este método actúa como un constructor que inicializa la línea GPIO para reaccionar a eventos
-button_line.request(consumer='Button', type=gpiod.LINE_REQ_EV_RISING_EDGE)
+# Envuelve el lector de eventos del botón para registrar eventos, tamaño de lote, latencia desde el flanco
+# y descartes
+button_reader = InstrumentedReader(button.reader, registry)
 
-# Función de manejo de señales (como CTRL+C) para liberar recursos de forma segura
-# En POO, esta función actúa como un destructor que asegura la limpieza de recursos antes de terminar el programa
-def signal_handler(sig, frame):
-    button_line.release()  # Libera la línea GPIO asociada al botón
-    chip.close()  # Cierra el chip GPIO, liberando los recursos asociados
-    sys.exit(0)  # Finaliza el programa de manera controlada
+# Si se indica `RECORD_FILE`, cada lote se graba antes de despacharlo (ver `edge_recorder.py replay`)
+recorder = None
+if RECORD_FILE is not None:
+    recorder = EdgeRecorder(RECORD_FILE)
+    lines.callback(recorder.close)  # Recorta el fichero de grabación a los flancos escritos
+    button_reader = RecordingReader(button_reader, recorder)
 
 # Callback que se llama cuando se detecta que el botón ha sido presionado
 # Esta función es equivalente a un método que reacciona a eventos específicos (presión del botón)
-def button_pressed_callback():
-    print("button pressed!")  # Imprime un mensaje cuando el botón es presionado
+# Recibe el lote de flancos leídos en un mismo despertar; cada uno es una pulsación
+# Se ejecuta en un hilo trabajador, así que puede tardar sin retrasar la lectura del siguiente flanco
+def button_pressed_callback(events):
+    for event in events:
+        log.event(event, "button pressed!")  # Anota un mensaje cuando el botón es presionado
+
+# Envuelve el callback para medir su tiempo de ejecución
+button_pressed_callback = instrument(registry, 'button_pressed_callback', button_pressed_callback)
+
+# Crea el despachador: un hilo lector dedicado espera los eventos, vacía la cola del kernel y los pasa
+# por una cola preasignada a los trabajadores, que son quienes ejecutan el callback
+# Si el callback lanza una excepción, el error se anota en el registro y el trabajador sigue atendiendo
+dispatcher = ThreadedDispatcher(button_reader, button_pressed_callback, workers=WORKERS,
+                                cpu=READER_CPU, priority=READER_PRIORITY,
+                                on_error=lambda error, batch: log.log("callback error: {}", value=repr(error)))
+dispatcher.start()
+lines.callback(dispatcher.stop)  # Lo primero al cerrar: detiene el hilo lector y termina lo pendiente
 
-# Asocia el manejador de la señal SIGINT (CTRL+C) con la función `signal_handler`
-signal.signal(signal.SIGINT, signal_handler)
+# CTRL+C o SIGTERM terminan el programa saliendo por el bloque `with`, que libera los recursos
+exit_on_signals()
 
-# Bucle principal que espera eventos de presión del botón
-try:
+# El hilo principal solo espera señales; los eventos se atienden en los hilos del despachador
+with lines:
     while True:
-        # Método `event_wait()` espera un evento (presión del botón) durante 1 segundo
-        # Este método actúa como un observador, esperando que ocurra una interacción
-        event = button_line.event_wait(sec=1)
-        
-        if event:  # Si se detecta un evento (presión del botón)
-            button_pressed_callback()  # Llama al callback para manejar el evento
-        else:
-            print("Esperando")  # Imprime un mensaje indicando que sigue esperando eventos
-
-# Captura la excepción KeyboardInterrupt (cuando se presiona CTRL+C) y llama al manejador de señales
-except KeyboardInterrupt:
-    signal_handler(None, None)  # Invoca el manejador de la señal para liberar los recursos
+        signal.pause()  # Espera hasta que llegue una señal (por ejemplo CTRL+C)
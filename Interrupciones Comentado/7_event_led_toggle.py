@@ -1,42 +1,47 @@
-import gpiod  # Importa la biblioteca para interactuar con los pines GPIO del sistema
-import signal  # Importa la biblioteca para manejar señales del sistema, como CTRL+C
-import sys  # Importa la biblioteca sys para manejar la terminación del programa
-import time  # Importa la biblioteca time para manejar el tiempo y retardos
+from async_log import AsyncLog  # Registro por lotes en un hilo aparte, sin print() en el camino caliente
+from debounce import DebouncedInput  # Entrada con debounce en el kernel o, si no se admite, por software
+from edge_timing import is_press  # Clasifica el flanco con el tipo que trae el propio evento
+from line_group import OUTPUT  # Dirección de las líneas
+from line_manager import LineManager, exit_on_signals  # Dueño del chip y de las líneas, con limpieza garantizada
+from metrics import InstrumentedReader, Registry, instrument, serve_http  # Contadores, histogramas y endpoint de métricas
 
 # Definición de propiedades que representan los pines GPIO y el tiempo de debounce
 BUTTON_PIN = 17  # El pin GPIO 17 se utilizará para detectar eventos en el botón
 LED_PIN = 18  # El pin GPIO 18 se utilizará para controlar el LED
+METRICS_PORT = 9100  # Puerto local en el que se exportan las métricas
 DEBOUNCE_TIME = 0.2  # Tiempo de debounce para evitar múltiples detecciones rápidas de la pulsación
 
-# Crea un objeto `chip` que representa el chip de control GPIO
-# En POO, este objeto es una instancia de la clase `Chip`, que interactúa con el hardware GPIO
-chip = gpiod.Chip('gpiochip4')  # Inicializa el chip GPIO 4, que controla tanto el botón como el LED
+# Crea el gestor de líneas, dueño del chip y de todas las peticiones del programa
+# En POO, este objeto actúa como el destructor de todos los recursos: al salir del bloque `with` (por
+# CTRL+C, SIGTERM o una excepción) libera las líneas, cierra el chip y vuelca el registro
+lines = LineManager(consumer='LED-Toggle')
 
-# Crea un objeto `button_line` que representa la línea GPIO correspondiente al pin del botón
-# Este objeto encapsula la lógica de la línea GPIO para el botón
-button_line = chip.get_line(BUTTON_PIN)  # Obtiene la línea GPIO del pin 17
+# Solicita la línea del LED como salida, inicialmente apagada; el gestor abre el chip GPIO 4 la primera vez
+led_line = lines.request('gpiochip4', LED_PIN, OUTPUT)
 
-# Crea un objeto `led_line` que representa la línea GPIO correspondiente al pin del LED
-# En POO, este objeto encapsula la lógica para controlar el LED a través de GPIO
-led_line = chip.get_line(LED_PIN)  # Obtiene la línea GPIO del pin 18
+# Crea el registro asíncrono: los callbacks solo anotan en un buffer y un hilo aparte escribe por lotes
+# Las limpiezas se ejecutan en orden inverso al de registro: el registro se vuelca el último
+log = AsyncLog()
+lines.callback(log.close)
 
-# Solicita acceso a la línea GPIO del botón para manejar interrupciones por flanco de subida
-button_line.request(consumer='Button', type=gpiod.LINE_REQ_EV_RISING_EDGE)
+# Crea un objeto `button_input` que representa la entrada del botón con debounce
+# Si el kernel admite `debounce_period` el rebote de los contactos se filtra antes de despertar al proceso;
+# si no, se descarta por software. DEBOUNCE_TIME es el intervalo mínimo entre pulsaciones, y se comprueba
+# siempre por software comparando las marcas de tiempo de los flancos
+button_input = DebouncedInput(lines.chip('gpiochip4'), BUTTON_PIN, DEBOUNCE_TIME)
+lines.callback(button_input.release)  # La entrada con debounce pide su propia línea: se libera al cerrar
+# Al cerrar se muestran despertares, rebotes suprimidos y CPU del modo de debounce usado
+lines.callback(lambda: print(button_input.stats()))
 
-# Solicita acceso a la línea GPIO del LED y lo configura como salida
-led_line.request(consumer='LED', type=gpiod.LINE_REQ_DIR_OUT)
+# Crea el registro de métricas y lo exporta en http://127.0.0.1:METRICS_PORT/ en formato Prometheus
+registry = Registry()
+serve_http(registry, METRICS_PORT)
 
-# Variables para almacenar el último estado del LED y el tiempo de la última pulsación del botón
-last_LED_state = 0  # Estado inicial del LED (apagado)
-last_press_time = 0  # Almacena el tiempo de la última pulsación del botón
+# Envuelve la entrada para registrar eventos, latencia desde el flanco, descartes y rebotes rechazados
+button_input = InstrumentedReader(button_input, registry)
 
-# Función de manejo de señales (como CTRL+C) para liberar recursos de forma segura
-# En POO, esta función actúa como un destructor que asegura la limpieza de recursos antes de terminar el programa
-def signal_handler(sig, frame):
-    button_line.release()  # Libera la línea GPIO asociada al botón
-    led_line.release()  # Libera la línea GPIO asociada al LED
-    chip.close()  # Cierra el chip GPIO, liberando los recursos asociados
-    sys.exit(0)  # Finaliza el programa de manera controlada
+# Variable para almacenar el último estado del LED
+last_LED_state = 0  # Estado inicial del LED (apagado)
 
 # Función para alternar el estado del LED (encender o apagar)
 # En POO, esta función actúa como un método que controla el comportamiento del LED
@@ -45,26 +50,20 @@ def toggle_led():
     new_state = not last_LED_state  # Invierte el estado actual del LED
     led_line.set_value(new_state)  # Cambia el valor del LED en el pin GPIO (ON/OFF)
     last_LED_state = new_state  # Actualiza el estado del LED
-    print(f"LED state changed to: {'ON' if new_state else 'OFF'}")  # Imprime el estado del LED
+    log.log("LED state changed to: ON" if new_state else "LED state changed to: OFF")  # Anota el estado del LED
 
-# Configura el manejador de señales SIGINT (CTRL+C) con la función `signal_handler`
-signal.signal(signal.SIGINT, signal_handler)
+# Envuelve el callback para medir su tiempo de ejecución
+toggle_led = instrument(registry, 'toggle_led', toggle_led)
+
+# CTRL+C o SIGTERM terminan el programa saliendo por el bloque `with`, que libera los recursos
+exit_on_signals()
 
 # Bucle principal que espera eventos de presión del botón con lógica de debounce
-try:
+with lines:
     while True:
         # Espera un evento en el botón
-        event = button_line.event_wait()
-        
-        if event:  # Si se detecta un evento (presión del botón)
-            current_time = time.time()  # Obtiene el tiempo actual
-            # Comprueba si ha pasado más tiempo que el definido por DEBOUNCE_TIME desde la última pulsación
-            if current_time - last_press_time > DEBOUNCE_TIME:
-                time.sleep(0.05)  # Introduce una pequeña espera para mayor estabilidad en la lectura
-                if button_line.get_value() == 1:  # Verifica si el botón está presionado
+        if button_input.wait():  # Si se detecta un evento (presión del botón)
+            # Vacía la cola y recorre solo los flancos que no son rebotes
+            for event in button_input.read_batch():
+                if is_press(event):  # Cada pulsación válida alterna el LED
                     toggle_led()  # Cambia el estado del LED
-                    last_press_time = current_time  # Actualiza el tiempo de la última pulsación
-
-# Captura la excepción KeyboardInterrupt (cuando se presiona CTRL+C) y llama al manejador de señales
-except KeyboardInterrupt:
-    signal_handler(None, None)  # Invoca el manejador de la señal para liberar los recursos
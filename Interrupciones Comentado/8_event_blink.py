@@ -1,80 +1,84 @@
 #!/usr/bin/env python3
 
-import gpiod  # Biblioteca para interactuar con los pines GPIO
-import signal  # Biblioteca para manejar señales del sistema, como CTRL+C
-import sys  # Biblioteca para manejar la terminación del programa
-import time  # Biblioteca para manejar el tiempo y retardos
+from async_log import AsyncLog  # Registro por lotes en un hilo aparte, sin print() en el camino caliente
+from debounce import DebouncedInput  # Entrada con debounce en el kernel o, si no se admite, por software
+from edge_timing import NS_PER_MS, PressTracker  # Seguimiento de pulsaciones con los tiempos del kernel
+from line_group import OUTPUT  # Dirección de las líneas
+from line_manager import LineManager, exit_on_signals  # Dueño del chip y de las líneas, con limpieza garantizada
+from metrics import InstrumentedReader, Registry, instrument, serve_http  # Contadores, histogramas y endpoint de métricas
+from output_scheduler import OutputScheduler  # Programador de salidas por vencimientos, sin esperas bloqueantes
 
 # Definición de los pines y el tiempo de debounce
 BUTTON_PIN = 17  # El pin GPIO 17 se utiliza para detectar eventos en el botón
 LED_PIN = 18  # El pin GPIO 18 se utiliza para controlar el LED
+METRICS_PORT = 9100  # Puerto local en el que se exportan las métricas
 DEBOUNCE_TIME = 0.2  # Tiempo de debounce para evitar múltiples detecciones de pulsación
+BLINK_TIME = 0.5  # Tiempo que el LED permanece encendido y apagado en cada ciclo de parpadeo
 should_blink = False  # Variable para determinar si el LED debe parpadear
 
-# Crea el objeto `chip` para interactuar con el GPIO
-chip = gpiod.Chip('gpiochip4')  # Inicializa el chip GPIO correspondiente
-
-# Crea objetos `button_line` y `led_line` que representan los pines del botón y del LED
-button_line = chip.get_line(BUTTON_PIN)  # Línea GPIO para el botón
-led_line = chip.get_line(LED_PIN)  # Línea GPIO para el LED
-
-# Solicita acceso a la línea del botón con detección de eventos en ambos flancos (subida y bajada)
-button_line.request(consumer='Button', type=gpiod.LINE_REQ_EV_BOTH_EDGES)
-
-# Solicita acceso a la línea del LED y la configura como salida
-led_line.request(consumer='LED', type=gpiod.LINE_REQ_DIR_OUT)
-
-# Variables para controlar el tiempo de la última pulsación y el estado del botón
-last_press_time = 0  # Tiempo de la última vez que el botón fue presionado
-button_pressed = False  # Estado actual del botón (presionado o no)
-
-# Función para manejar señales (como CTRL+C) y liberar recursos de forma segura
-# Actúa como un destructor en POO para garantizar que los recursos se limpien al finalizar
-def signal_handler(sig, frame):
-    button_line.release()  # Libera la línea GPIO del botón
-    led_line.release()  # Libera la línea GPIO del LED
-    chip.close()  # Cierra el chip GPIO, liberando recursos
-    sys.exit(0)  # Finaliza el programa de manera controlada
-
-# Función callback que se llama cada vez que se detecta un cambio en el estado del botón
-def button_callback():
-    global should_blink, last_press_time, button_pressed
-    current_time = time.time()  # Obtiene el tiempo actual
-    
-    # Detecta si el botón ha sido presionado (flanco de subida) y si no está presionado actualmente
-    if button_line.get_value() == 1 and not button_pressed:
-        # Verifica si ha pasado suficiente tiempo desde la última pulsación (debounce)
-        if current_time - last_press_time > DEBOUNCE_TIME:
-            # Alterna el estado de `should_blink` para habilitar/deshabilitar el parpadeo del LED
-            should_blink = not should_blink
-            print(f"Blinking {'enabled' if should_blink else 'disabled'}")  # Muestra el estado actual
-            last_press_time = current_time  # Actualiza el tiempo de la última pulsación
-            button_pressed = True  # Marca el botón como presionado
-    # Detecta si el botón ha sido liberado (flanco de bajada)
-    elif button_line.get_value() == 0 and button_pressed:
-        button_pressed = False  # Marca el botón como no presionado
-
-# Asocia el manejador de señales SIGINT (CTRL+C) con la función `signal_handler`
-signal.signal(signal.SIGINT, signal_handler)
+# Crea el gestor de líneas, dueño del chip y de todas las peticiones del programa
+# Actúa como un destructor en POO: al salir del bloque `with` (por CTRL+C, SIGTERM o una excepción)
+# libera las líneas, cierra el chip y vuelca el registro
+lines = LineManager(consumer='LED-Blink')
+
+# Crea el registro asíncrono: los callbacks solo anotan en un buffer y un hilo aparte escribe por lotes
+# Las limpiezas se ejecutan en orden inverso al de registro: el registro se vuelca el último
+log = AsyncLog()
+lines.callback(log.close)
+
+# Crea la entrada del botón con debounce y detección de eventos en ambos flancos (subida y bajada)
+# El rebote de los contactos lo filtra el kernel si lo admite; si no, y el intervalo mínimo entre
+# pulsaciones (DEBOUNCE_TIME), se comprueban por software con las marcas de tiempo
+button_input = DebouncedInput(lines.chip('gpiochip4'), BUTTON_PIN, DEBOUNCE_TIME)
+lines.callback(button_input.release)  # La entrada con debounce pide su propia línea: se libera al cerrar
+
+# Crea el registro de métricas y lo exporta en http://127.0.0.1:METRICS_PORT/ en formato Prometheus
+registry = Registry()
+serve_http(registry, METRICS_PORT)
+
+# Envuelve la entrada para registrar eventos, latencia desde el flanco, descartes y rebotes rechazados
+button_input = InstrumentedReader(button_input, registry)
+
+# Solicita la línea del LED como salida, inicialmente apagada
+led_line = lines.request('gpiochip4', LED_PIN, OUTPUT)
+
+# Crea el programador de salidas que controla el parpadeo del LED sin bloquear el bucle principal
+scheduler = OutputScheduler()
+
+# Función callback que se llama cuando un flanco de subida indica que el botón fue presionado
+# Los rebotes ya se filtraron antes de llegar aquí, así que cada llamada es una pulsación válida
+def button_callback(event, interval_ns):
+    global should_blink
+    # Alterna el estado de `should_blink` para habilitar/deshabilitar el parpadeo del LED
+    should_blink = not should_blink
+    if should_blink:
+        scheduler.blink(led_line, BLINK_TIME, BLINK_TIME)  # Programa el parpadeo a partir de este instante
+    else:
+        scheduler.stop(led_line, 0)  # Cancela el parpadeo y deja el LED apagado
+    log.event(event, "Blinking enabled" if should_blink else "Blinking disabled")  # Anota el estado actual
+
+# Función callback que se llama cuando un flanco de bajada indica que el botón fue liberado
+def button_release_callback(event, duration_ns):
+    # Duración exacta medida por el kernel; el texto se formatea en el hilo escritor
+    log.event(event, "Button held for {:.3f} ms", duration_ns / NS_PER_MS)
+
+# Envuelve el callback para medir su tiempo de ejecución
+button_callback = instrument(registry, 'button_callback', button_callback)
+
+# Crea el objeto que sigue el estado del botón a partir del tipo de cada flanco
+button_tracker = PressTracker(on_press=button_callback, on_release=button_release_callback)
+
+# CTRL+C o SIGTERM terminan el programa saliendo por el bloque `with`, que libera los recursos
+exit_on_signals()
 
 # Bucle principal que espera eventos de presión del botón y controla el parpadeo del LED
-try:
+with lines:
     while True:
-        # Espera un evento en el botón
-        event = button_line.event_wait()
-        
-        if event:  # Si se detecta un evento (cambio en el estado del botón)
-            button_callback()  # Llama a la función callback para manejar la pulsación del botón
-
-        # Si el parpadeo está habilitado, alterna el estado del LED
-        if should_bblink:
-            led_line.set_value(1)  # Enciende el LED
-            time.sleep(0.5)  # Espera 500 ms
-            led_line.set_value(0)  # Apaga el LED
-            time.sleep(0.5)  # Espera otros 500 ms
-        else:
-            time.sleep(0.1)  # Espera 100 ms cuando no hay parpadeo activo
-
-# Captura la excepción KeyboardInterrupt (cuando se presiona CTRL+C) y llama al manejador de señales
-except KeyboardInterrupt:
-    signal_handler(None, None)  # Invoca el manejador de la señal para liberar los recursos
+        # Espera un evento en el botón, como mucho hasta el próximo cambio programado del LED
+        # Así la pulsación se atiende en cuanto llega y el LED cambia justo en su instante
+        if button_input.wait(scheduler.timeout()):  # Si se detecta un evento (cambio en el estado del botón)
+            # Vacía la cola y entrega los flancos sin rebotes al seguidor, que llama a los callbacks
+            button_tracker.feed(button_input.read_batch())
+
+        # Aplica los cambios del LED cuyo instante ya llegó (encender o apagar en el parpadeo)
+        scheduler.run_due()
@@ -0,0 +1,62 @@
+import asyncio  # Importa asyncio para atender el botón y la red en un mismo hilo
+
+import gpiod  # Importa la biblioteca gpiod para interactuar con los pines GPIO del sistema
+
+from async_log import AsyncLog  # Registro por lotes en un hilo aparte, sin print() en el camino caliente
+from edge_timing import is_press  # Clasifica el flanco con el tipo que trae el propio evento
+from gpio_asyncio import AsyncLine  # Adaptador que registra el descriptor de la línea en asyncio
+
+# Definición de las propiedades que representan el pin del botón y el puerto del servidor
+BUTTON_PIN = 17  # El pin GPIO 17 se utilizará para detectar eventos en el botón
+STATUS_PORT = 8000  # Puerto TCP local (127.0.0.1) en el que se consulta el número de pulsaciones
+
+# Crea un objeto `chip` que representa el chip de control GPIO
+chip = gpiod.Chip('gpiochip4')  # Inicializa el chip GPIO correspondiente (gpiochip4)
+
+# Crea el objeto `button_line` y lo configura para detectar ambos flancos
+button_line = chip.get_line(BUTTON_PIN)  # Obtiene la línea GPIO del pin 17
+button_line.request(consumer='Button', type=gpiod.LINE_REQ_EV_BOTH_EDGES)
+
+# Crea el adaptador asíncrono de la línea del botón
+button = AsyncLine(button_line)
+
+# Crea el registro asíncrono: la corrutina solo anota en un buffer y un hilo aparte escribe por lotes,
+# así que escribir en la terminal no detiene el bucle de eventos que también atiende la red
+log = AsyncLog()
+
+presses = 0  # Número de pulsaciones detectadas
+
+
+# Corrutina que atiende los flancos del botón a medida que llegan
+async def watch_button():
+    global presses
+    async for event in button.events():
+        if is_press(event):  # Flanco de subida: el botón fue presionado
+            presses += 1
+            log.event(event, "button pressed!")  # Anota un mensaje indicando que el botón fue presionado
+
+
+# Corrutina que responde a cada conexión TCP con el número de pulsaciones
+async def handle_client(reader, writer):
+    writer.write(f"presses {presses}\n".encode())
+    await writer.drain()
+    writer.close()
+
+
+# Corrutina principal: el servidor TCP y el botón comparten el mismo bucle de eventos
+async def main():
+    server = await asyncio.start_server(handle_client, '127.0.0.1', STATUS_PORT)
+    async with server:
+        await watch_button()
+
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    # Maneja la interrupción por teclado (CTRL + C) para finalizar el programa de manera segura
+    log.log("Programa terminado")
+finally:
+    # Libera los recursos de la línea GPIO y cierra el chip, comportándose como un destructor en POO
+    button_line.release()  # Libera la línea GPIO del botón
+    chip.close()  # Cierra el chip GPIO, liberando los recursos asociados
+    log.close()  # Vuelca los mensajes pendientes y detiene el hilo escritor
@@ -0,0 +1,119 @@
+import sys  # Importa sys para escribir por defecto en la salida estándar
+import threading  # Importa threading para el hilo que formatea y escribe los registros
+import time  # Importa time para sellar los registros y medir las escrituras
+
+from event_reader import RISING_EDGE  # Tipo de flanco normalizado, para mostrarlo como texto
+
+DEFAULT_CAPACITY = 4096  # Registros que caben en el buffer circular
+FLUSH_INTERVAL = 0.05  # Segundos entre volcados del hilo escritor
+
+
+# Registro asíncrono por lotes para sustituir los print() de los callbacks
+# El bucle de eventos solo copia (marca de tiempo, línea, flanco, acción, valor) en un buffer circular
+# preasignado; un hilo aparte formatea los registros y los escribe de una vez cada `flush_interval`.
+# Productor y consumidor no comparten cerrojos: el productor solo avanza `_write_seq` y el escritor
+# solo avanza `_read_seq`. Si el escritor se retrasa más de `capacity` registros, los más antiguos se
+# sobrescriben (política drop-oldest) y se cuentan en `dropped`; el bucle de eventos nunca espera a la E/S.
+# Admite un solo productor: si varios hilos registran a la vez (por ejemplo, los trabajadores de un
+# `ThreadedDispatcher` con `workers > 1`), cada uno necesita su propio AsyncLog, o un cerrojo alrededor de `log()`
+class AsyncLog:
+    def __init__(self, stream=None, capacity=DEFAULT_CAPACITY, flush_interval=FLUSH_INTERVAL):
+        self.stream = stream if stream is not None else sys.stdout  # Destino de los registros
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        # Buffer circular preasignado como listas paralelas: no se crea un objeto por registro
+        self._timestamps = [0] * capacity
+        self._lines = [None] * capacity
+        self._edges = [None] * capacity
+        self._actions = [None] * capacity
+        self._values = [None] * capacity
+        self._write_seq = 0  # Registros escritos por el productor (solo lo modifica el bucle de eventos)
+        self._read_seq = 0  # Registros consumidos por el escritor (solo lo modifica el hilo escritor)
+        # Estadísticas de contrapresión
+        self.written = 0  # Registros escritos en el destino
+        self.dropped = 0  # Registros sobrescritos antes de escribirse
+        self.max_backlog = 0  # Mayor número de registros pendientes observado
+        self.flushes = 0  # Volcados realizados
+        self.write_time = 0.0  # Tiempo total pasado escribiendo en el destino (s)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='async-log', daemon=True)
+        self._thread.start()
+
+    # Añade un registro; es lo único que hace el camino caliente (sin formatear ni escribir)
+    # Si se indica `value`, `action` es una plantilla que el hilo escritor completa con `action.format(value)`
+    # (con una tupla, `action.format(*value)`); los textos variables van en `value`, nunca en la plantilla
+    def log(self, action, line=None, edge=None, timestamp_ns=None, value=None):
+        seq = self._write_seq
+        slot = seq % self.capacity
+        self._timestamps[slot] = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        self._lines[slot] = line
+        self._edges[slot] = edge
+        self._actions[slot] = action
+        self._values[slot] = value
+        self._write_seq = seq + 1
+
+    # Atajo para registrar un `EdgeEvent` con su propia marca de tiempo del kernel
+    def event(self, event, action, value=None):
+        self.log(action, event.line, event.edge, event.timestamp_ns, value)
+
+    # Formato de un registro; se ejecuta en el hilo escritor
+    @staticmethod
+    def format(timestamp_ns, line, edge, action, value):
+        if value is not None:
+            action = action.format(*value) if type(value) is tuple else action.format(value)
+        if line is None:
+            return f"{timestamp_ns / 1e9:.6f} {action}\n"
+        return f"{timestamp_ns / 1e9:.6f} line {line} {'rising' if edge == RISING_EDGE else 'falling'} {action}\n"
+
+    # Vuelca los registros pendientes en un único write(); devuelve cuántos escribió
+    def flush(self):
+        end = self._write_seq
+        start = self._read_seq
+        backlog = end - start
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        if end - start > self.capacity:  # Los más antiguos ya se sobrescribieron
+            self.dropped += end - start - self.capacity
+            start = end - self.capacity
+        capacity = self.capacity
+        chunks = []
+        for seq in range(start, end):
+            slot = seq % capacity
+            chunks.append(self.format(self._timestamps[slot], self._lines[slot],
+                                      self._edges[slot], self._actions[slot], self._values[slot]))
+        # Si el productor dio la vuelta mientras se formateaba, esos registros (y el que pueda estar
+        # escribiendo en ese momento) pueden estar mezclados con los nuevos
+        overrun = min(len(chunks), self._write_seq - capacity - start + 1)
+        if overrun > 0:
+            del chunks[:overrun]
+            self.dropped += overrun
+        self._read_seq = end
+        if chunks:
+            started = time.perf_counter()
+            self.stream.write(''.join(chunks))
+            self.stream.flush()
+            self.write_time += time.perf_counter() - started
+            self.written += len(chunks)
+            self.flushes += 1
+        return len(chunks)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    # Estadísticas de contrapresión
+    def stats(self):
+        return {
+            'pending': self._write_seq - self._read_seq,
+            'written': self.written,
+            'dropped': self.dropped,
+            'max_backlog': self.max_backlog,
+            'flushes': self.flushes,
+            'write_time_s': self.write_time,
+        }
+
+    # Detiene el hilo escritor y vuelca lo pendiente
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
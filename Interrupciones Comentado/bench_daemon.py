@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Benchmark: un proceso por pin frente a un único demonio para todos los pines
+# Para N pines (cada uno una entrada y una salida) arranca N procesos de `gpio_daemon.py` con un pin cada
+# uno, o un solo proceso con los N pines, y mide el tiempo hasta que todos están listos y la memoria total.
+# La memoria se da como RSS y como PSS (las páginas compartidas se reparten entre los procesos que las usan)
+#   --backend stub : simulador en proceso (gpio_stub), funciona en cualquier Linux
+#   --backend real : chip real o gpio-sim (los offsets deben estar libres en el chip)
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import json  # Importa json para escribir las configuraciones generadas
+import os  # Importa os para localizar el demonio y rutas temporales
+import signal  # Importa signal para detener los procesos medidos
+import subprocess  # Importa subprocess para lanzar los procesos medidos
+import sys  # Importa sys para usar el mismo intérprete
+import tempfile  # Importa tempfile para las configuraciones generadas
+import time  # Importa time para medir el tiempo de arranque
+
+DAEMON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gpio_daemon.py')
+
+# Con el simulador, el módulo gpiod se sustituye antes de ejecutar el demonio como script principal
+STUB_LAUNCHER = ("import runpy, sys, gpio_stub; gpio_stub.install(); sys.argv = sys.argv[1:]; "
+                 "runpy.run_path(sys.argv[0], run_name='__main__')")
+
+
+# Comando que arranca el demonio con la configuración `path`
+def daemon_command(backend, path):
+    if backend == 'stub':
+        return [sys.executable, '-c', STUB_LAUNCHER, DAEMON, path]
+    return [sys.executable, DAEMON, path]
+
+
+# Escribe una configuración con un pin `toggle` por cada par (entrada, salida)
+def write_config(directory, name, chip, pairs):
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, 'w', encoding='utf-8') as config_file:
+        json.dump({'pins': [{'chip': chip, 'input': input_offset, 'output': output_offset,
+                             'behaviour': 'toggle'} for input_offset, output_offset in pairs]}, config_file)
+    return path
+
+
+# Memoria de un proceso en KiB: (RSS, PSS); PSS es None si el kernel no ofrece smaps_rollup
+def memory_kib(pid):
+    rss = pss = None
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                if line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+# Lanza todos los procesos a la vez y espera a que cada uno escriba su línea de arranque
+# Devuelve (segundos hasta que el último está listo, RSS total, PSS total)
+def measure(commands):
+    start = time.perf_counter()
+    processes = [subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                  cwd=os.path.dirname(DAEMON))
+                 for command in commands]
+    try:
+        for process in processes:
+            if not process.stdout.readline():
+                raise RuntimeError(f"the daemon exited during startup: {process.stderr.read().strip()}")
+        elapsed = time.perf_counter() - start
+        memory = [memory_kib(process.pid) for process in processes]
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait()
+    rss = sum(rss for rss, _ in memory)
+    pss = None if any(pss is None for _, pss in memory) else sum(pss for _, pss in memory)
+    return elapsed, rss, pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Un proceso por pin frente a un único demonio')
+    parser.add_argument('--backend', choices=('stub', 'real'), default='stub', help='simulador en proceso o chip real')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO a usar')
+    parser.add_argument('--pins', default='1,2,4,8,16', help='número de pines a probar, separados por comas')
+    parser.add_argument('--first-offset', type=int, default=0,
+                        help='primer offset; las entradas y después las salidas usan offsets consecutivos')
+    args = parser.parse_args()
+
+    print(f"{'pines':>6}{'modo':>16}{'procesos':>10}{'arranque ms':>13}{'RSS MiB':>10}{'PSS MiB':>10}"
+          f"{'KiB/pin (PSS)':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (int(value) for value in args.pins.split(',') if value):
+            pairs = [(args.first_offset + index, args.first_offset + count + index) for index in range(count)]
+            per_pin = [write_config(directory, f"pin{index}", args.chip, [pair]) for index, pair in enumerate(pairs)]
+            single = write_config(directory, 'all', args.chip, pairs)
+            cases = (
+                ('proceso por pin', [daemon_command(args.backend, path) for path in per_pin]),
+                ('demonio único', [daemon_command(args.backend, single)]),
+            )
+            for name, commands in cases:
+                elapsed, rss, pss = measure(commands)
+                memory = pss if pss is not None else rss
+                print(f"{count:>6}{name:>16}{len(commands):>10}{elapsed * 1000:>13.1f}{rss / 1024:>10.1f}"
+                      f"{'-' if pss is None else f'{pss / 1024:.1f}':>10}{memory / count:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
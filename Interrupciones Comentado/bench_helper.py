@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Benchmark: conmutar un LED desde una invocación corta, en frío frente a través del proceso auxiliar
+#   frío        : un proceso nuevo importa gpiod, abre el chip, pide la línea, escribe y lo libera todo
+#   cliente     : un proceso nuevo (`python3 -S gpio_client.py toggle`) manda la orden al auxiliar
+#   en proceso  : solo la ida y vuelta por el socket, desde un proceso ya arrancado (límite inferior)
+#   --backend stub : simulador en proceso (gpio_stub), funciona en cualquier Linux
+#   --backend real : chip real o gpio-sim
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import os  # Importa os para localizar los scripts y el socket temporal
+import signal  # Importa signal para detener el auxiliar
+import subprocess  # Importa subprocess para lanzar las invocaciones medidas
+import sys  # Importa sys para usar el mismo intérprete
+import tempfile  # Importa tempfile para el directorio del socket
+import time  # Importa time para medir cada invocación
+
+from bench_daemon import STUB_LAUNCHER  # Ejecuta un script con gpio_stub instalado en lugar de gpiod
+from gpio_client import send  # Cliente mínimo del auxiliar
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+HELPER = os.path.join(DIRECTORY, 'gpio_helper.py')
+CLIENT = os.path.join(DIRECTORY, 'gpio_client.py')
+
+# Conmutación en frío con la API v1 de gpiod, como haría un script oneshot
+COLD_TOGGLE = ("{prefix}import gpiod; chip = gpiod.Chip({chip!r}); line = chip.get_line({offset}); "
+               "line.request(consumer='oneshot', type=gpiod.LINE_REQ_DIR_OUT); "
+               "line.set_value(1 - line.get_value()); line.release(); chip.close()")
+
+
+# Mediana y percentil 90 (ms) de una lista de duraciones en segundos
+def summary(durations):
+    durations = sorted(durations)
+    return (durations[len(durations) // 2] * 1000,
+            durations[min(len(durations) - 1, int(len(durations) * 0.9))] * 1000)
+
+
+# Ejecuta `command` `iterations` veces y devuelve la duración de cada ejecución
+def time_command(command, iterations, env=None):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, cwd=DIRECTORY, env=env)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Invocaciones cortas en frío frente al proceso auxiliar')
+    parser.add_argument('--backend', choices=('stub', 'real'), default='stub', help='simulador en proceso o chip real')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO a usar')
+    parser.add_argument('--offset', type=int, default=18, help='línea del LED')
+    parser.add_argument('--iterations', type=int, default=30, help='invocaciones por caso')
+    args = parser.parse_args()
+
+    prefix = "import gpio_stub; gpio_stub.install(); " if args.backend == 'stub' else ""
+    cold = [sys.executable, '-c', COLD_TOGGLE.format(prefix=prefix, chip=args.chip, offset=args.offset)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'helper.sock')
+        helper_args = [HELPER, '--socket', path, '--chip', args.chip]
+        if args.backend == 'stub':
+            command = [sys.executable, '-c', STUB_LAUNCHER, *helper_args]
+        else:
+            command = [sys.executable, *helper_args]
+        helper = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, cwd=DIRECTORY)
+        try:
+            helper.stdout.readline()  # Espera a que el auxiliar esté escuchando
+            send([f'toggle {args.offset}'], path)  # La primera orden pide la línea; no se mide
+            env = dict(os.environ, GPIO_HELPER_SOCKET=path)
+            client = [sys.executable, '-S', CLIENT, 'toggle', str(args.offset)]
+            in_process = []
+            for _ in range(args.iterations * 10):
+                start = time.perf_counter()
+                send([f'toggle {args.offset}'], path)
+                in_process.append(time.perf_counter() - start)
+            cases = (
+                ('frío', time_command(cold, args.iterations)),
+                ('cliente', time_command(client, args.iterations, env)),
+                ('en proceso', in_process),
+            )
+        finally:
+            helper.send_signal(signal.SIGTERM)
+            helper.wait()
+
+    print(f"{'caso':<14}{'mediana ms':>12}{'p90 ms':>10}")
+    for name, durations in cases:
+        median, p90 = summary(durations)
+        print(f"{name:<14}{median:>12.2f}{p90:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
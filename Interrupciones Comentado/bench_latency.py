@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# Benchmark de latencia y rendimiento de las estrategias de los ejemplos, sin necesidad de una Raspberry Pi
+# Un hilo inyecta trenes de flancos a una frecuencia controlada y cada estrategia mide la latencia
+# desde el flanco hasta su callback, los flancos perdidos y el tiempo de CPU por evento.
+#   --backend stub : simulador en proceso (gpio_stub), funciona en cualquier Linux
+#   --backend sim  : módulo del kernel gpio-sim; los flancos se generan escribiendo en
+#                    /sys/bus/gpio/devices/<chip>/sim_gpio<N>/pull y se leen con gpiod real
+# Estrategias: polling (1), blocking_read (2/3), event_wait (4-6), batched (EventReader), debounced (7/8)
+# y threaded (hilo lector + trabajadores); --callback-load simula un callback lento por despertar (en
+# blocking_read y event_wait, uno por flanco; en batched, uno por lote; en threaded, en los trabajadores)
+# y --burst agrupa los flancos en ráfagas (rebotes, encoders), donde vaciar la cola de una vez amortiza el
+# coste fijo de cada despertar. Para comparar event_wait y batched:
+#   python3 bench_latency.py --strategies event_wait,batched --rates 10000 --burst 8
+#   python3 bench_latency.py --strategies event_wait,batched --rates 2000,5000,10000 --callback-load 0.0002
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import sys  # Importa sys para ajustar el intervalo de cambio de hilo del intérprete
+import threading  # Importa threading para inyectar los flancos desde otro hilo
+import time  # Importa time para el reloj monotónico y el tiempo de CPU por hilo
+
+import gpio_stub  # Simulador de la API de gpiod v1
+
+NS_PER_S = 1000000000  # Nanosegundos por segundo
+
+
+# Genera flancos en el chip simulado
+class StubInjector:
+    def __init__(self, chip, offset):
+        self.chip = chip
+        self.offset = offset
+        self.value = 0  # Último valor inyectado; los trenes alternan a partir de él
+
+    def set(self, value):
+        self.chip.inject(self.offset, value)
+        self.value = value
+
+    @property
+    def dropped(self):
+        return self.chip.dropped
+
+
+# Genera flancos en una línea de gpio-sim cambiando su resistencia de pull desde sysfs
+class SimInjector:
+    def __init__(self, chip_name, offset):
+        self._file = open(f'/sys/bus/gpio/devices/{chip_name}/sim_gpio{offset}/pull', 'w')
+        self.dropped = 0  # El kernel no informa de los descartes en v1; se deducen de los perdidos
+        self.set(0)  # Parte de un valor conocido
+
+    def set(self, value):
+        self._file.seek(0)
+        self._file.write('pull-up' if value else 'pull-down')
+        self._file.flush()
+        self.value = value  # Último valor inyectado; los trenes alternan a partir de él
+
+    def close(self):
+        self._file.close()
+
+
+# Hilo que inyecta `count` flancos alternos a `rate` flancos por segundo con vencimientos absolutos, en
+# ráfagas de `burst` flancos seguidos. Al terminar espera `grace` segundos, activa `stop` e inyecta un
+# flanco más para despertar al lector
+class EdgeTrain(threading.Thread):
+    def __init__(self, injector, rate, count, grace=0.1, burst=1):
+        super().__init__(daemon=True)
+        self.injector = injector
+        self.period_ns = NS_PER_S * burst // rate
+        self.count = count
+        self.burst = burst
+        self.grace = grace
+        self.sent = 0  # Flancos inyectados
+        self.last_ns = 0  # Instante (ns) del último flanco inyectado
+        self.stop = False  # True cuando el lector debe terminar
+
+    def run(self):
+        clock = time.monotonic_ns
+        deadline = clock()
+        for index in range(self.count):
+            if index % self.burst == 0:
+                deadline += self.period_ns
+                remaining = deadline - clock()
+                if remaining > 2000000:  # Más de 2 ms: duerme y termina la espera activamente
+                    time.sleep((remaining - 1000000) / NS_PER_S)
+                while clock() < deadline:
+                    time.sleep(0)  # Cede el GIL mientras espera
+            self.injector.set(self.injector.value ^ 1)
+            self.last_ns = clock()
+            self.sent += 1
+        time.sleep(self.grace)
+        self.stop = True
+        self.injector.set(self.injector.value ^ 1)  # Flanco centinela para desbloquear lecturas bloqueantes
+
+
+# Estrategia 1: polling de `get_value()` a frecuencia fija (`AdaptivePoller` sin retroceso)
+def run_polling(chip, offset, train, record, args):
+    import gpiod
+    from polling import AdaptivePoller
+    line = chip.get_line(offset)
+    line.request(consumer='bench', type=gpiod.LINE_REQ_DIR_IN)
+    train.start()
+
+    def changed(value, timestamp_ns):
+        if train.sent and not train.stop:  # Ignora el flanco centinela
+            record(timestamp_ns - train.last_ns)
+
+    poller = AdaptivePoller(line.get_value, changed, rate_hz=args.poll_hz, min_rate_hz=args.poll_hz)
+    try:
+        poller.run(args.duration + 2 * train.grace)  # Muestrea durante todo el tren de flancos
+    finally:
+        line.release()
+    return 0
+
+
+# Estrategia 2/3: `event_read()` bloqueante, un evento por llamada
+def run_blocking_read(chip, offset, train, record, args):
+    line = _request_events(chip, offset)
+    train.start()
+    clock = time.monotonic_ns
+    try:
+        while True:
+            event = line.event_read()
+            if train.stop:
+                break
+            record(clock() - (event.sec * NS_PER_S + event.nsec))
+            if args.callback_load:
+                time.sleep(args.callback_load)  # Un callback por flanco, en el mismo hilo que lee
+    finally:
+        line.release()
+    return 0
+
+
+# Estrategia 4-6: `event_wait()` con timeout y una lectura por despertar
+def run_event_wait(chip, offset, train, record, args):
+    line = _request_events(chip, offset)
+    train.start()
+    clock = time.monotonic_ns
+    try:
+        while not train.stop:
+            if line.event_wait(sec=1):
+                event = line.event_read()
+                if train.stop:
+                    break
+                record(clock() - (event.sec * NS_PER_S + event.nsec))
+                if args.callback_load:
+                    time.sleep(args.callback_load)  # Un callback por flanco, en el mismo hilo que lee
+    finally:
+        line.release()
+    return 0
+
+
+# Estrategia con `EventReader`: una lectura masiva por despertar
+def run_batched(chip, offset, train, record, args):
+    from event_reader import EventReader
+    line = _request_events(chip, offset)
+    reader = EventReader(line, both_edges=True)
+    train.start()
+    clock = time.monotonic_ns
+    try:
+        while not train.stop:
+            if reader.wait(1):
+                now = clock()
+                batch = reader.read_batch()
+                if train.stop:
+                    break
+                for event in batch:
+                    record(now - event.timestamp_ns)
+                if args.callback_load:
+                    time.sleep(args.callback_load)  # El callback se ejecuta en el mismo hilo que lee
+    finally:
+        line.release()
+    return 0
+
+
+# Estrategia 4 con hilos: la captura se mide en el hilo lector y el callback lento va a un trabajador
+def run_threaded(chip, offset, train, record, args):
+    from dispatcher import ThreadedDispatcher
+    from event_reader import EventReader
+    line = _request_events(chip, offset)
+    reader = EventReader(line, both_edges=True)
+    clock = time.monotonic_ns
+
+    class CaptureReader:  # Registra la latencia de captura en el momento en que el lector vacía la cola
+        cpu_start = None  # Tiempo de CPU del hilo lector al empezar y tras el último lote
+        cpu_end = None
+
+        def wait(self, timeout=None):
+            if self.cpu_start is None:
+                self.cpu_start = self.cpu_end = time.thread_time()
+            return reader.wait(timeout)
+
+        def read_batch(self):
+            batch = reader.read_batch()
+            now = clock()
+            if not train.stop:
+                for event in batch:
+                    record(now - event.timestamp_ns)
+            self.cpu_end = time.thread_time()
+            return batch
+
+    def callback(batch):
+        if args.callback_load:
+            time.sleep(args.callback_load)
+
+    capture = CaptureReader()
+    dispatcher = ThreadedDispatcher(capture, callback)
+    dispatcher.start()
+    train.start()
+    try:
+        while not train.stop:
+            time.sleep(0.01)
+    finally:
+        dispatcher.stop()
+        line.release()
+    return 0, capture.cpu_end - capture.cpu_start  # CPU del hilo lector; los callbacks son trabajo de usuario
+
+
+# Estrategia 7/8: entrada con debounce que alterna un estado en cada pulsación válida
+def run_debounced(chip, offset, train, record, args):
+    from debounce import DebouncedInput
+    from edge_timing import is_press
+    button = DebouncedInput(chip, offset, args.debounce, bounce=args.debounce)
+    train.start()
+    clock = time.monotonic_ns
+    state = 0
+    try:
+        while not train.stop:
+            if button.wait(1):
+                now = clock()
+                batch = button.read_batch()
+                if train.stop:
+                    break
+                for event in batch:
+                    if is_press(event):
+                        state ^= 1
+                    record(now - event.timestamp_ns)
+    finally:
+        button.release()
+    return button.suppressed
+
+
+STRATEGIES = {
+    'polling': run_polling,
+    'blocking_read': run_blocking_read,
+    'event_wait': run_event_wait,
+    'batched': run_batched,
+    'debounced': run_debounced,
+    'threaded': run_threaded,
+}
+
+
+# Pide la línea con detección de ambos flancos usando la API v1
+def _request_events(chip, offset):
+    import gpiod
+    line = chip.get_line(offset)
+    line.request(consumer='bench', type=gpiod.LINE_REQ_EV_BOTH_EDGES)
+    return line
+
+
+# Percentil `p` (0-100) de una lista ya ordenada
+def percentile(values, p):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+# Ejecuta una estrategia a una frecuencia y devuelve sus métricas
+# Cada estrategia arranca el tren de flancos en cuanto tiene la línea pedida, para no perder el primero
+def run_case(name, chip, injector, offset, rate, args):
+    latencies = []
+    train = EdgeTrain(injector, rate, max(1, int(rate * args.duration)), burst=args.burst)
+    dropped_before = injector.dropped
+    cpu_start = time.thread_time()
+    outcome = STRATEGIES[name](chip, offset, train, latencies.append, args)
+    # Las estrategias devuelven los rebotes suprimidos; las que usan otros hilos, también la CPU de su lector
+    suppressed, cpu = outcome if isinstance(outcome, tuple) else (outcome, time.thread_time() - cpu_start)
+    train.join()
+    latencies.sort()
+    received = len(latencies)
+    return {
+        'strategy': name,
+        'rate': rate,
+        'sent': train.sent,
+        'received': received,
+        'suppressed': suppressed,
+        'dropped': injector.dropped - dropped_before,
+        'missed': max(0, train.sent - received - suppressed),
+        'p50_us': percentile(latencies, 50) / 1000,
+        'p99_us': percentile(latencies, 99) / 1000,
+        'max_us': (latencies[-1] / 1000) if latencies else 0,
+        'cpu_us_per_event': cpu / received * 1e6 if received else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia y rendimiento de las estrategias de interrupciones')
+    parser.add_argument('--backend', choices=('stub', 'sim'), default='stub', help='simulador en proceso o gpio-sim')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO (con gpio-sim, el chip simulado)')
+    parser.add_argument('--offset', type=int, default=17, help='línea en la que se inyectan los flancos')
+    parser.add_argument('--rates', default='100,1000,5000,10000,20000,50000', help='flancos por segundo a probar')
+    parser.add_argument('--duration', type=float, default=1.0, help='segundos de inyección por frecuencia')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help='estrategias separadas por comas')
+    parser.add_argument('--poll-hz', type=float, default=1000.0, help='frecuencia de muestreo del polling')
+    parser.add_argument('--debounce', type=float, default=0.0001, help='periodo de debounce (s)')
+    parser.add_argument('--callback-load', type=float, default=0.0, help='duración simulada de cada callback (s)')
+    parser.add_argument('--burst', type=int, default=1, help='flancos seguidos en cada ráfaga')
+    parser.add_argument('--queue-size', type=int, default=gpio_stub.KERNEL_QUEUE_SIZE,
+                        help='capacidad de la cola de eventos por línea del simulador')
+    args = parser.parse_args()
+
+    sys.setswitchinterval(0.0001)  # Cambios de hilo frecuentes para que el inyector no acapare el GIL
+    if args.backend == 'stub':
+        gpio_stub.install()
+        gpio_stub.KERNEL_QUEUE_SIZE = args.queue_size
+        chip = gpio_stub.Chip(args.chip)
+        injector = StubInjector(chip, args.offset)
+    else:
+        import gpiod
+        chip = gpiod.Chip(args.chip)
+        injector = SimInjector(args.chip, args.offset)
+
+    columns = ('strategy', 'rate', 'sent', 'received', 'suppressed', 'dropped', 'missed',
+               'p50_us', 'p99_us', 'max_us', 'cpu_us_per_event')
+    print(''.join(f'{column:>17}' for column in columns))
+    try:
+        for name in args.strategies.split(','):
+            sustained = 0
+            for rate in (int(rate) for rate in args.rates.split(',')):
+                result = run_case(name, chip, injector, args.offset, rate, args)
+                print(''.join(f'{result[column]:>17.1f}' if isinstance(result[column], float)
+                              else f'{result[column]:>17}' for column in columns))
+                if result['missed'] or result['dropped']:
+                    break  # Frecuencia no sostenible: no tiene sentido probar más rápido
+                sustained = rate
+            print(f'{name}: máxima frecuencia sin pérdidas {sustained} flancos/s')
+    finally:
+        if args.backend == 'sim':
+            injector.close()
+        chip.close()
+
+
+if __name__ == '__main__':
+    main()
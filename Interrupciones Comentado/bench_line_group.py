@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Benchmark: lectura/escritura línea por línea frente a un grupo de líneas pedido en bloque
+# Cada `get_value`/`set_value` de una línea es una llamada a gpiod; `get_values`/`set_values` del grupo
+# es una sola llamada para todas. La columna `llamadas gpiod/ciclo` cuenta, en una pasada aparte sin
+# cronometrar, las llamadas en Python a esos métodos de gpiod, no las llamadas al sistema: con un chip
+# real cada una es un ioctl (GPIOHANDLE_GET/SET_LINE_VALUES_IOCTL en libgpiod v1), con el simulador ninguna.
+# Para contar los ioctl reales: strace -c -e trace=ioctl python3 bench_line_group.py --backend real
+#   --backend stub : simulador en proceso de la API v1 (gpio_stub), sin Raspberry Pi; mide el coste en Python
+#   --backend real : chip real o gpio-sim con el gpiod v1 instalado
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import time  # Importa time para medir la duración de cada ciclo
+
+import gpio_stub  # Simulador de la API de gpiod v1
+from line_group import INPUT, OUTPUT, LineGroup, open_chip  # Grupo de líneas pedido en una sola petición
+
+# Métodos de las líneas y peticiones de gpiod (v1 y v2) que con un chip real hacen un ioctl cada vez
+GPIOD_METHODS = ('get_value', 'set_value', 'get_values', 'set_values')
+COUNT_ITERATIONS = 100  # Ciclos de la pasada que cuenta las llamadas
+
+
+# Envoltorio que cuenta las llamadas a los métodos de `GPIOD_METHODS` del objeto de gpiod envuelto
+class _CallCounter:
+    calls = 0  # Llamadas contadas entre todos los envoltorios
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name not in GPIOD_METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            _CallCounter.calls += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+# Llamadas a gpiod por ciclo de `cycle()`, que debe usar objetos envueltos en `_CallCounter`
+def count_calls(cycle):
+    _CallCounter.calls = 0
+    for _ in range(COUNT_ITERATIONS):
+        cycle()
+    return _CallCounter.calls / COUNT_ITERATIONS
+
+
+# Mide el tiempo medio por ciclo de `cycle()` en microsegundos
+def measure(cycle, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        cycle()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+# Cuenta las llamadas por ciclo de una lista de líneas v1 y después mide el tiempo sin envoltorios
+# Devuelve (llamadas por ciclo, µs por ciclo)
+def run_lines(lines, operation, iterations):
+    counted = [_CallCounter(line) for line in lines]
+    calls = count_calls(lambda: [operation(line) for line in counted])
+    return calls, measure(lambda: [operation(line) for line in lines], iterations)
+
+
+# Igual que `run_lines` para un grupo: se envuelve la petición de gpiod que hay dentro del `LineGroup`
+def run_group(group, cycle, iterations):
+    request = group._lines
+    group._lines = _CallCounter(request)
+    try:
+        calls = count_calls(cycle)
+    finally:
+        group._lines = request
+    return calls, measure(cycle, iterations)
+
+
+# Lectura línea por línea: una petición y una llamada por línea en cada ciclo
+def bench_per_line_read(chip, offsets, iterations):
+    import gpiod  # Importación diferida: después de instalar el simulador si se usa
+    lines = [chip.get_line(offset) for offset in offsets]
+    for line in lines:
+        line.request(consumer='bench', type=gpiod.LINE_REQ_DIR_IN)
+    try:
+        return run_lines(lines, lambda line: line.get_value(), iterations)
+    finally:
+        for line in lines:
+            line.release()
+
+
+# Escritura línea por línea: una llamada por línea en cada ciclo
+def bench_per_line_write(chip, offsets, iterations):
+    import gpiod  # Importación diferida: después de instalar el simulador si se usa
+    lines = [chip.get_line(offset) for offset in offsets]
+    for line in lines:
+        line.request(consumer='bench', type=gpiod.LINE_REQ_DIR_OUT)
+    try:
+        return run_lines(lines, lambda line: line.set_value(1), iterations)
+    finally:
+        for line in lines:
+            line.release()
+
+
+# Lectura del grupo: una sola llamada por ciclo para todas las líneas
+def bench_group_read(chip, offsets, iterations):
+    group = LineGroup(chip, offsets, INPUT, consumer='bench')
+    try:
+        return run_group(group, group.get_values, iterations)
+    finally:
+        group.release()
+
+
+# Escritura del grupo: una sola llamada por ciclo para todas las líneas
+def bench_group_write(chip, offsets, iterations):
+    group = LineGroup(chip, offsets, OUTPUT, consumer='bench')
+    values = [1] * len(offsets)
+    try:
+        return run_group(group, lambda: group.set_values(values), iterations)
+    finally:
+        group.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Líneas individuales frente a un grupo de líneas')
+    parser.add_argument('--backend', choices=('stub', 'real'), default='stub',
+                        help='simulador en proceso (API v1) o chip real')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO a usar')
+    parser.add_argument('--inputs', default='5,6,12,13,16,17,19,20,21,22,23,24,25,26,27',
+                        help='offsets de las entradas separados por comas')
+    parser.add_argument('--outputs', default='4,7,8,9,10,11,18', help='offsets de las salidas separados por comas')
+    parser.add_argument('--iterations', type=int, default=10000, help='ciclos por medición')
+    args = parser.parse_args()
+
+    inputs = [int(offset) for offset in args.inputs.split(',') if offset]
+    outputs = [int(offset) for offset in args.outputs.split(',') if offset]
+    if args.backend == 'stub':
+        gpio_stub.install()
+    chip = open_chip(args.chip)
+    try:
+        print(f"{'caso':<22}{'líneas':>8}{'llamadas gpiod/ciclo':>22}{'µs/ciclo':>12}")
+        for name, bench, offsets in (
+                ('lectura por línea', bench_per_line_read, inputs),
+                ('lectura en grupo', bench_group_read, inputs),
+                ('escritura por línea', bench_per_line_write, outputs),
+                ('escritura en grupo', bench_group_write, outputs)):
+            if offsets:
+                calls, elapsed = bench(chip, offsets, args.iterations)
+                print(f"{name:<22}{len(offsets):>8}{calls:>22.1f}{elapsed:>12.2f}")
+    finally:
+        chip.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Benchmark de cambios de modo: miles de cambios entre entrada, salida y detección de flancos sobre las
+# mismas líneas, con `LineManager` (reconfiguración en el sitio y caché de chips y peticiones) frente a
+# liberar y volver a pedir en cada cambio. Comprueba también que no queden recursos abiertos: los
+# descriptores del proceso no crecen durante los cambios y al cerrar el gestor no queda ninguna línea pedida
+# (el simulador cuenta las líneas que seguían pedidas al cerrar el chip, aunque el cierre las libere).
+# Cada cambio se verifica fuera del tiempo medido: una salida debe leer su valor inicial y, con el
+# simulador, una entrada con flancos debe recibir el flanco que se le inyecta.
+#   --backend stub    : simulador en proceso de la API v1 (gpio_stub): solo los cambios entre entrada y
+#                       salida sin flancos se hacen en el sitio; el resto obliga a volver a pedir
+#   --backend stub-v2 : simulador en proceso de la API v2 (gpio_stub_v2): todo cambio es `reconfigure_lines`
+#   --backend real    : chip real o gpio-sim con el gpiod instalado (con libgpiod v2, todo cambio es en el sitio)
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import os  # Importa os para contar los descriptores abiertos del proceso
+import random  # Importa random para generar una secuencia de modos reproducible
+import time  # Importa time para medir los cambios de modo
+
+import gpio_stub  # Simulador de la API de gpiod v1
+import gpio_stub_v2  # Simulador de la API de gpiod v2
+from line_group import INPUT, OUTPUT, LineGroup, open_chip  # Grupo de líneas pedido en una sola petición
+
+# Modos entre los que se cambia: (dirección, flancos, valor inicial de las salidas)
+MODES = (
+    (INPUT, None, 0),
+    (OUTPUT, None, 0),
+    (OUTPUT, None, 1),
+    (INPUT, 'rising', 0),
+    (INPUT, 'falling', 0),
+    (INPUT, 'both', 0),
+)
+
+
+# Descriptores abiertos por el proceso
+def open_fds():
+    return len(os.listdir('/proc/self/fd'))
+
+
+# Secuencia de `count` modos en la que cada paso cambia la dirección o los flancos, para que sea un cambio
+# real (una salida que sigue siendo salida se reutiliza tal cual y conserva su valor)
+def mode_sequence(count, seed):
+    rng = random.Random(seed)
+    sequence = [MODES[0]]
+    while len(sequence) < count:
+        mode = rng.choice(MODES)
+        if mode[:2] != sequence[-1][:2]:
+            sequence.append(mode)
+    return sequence
+
+
+# Comprueba que el grupo funciona en su modo actual; devuelve False si algo no cuadra
+def verify(group, mode, chip, offsets):
+    direction, edge, default = mode
+    if direction == OUTPUT:
+        return group.get_values() == [default] * len(offsets)
+    if edge is None or chip is None:
+        return True
+    # Con el simulador: lleva la entrada al valor contrario al flanco y genera un flanco que se debe leer
+    value = 1 if edge == 'falling' else 0
+    for offset in offsets:
+        chip.inject(offset, value)
+    if group.wait(0):
+        group.read_batch()  # Descarta los flancos de la preparación
+    for offset in offsets:
+        chip.inject(offset, 1 - value)
+    return group.wait(1) and len(group.read_batch()) == len(offsets)
+
+
+# Cambios de modo con el gestor: la misma petición se reconfigura en cada paso
+def run_manager(args, sequence):
+    from line_manager import LineManager
+
+    offsets = list(range(args.offset, args.offset + args.lines))
+    fds_before = open_fds()
+    fds_max = fds_before
+    elapsed = 0.0
+    failures = 0
+    with LineManager(consumer='bench') as manager:
+        chip = manager.chip(args.chip) if args.backend != 'real' else None
+        for mode in sequence:
+            start = time.perf_counter()
+            group = manager.request(args.chip, offsets, *mode)
+            elapsed += time.perf_counter() - start
+            failures += not verify(group, mode, chip, offsets)
+            fds_max = max(fds_max, open_fds())
+        stats = manager.stats()
+    return {
+        'case': 'manager',
+        'switches_per_s': len(sequence) / elapsed,
+        'us_per_switch': elapsed / len(sequence) * 1e6,
+        'in_place': stats['reconfigured'],
+        'rerequested': stats['rerequested'],
+        'failures': failures,
+        'fd_growth': fds_max - fds_before,
+        'fds_after': open_fds() - fds_before,
+        'leaked_lines': chip.leaked if chip is not None else 0,
+    }
+
+
+# Referencia: liberar la petición y pedirla de nuevo en cada cambio, con el chip abierto una sola vez
+def run_rerequest(args, sequence):
+    offsets = list(range(args.offset, args.offset + args.lines))
+    fds_before = open_fds()
+    fds_max = fds_before
+    elapsed = 0.0
+    failures = 0
+    chip = open_chip(args.chip)
+    group = None
+    try:
+        for mode in sequence:
+            start = time.perf_counter()
+            if group is not None:
+                group.release()
+            direction, edge, default = mode
+            group = LineGroup(chip, offsets, direction, edge, consumer='bench', default=default)
+            elapsed += time.perf_counter() - start
+            failures += not verify(group, mode, chip if args.backend != 'real' else None, offsets)
+            fds_max = max(fds_max, open_fds())
+    finally:
+        if group is not None:
+            group.release()
+        chip.close()
+    return {
+        'case': 'rerequest',
+        'switches_per_s': len(sequence) / elapsed,
+        'us_per_switch': elapsed / len(sequence) * 1e6,
+        'in_place': 0,
+        'rerequested': len(sequence) - 1,
+        'failures': failures,
+        'fd_growth': fds_max - fds_before,
+        'fds_after': open_fds() - fds_before,
+        'leaked_lines': chip.leaked if args.backend != 'real' else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cambios de modo de líneas: gestor frente a volver a pedir')
+    parser.add_argument('--backend', choices=('stub', 'stub-v2', 'real'), default='stub',
+                        help='simulador en proceso (API v1 o v2) o chip real')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO a usar')
+    parser.add_argument('--offset', type=int, default=17, help='primera línea del grupo')
+    parser.add_argument('--lines', type=int, default=1, help='líneas del grupo')
+    parser.add_argument('--switches', type=int, default=10000, help='cambios de modo por caso')
+    parser.add_argument('--seed', type=int, default=1, help='semilla de la secuencia de modos')
+    args = parser.parse_args()
+
+    if args.backend == 'stub':
+        gpio_stub.install()
+    elif args.backend == 'stub-v2':
+        gpio_stub_v2.install()
+    sequence = mode_sequence(args.switches, args.seed)
+
+    columns = ('case', 'switches_per_s', 'us_per_switch', 'in_place', 'rerequested',
+               'failures', 'fd_growth', 'fds_after', 'leaked_lines')
+    print(''.join(f'{column:>15}' for column in columns))
+    ok = True
+    for run in (run_rerequest, run_manager):
+        result = run(args, sequence)
+        print(''.join(f'{result[column]:>15.2f}' if isinstance(result[column], float)
+                      else f'{result[column]!s:>15}' for column in columns))
+        ok = ok and not (result['failures'] or result['fds_after'] or result['leaked_lines'])
+    print("sin fugas ni fallos" if ok else "ERROR: fallos o recursos sin liberar")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Benchmark del coste de la instrumentación en el camino caliente, sin E/S
+# Mide lo que añade `InstrumentedReader.read_batch` a cada lote (con un botón, un flanco por lote), lo que
+# añade `instrument()` a cada llamada de un callback vacío y el coste de `Histogram.observe`.
+# Cada caso se compara con el mismo bucle sin instrumentar; el resultado es la diferencia en µs por llamada.
+# Como en un programa con un recolector de métricas, se exporta (`render`) cada `--scrape-every` llamadas
+# fuera del tiempo medido: el reparto en buckets se mide aparte, por observación
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import time  # Importa time para medir la duración de cada caso
+
+from event_reader import RISING_EDGE, EdgeEvent  # Registro de flanco que entregan los lectores
+from metrics import InstrumentedReader, Registry, instrument  # Instrumentación que se mide
+
+
+# Lector falso que entrega siempre el mismo lote, para medir solo la instrumentación
+class _FakeReader:
+    def __init__(self, size):
+        self.batch = [EdgeEvent(17, RISING_EDGE, time.monotonic_ns())] * size
+        self.events = 0
+        self.wakeups = 0
+        self.dropped = 0
+
+    def wait(self, timeout=None):
+        return True
+
+    def read_batch(self):
+        return self.batch
+
+
+# Tiempo medio por llamada de `function()` en microsegundos; cada `chunk` llamadas se llama a `between()`
+# sin contar su tiempo
+def measure(function, iterations, chunk, between):
+    elapsed = 0.0
+    for _ in range(0, iterations, chunk):
+        start = time.perf_counter()
+        for _ in range(chunk):
+            function()
+        elapsed += time.perf_counter() - start
+        between()
+    return elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coste de las métricas en el camino caliente')
+    parser.add_argument('--iterations', type=int, default=200000, help='llamadas por medición')
+    parser.add_argument('--repeat', type=int, default=5, help='mediciones por caso (se toma la mejor)')
+    parser.add_argument('--scrape-every', type=int, default=10000, help='llamadas entre dos exportaciones')
+    args = parser.parse_args()
+
+    registry = Registry()
+    n, r = args.iterations, args.repeat
+
+    # El mejor de `repeat` intentos, para quitar ruido del sistema
+    def best(function):
+        return min(measure(function, n, args.scrape_every, registry.render) for _ in range(r))
+
+    rows = []
+    for size in (1, 16):
+        reader = _FakeReader(size)
+        wrapped = InstrumentedReader(reader, registry, name=f'bench{size}')
+        base = best(reader.read_batch)
+        rows.append((f'read_batch, lotes de {size}', base, best(wrapped.read_batch) - base))
+
+    def callback():
+        pass
+    base = best(callback)
+    rows.append(('callback instrumentado', base, best(instrument(registry, 'bench', callback)) - base))
+
+    histogram = registry.histogram('bench_observe', 'Observaciones del benchmark')
+    base = best(lambda: None)
+    rows.append(('Histogram.observe', base, best(lambda: histogram.observe(12345)) - base))
+
+    # Reparto en buckets al exportar, por observación pendiente
+    histogram = registry.histogram('bench_fold', 'Reparto del benchmark')
+    fold = []
+    for _ in range(r):
+        for _ in range(args.scrape_every):
+            histogram.observe(12345)
+        start = time.perf_counter()
+        histogram.render()
+        fold.append((time.perf_counter() - start) / args.scrape_every * 1e6)
+
+    print(f"{'caso':<28}{'base µs':>10}{'extra µs':>10}")
+    for name, base, extra in rows:
+        print(f"{name:<28}{base:>10.3f}{extra:>10.3f}")
+    print(f"reparto en buckets al exportar: {min(fold):.3f} µs por observación")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Benchmark del decodificador de cuadratura: flancos por segundo sostenidos sin pérdidas
+# Un hilo genera la secuencia de cuadratura de un encoder girando a velocidad constante (alternando
+# flancos en A y B) y el hilo principal la decodifica con `QuadratureEncoder`. Al final la posición
+# debe coincidir con los flancos enviados, sin errores ni descartes.
+# También mide la decodificación pura (sin E/S) sobre lotes ya leídos.
+# El simulador v1 usa por defecto la cola del uAPI v1 del kernel (16 flancos por línea, 16 por lectura): con
+# ella el límite sin pérdidas en el simulador ronda los 10-20 k flancos/s, no lo que decodifica el bucle.
+# Con la API v2 y la cola de 1024 flancos que pide el encoder, el simulador sostiene 100 k flancos/s:
+#   python3 bench_quadrature.py --backend stub-v2
+# Con libgpiod v2 la petición de A y B comparte una cola de `--event-buffer-size` flancos (hasta 1024).
+#   --backend stub    : simulador en proceso de la API v1 (gpio_stub), funciona en cualquier Linux
+#   --backend stub-v2 : simulador en proceso de la API v2 (gpio_stub_v2)
+#   --backend sim     : módulo del kernel gpio-sim (los flancos se generan desde sysfs)
+
+import argparse  # Importa argparse para leer los parámetros del benchmark
+import sys  # Importa sys para ajustar el intervalo de cambio de hilo del intérprete
+import threading  # Importa threading para generar los flancos desde otro hilo
+import time  # Importa time para el reloj monotónico y el tiempo de CPU por hilo
+
+import gpio_stub  # Simulador de la API de gpiod v1
+import gpio_stub_v2  # Simulador de la API de gpiod v2
+from quadrature import EVENT_BUFFER_SIZE  # Cola de eventos que pide el encoder con libgpiod v2
+from bench_latency import NS_PER_S, SimInjector, StubInjector  # Generadores de flancos del benchmark de latencia
+
+
+# Hilo que gira el encoder `count` flancos a `rate` flancos por segundo con vencimientos absolutos
+# En sentido positivo A adelanta a B: se alternan los flancos A, B, A, B...
+class QuadratureTrain(threading.Thread):
+    def __init__(self, injector_a, injector_b, rate, count, reverse=False):
+        super().__init__(daemon=True)
+        self.injectors = (injector_b, injector_a) if reverse else (injector_a, injector_b)
+        self.period_ns = NS_PER_S // rate
+        self.count = count
+        self.sent = 0  # Flancos inyectados
+
+    def run(self):
+        clock = time.monotonic_ns
+        deadline = clock()
+        injectors = self.injectors
+        for index in range(self.count):
+            deadline += self.period_ns
+            remaining = deadline - clock()
+            if remaining > 2000000:  # Más de 2 ms: duerme y termina la espera activamente
+                time.sleep((remaining - 1000000) / NS_PER_S)
+            while clock() < deadline:
+                time.sleep(0)  # Cede el GIL mientras espera
+            injector = injectors[index % 2]
+            injector.set(injector.value ^ 1)
+            self.sent += 1
+
+
+# Decodifica en el hilo actual mientras el generador está activo y vacía lo que quede al final
+def run_case(chip, injector_a, injector_b, a, b, rate, args):
+    from quadrature import QuadratureEncoder
+
+    encoder = QuadratureEncoder(chip, a, b, consumer='bench', event_buffer_size=args.event_buffer_size)
+    train = QuadratureTrain(injector_a, injector_b, rate, max(2, int(rate * args.duration)), args.reverse)
+    dropped_before = injector_a.dropped
+    cpu_start = time.thread_time()
+    try:
+        train.start()
+        while train.is_alive():
+            encoder.update(0.05)
+        while encoder.update(0.05):  # Flancos que quedaban en la cola
+            pass
+        cpu = time.thread_time() - cpu_start
+        stats = encoder.stats()
+    finally:
+        encoder.release()
+    expected = -train.sent if args.reverse else train.sent
+    return {
+        'rate': rate,
+        'sent': train.sent,
+        'position': stats['position'],
+        'errors': stats['errors'],
+        'dropped': injector_a.dropped - dropped_before,
+        'batch_avg': stats['events'] / stats['wakeups'] if stats['wakeups'] else 0.0,
+        'cpu_us_per_edge': cpu / stats['events'] * 1e6 if stats['events'] else 0.0,
+        'ok': stats['position'] == expected and not stats['errors'],
+    }
+
+
+# Decodificación pura: `count` flancos en lotes de `batch` sin E/S; devuelve flancos por segundo
+def decode_rate(count, batch):
+    from event_reader import EdgeEvent, FALLING_EDGE, RISING_EDGE
+    from quadrature import QuadratureDecoder
+
+    # Secuencia hacia delante desde el estado 00: A sube, B sube, A baja, B baja
+    cycle = [EdgeEvent(0, RISING_EDGE, 0), EdgeEvent(1, RISING_EDGE, 0),
+             EdgeEvent(0, FALLING_EDGE, 0), EdgeEvent(1, FALLING_EDGE, 0)]
+    events = cycle * max(1, batch // 4)
+    encoder = QuadratureDecoder(0)
+    rounds = max(1, count // len(events))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encoder.process(events)
+    elapsed = time.perf_counter() - start
+    return rounds * len(events) / elapsed, encoder.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decodificador de cuadratura: flancos por segundo sostenidos')
+    parser.add_argument('--backend', choices=('stub', 'stub-v2', 'sim'), default='stub',
+                        help='simulador en proceso (API v1 o v2) o gpio-sim')
+    parser.add_argument('--chip', default='gpiochip4', help='chip GPIO (con gpio-sim, el chip simulado)')
+    parser.add_argument('--a', type=int, default=5, help='línea A del encoder')
+    parser.add_argument('--b', type=int, default=6, help='línea B del encoder')
+    parser.add_argument('--rates', default='10000,20000,50000,100000', help='flancos por segundo a probar')
+    parser.add_argument('--duration', type=float, default=1.0, help='segundos de giro por frecuencia')
+    parser.add_argument('--reverse', action='store_true', help='girar en sentido negativo')
+    parser.add_argument('--queue-size', type=int, default=gpio_stub.KERNEL_QUEUE_SIZE,
+                        help='capacidad de la cola de eventos por línea del simulador v1')
+    parser.add_argument('--event-buffer-size', type=int, default=EVENT_BUFFER_SIZE,
+                        help='cola de eventos de la petición con libgpiod v2')
+    args = parser.parse_args()
+
+    sys.setswitchinterval(0.0001)  # Cambios de hilo frecuentes para que el generador no acapare el GIL
+    if args.backend == 'stub':
+        gpio_stub.install()
+        gpio_stub.KERNEL_QUEUE_SIZE = args.queue_size
+        chip = gpio_stub.Chip(args.chip)
+        injector_a, injector_b = StubInjector(chip, args.a), StubInjector(chip, args.b)
+    elif args.backend == 'stub-v2':
+        gpio_stub_v2.install()
+        chip = gpio_stub_v2.Chip('/dev/' + args.chip)
+        injector_a, injector_b = StubInjector(chip, args.a), StubInjector(chip, args.b)
+    else:
+        import gpiod
+        chip = gpiod.Chip(args.chip)
+        injector_a, injector_b = SimInjector(args.chip, args.a), SimInjector(args.chip, args.b)
+
+    for batch in (16, 64, 1024):
+        rate, errors = decode_rate(2000000, batch)
+        print(f"decodificación pura, lotes de {batch}: {rate / 1e6:.2f} M flancos/s, errores {errors}")
+
+    columns = ('rate', 'sent', 'position', 'errors', 'dropped', 'batch_avg', 'cpu_us_per_edge', 'ok')
+    print(''.join(f'{column:>16}' for column in columns))
+    try:
+        sustained = 0
+        for rate in (int(rate) for rate in args.rates.split(',')):
+            result = run_case(chip, injector_a, injector_b, args.a, args.b, rate, args)
+            print(''.join(f'{result[column]:>16.2f}' if isinstance(result[column], float)
+                          else f'{result[column]!s:>16}' for column in columns))
+            if not result['ok'] or result['dropped']:
+                break  # Frecuencia no sostenible: no tiene sentido probar más rápido
+            sustained = rate
+        print(f"máxima frecuencia sin pérdidas: {sustained} flancos/s")
+    finally:
+        if args.backend == 'sim':
+            injector_a.close()
+            injector_b.close()
+        chip.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import time  # Importa time para medir el tiempo de CPU consumido por cada modo
+from datetime import timedelta  # libgpiod v2 expresa el periodo de debounce como timedelta
+
+from event_reader import FALLING_EDGE, RISING_EDGE, EventReader  # Lector de eventos y tipos de flanco
+
+DEBOUNCE_TIME = 0.2  # Intervalo mínimo entre pulsaciones (segundos), el mismo que usan los ejemplos 7 y 8
+BOUNCE_TIME = 0.005  # Duración del rebote de los contactos (segundos); es el periodo que se pide al kernel
+
+
+# Filtro de rebotes por software basado solo en las marcas de tiempo del kernel
+# Sigue el estado de cada línea (pulsada o no) a partir del tipo de flanco:
+#   - una pulsación se acepta si la línea estaba suelta, han pasado `period` desde la pulsación aceptada
+#     anterior y `bounce` desde el flanco anterior de la línea (los rebotes al soltar no cuentan como pulsación)
+#   - una liberación se acepta siempre que la línea estuviera pulsada y hayan pasado `bounce` desde la
+#     pulsación (los rebotes al pulsar no la sueltan); así una pulsación corta no bloquea la siguiente
+# Los demás flancos se cuentan como rebotes suprimidos. No duerme ni lee la línea
+class SoftwareDebouncer:
+    def __init__(self, period=DEBOUNCE_TIME, bounce=BOUNCE_TIME, active_low=False):
+        self.period_ns = int(period * 1000000000)  # Periodo en nanosegundos, la unidad de las marcas del kernel
+        self.bounce_ns = int(bounce * 1000000000)  # Rebote de los contactos en nanosegundos
+        self.press_edge = FALLING_EDGE if active_low else RISING_EDGE  # Flanco que corresponde a pulsar
+        self.suppressed = 0  # Número de flancos descartados como rebotes
+        self._pressed = set()  # Líneas pulsadas según los flancos aceptados
+        self._last_press_ns = {}  # Marca de la última pulsación aceptada por línea
+        self._last_edge_ns = {}  # Marca del último flanco recibido por línea, aceptado o no
+
+    # Devuelve solo los eventos del lote que sobreviven al filtro
+    def filter(self, events):
+        period_ns = self.period_ns
+        bounce_ns = self.bounce_ns
+        press_edge = self.press_edge
+        pressed = self._pressed
+        last_press_ns = self._last_press_ns
+        last_edge_ns = self._last_edge_ns
+        accepted = []
+        for event in events:
+            line = event.line
+            timestamp_ns = event.timestamp_ns
+            previous_edge = last_edge_ns.get(line)
+            last_edge_ns[line] = timestamp_ns
+            if event.edge == press_edge:
+                previous = last_press_ns.get(line)
+                if line in pressed or (previous is not None and timestamp_ns - previous < period_ns) or (
+                        previous_edge is not None and timestamp_ns - previous_edge < bounce_ns):
+                    self.suppressed += 1
+                    continue
+                pressed.add(line)
+                last_press_ns[line] = timestamp_ns
+            else:
+                if line not in pressed or timestamp_ns - last_press_ns[line] < bounce_ns:
+                    self.suppressed += 1
+                    continue
+                pressed.discard(line)
+            accepted.append(event)
+        return accepted
+
+
+# Clase que representa una entrada con debounce, pedida al kernel cuando es posible
+# Con libgpiod v2 el rebote de los contactos (`bounce`, unos milisegundos) se configura en la línea
+# (`debounce_period`) y no llega a despertar al proceso; con libgpiod v1, o si el kernel rechaza la
+# configuración, `SoftwareDebouncer` lo filtra sobre los flancos ya leídos. El intervalo mínimo entre
+# pulsaciones (`period`) se aplica siempre por software: en el kernel retrasaría cada pulsación ese tiempo
+# y haría desaparecer las pulsaciones más cortas
+class DebouncedInput:
+    def __init__(self, chip, offset, period=DEBOUNCE_TIME, consumer='Button', force_software=False,
+                 bounce=BOUNCE_TIME):
+        self.offset = offset  # Offset de la línea dentro del chip
+        self.period = period  # Intervalo mínimo entre pulsaciones (segundos)
+        self.bounce = bounce  # Rebote de los contactos (segundos)
+        self.hardware = False  # True si el kernel filtra el rebote de los contactos
+        self._cpu_start = time.process_time()  # Referencia para medir el tiempo de CPU del modo elegido
+
+        import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+        if hasattr(chip, 'request_lines'):  # libgpiod v2
+            settings = {'direction': gpiod.line.Direction.INPUT, 'edge_detection': gpiod.line.Edge.BOTH}
+            self._line = None
+            if not force_software:
+                try:
+                    self._line = chip.request_lines(consumer=consumer, config={offset: gpiod.LineSettings(
+                        debounce_period=timedelta(seconds=bounce), **settings)})
+                    self.hardware = True
+                except OSError:  # El kernel no admite debounce en esta línea
+                    pass
+            if self._line is None:
+                self._line = chip.request_lines(consumer=consumer,
+                                                config={offset: gpiod.LineSettings(**settings)})
+        else:  # libgpiod v1: no hay debounce en el kernel
+            self._line = chip.get_line(offset)
+            self._line.request(consumer=consumer, type=gpiod.LINE_REQ_EV_BOTH_EDGES)
+
+        # Filtro por software: intervalo entre pulsaciones y, si el kernel no lo hace, rebote de los contactos
+        self.debouncer = SoftwareDebouncer(period, 0 if self.hardware else bounce)
+        self.reader = EventReader(self._line, both_edges=True)  # Lector que vacía la cola en cada despertar
+
+    # Devuelve el descriptor de la línea, para registrarlo en otros bucles de eventos
+    def fileno(self):
+        return self.reader.fileno()
+
+    # Espera hasta que haya flancos pendientes o venza `timeout` (segundos, None = sin límite)
+    def wait(self, timeout=None):
+        return self.reader.wait(timeout)
+
+    # Lee los flancos pendientes y devuelve solo los que no son rebotes
+    def read_batch(self):
+        return self.debouncer.filter(self.reader.read_batch())
+
+    # Número de flancos descartados en Python (en modo kernel los rebotes de los contactos no llegan al proceso)
+    @property
+    def suppressed(self):
+        return self.debouncer.suppressed
+
+    # Estadísticas para comparar ambos modos: despertares, flancos leídos, rebotes y CPU consumida
+    def stats(self):
+        return {
+            'mode': 'kernel' if self.hardware else 'software',
+            'wakeups': self.reader.wakeups,
+            'events': self.reader.events,
+            'suppressed': self.suppressed,
+            'dropped': self.reader.dropped,
+            'cpu_s': time.process_time() - self._cpu_start,
+        }
+
+    # Libera la línea GPIO, como un destructor en POO
+    def release(self):
+        self._line.release()
+
+
+# Comprobación del filtro con pulsaciones cortas y rebotes: python3 debounce.py
+# Cuatro pulsaciones de 100 ms separadas 1 s, con rebotes de 1 ms al pulsar y al soltar, deben dar
+# cuatro pulsaciones y cuatro liberaciones de 100 ms; una segunda pulsación a los 150 ms se descarta entera
+def _check():
+    from event_reader import EdgeEvent
+    from edge_timing import NS_PER_MS, PressTracker
+
+    # Pulsación de `hold_ms` con un rebote de 0,6 ms en cada flanco (subida, bajada, subida y al revés)
+    def tap(start_ms, hold_ms):
+        press = (RISING_EDGE, FALLING_EDGE, RISING_EDGE)
+        release = (FALLING_EDGE, RISING_EDGE, FALLING_EDGE)
+        return [EdgeEvent(17, edge, int((start + index * 0.3) * NS_PER_MS))
+                for start, edges in ((start_ms, press), (start_ms + hold_ms, release))
+                for index, edge in enumerate(edges)]
+
+    debouncer = SoftwareDebouncer()
+    presses, durations = [], []
+    tracker = PressTracker(on_press=lambda event, interval: presses.append(event),
+                           on_release=lambda event, duration: durations.append(duration / NS_PER_MS))
+    for index in range(4):
+        tracker.feed(debouncer.filter(tap(index * 1000, 100)))
+    assert len(presses) == 4, f"{len(presses)} of 4 short presses accepted"
+    assert all(99 < duration < 101 for duration in durations) and len(durations) == 4, durations
+    assert debouncer.suppressed == 16, debouncer.suppressed  # Dos rebotes por flanco de cada pulsación
+
+    debouncer = SoftwareDebouncer()
+    accepted = debouncer.filter(tap(0, 50) + tap(150, 50))
+    assert [event.edge for event in accepted] == [RISING_EDGE, FALLING_EDGE], accepted
+    print("debounce check passed")
+
+
+if __name__ == '__main__':
+    _check()
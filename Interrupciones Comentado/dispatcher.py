@@ -0,0 +1,222 @@
+import os  # Importa os para fijar la CPU y la prioridad de tiempo real del hilo lector
+import threading  # Importa threading para el hilo lector y los hilos trabajadores
+import traceback  # Importa traceback para informar de los errores de los callbacks
+
+DEFAULT_CAPACITY = 4096  # Eventos que caben en la cola de cada trabajador
+POLL_TIMEOUT = 0.1  # Segundos que el lector espera eventos antes de comprobar si debe parar
+
+
+# Cola circular de un productor y un consumidor (SPSC) preasignada
+# El productor solo avanza `_write_seq` y el consumidor solo `_read_seq`, así que no hay cerrojos.
+# Si está llena, el evento nuevo se descarta y se cuenta en `dropped` (el consumidor nunca ve datos a medias)
+class SpscRing:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._write_seq = 0  # Solo lo modifica el productor
+        self._read_seq = 0  # Solo lo modifica el consumidor
+        self.dropped = 0  # Eventos descartados por cola llena
+        self.max_depth = 0  # Mayor ocupación observada
+
+    def __len__(self):
+        return self._write_seq - self._read_seq
+
+    # Productor: añade un evento; devuelve False si la cola está llena
+    def push(self, item):
+        seq = self._write_seq
+        depth = seq - self._read_seq
+        if depth >= self.capacity:
+            self.dropped += 1
+            return False
+        self._slots[seq % self.capacity] = item
+        self._write_seq = seq + 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+        return True
+
+    # Consumidor: extrae todos los eventos disponibles
+    def drain(self):
+        start = self._read_seq
+        end = self._write_seq
+        capacity = self.capacity
+        slots = self._slots
+        items = [slots[seq % capacity] for seq in range(start, end)]
+        self._read_seq = end
+        return items
+
+
+# Informe por defecto de un error en un callback: la traza completa por la salida de errores
+def _print_error(error, batch):
+    traceback.print_exception(type(error), error, error.__traceback__)
+
+
+# Trabajador: un hilo que vacía su cola y ejecuta el callback de usuario con cada lote
+# Un error en el callback se cuenta y se informa con `on_error(error, lote)`, y el trabajador sigue:
+# si el hilo terminara, el lector seguiría llenando la cola y a partir de ahí solo contaría descartes
+class _Worker:
+    def __init__(self, index, callback, capacity, on_error):
+        self.ring = SpscRing(capacity)
+        self.callback = callback
+        self.on_error = on_error
+        self.wakeup = threading.Event()  # El lector lo activa al añadir eventos
+        self.processed = 0  # Eventos entregados al callback
+        self.errors = 0  # Lotes en los que el callback lanzó una excepción
+        self.thread = threading.Thread(target=self._run, name=f'gpio-worker-{index}', daemon=True)
+        self.running = False
+
+    def _run(self):
+        ring = self.ring
+        while self.running or len(ring):
+            self.wakeup.wait(POLL_TIMEOUT)
+            self.wakeup.clear()  # Se limpia antes de vaciar para no perder un aviso posterior
+            batch = ring.drain()
+            if batch:
+                try:
+                    self.callback(batch)
+                except Exception as error:
+                    self.errors += 1
+                    try:
+                        self.on_error(error, batch)
+                    except Exception:  # Un fallo al informar tampoco debe detener al trabajador
+                        pass
+                self.processed += len(batch)
+
+
+# Despachador con un hilo lector dedicado y un grupo de trabajadores
+# En POO, esta clase separa la captura de flancos de su procesamiento: el hilo lector solo espera,
+# vacía la cola del kernel y reparte los eventos en colas SPSC preasignadas (una por trabajador);
+# los trabajadores ejecutan los callbacks.
+# Un callback lento ya no retrasa la lectura del siguiente flanco ni desborda la cola del kernel.
+# Reparto entre trabajadores:
+#   ordered=True  : el trabajador se elige por la línea, así que los flancos de cada pin se procesan en
+#                   orden; todos los flancos de una misma línea van a un solo trabajador, y con un único
+#                   pin los demás trabajadores no reciben nada
+#   ordered=False : cada lote completo va al siguiente trabajador por turno (round-robin), de modo que
+#                   varios trabajadores se reparten aunque haya una sola línea; los lotes pueden
+#                   terminar en otro orden que el de llegada
+# Con `workers > 1` el callback se ejecuta a la vez en varios hilos: lo que comparta debe admitir varios
+# productores. `AsyncLog` y `Counter` suponen un solo productor (un registro o contador por trabajador, o
+# un cerrojo); los histogramas de `metrics` e `instrument()` sí admiten varios hilos que observan.
+# El hilo lector puede fijarse a una CPU (`cpu`) y usar SCHED_FIFO (`priority`, requiere CAP_SYS_NICE).
+# Un error en un callback no detiene a su trabajador: se cuenta en `errors` y se entrega a
+# `on_error(error, lote)` (por defecto, la traza por la salida de errores). Los errores del hilo lector
+# también se entregan a `on_error`, con un lote vacío: si no se puede fijar la CPU o la prioridad, el
+# lector sigue sin esos ajustes; si falla `wait()` o `read_batch()` (por ejemplo, OSError con las líneas
+# ya liberadas), el lector se detiene y el error queda en `error`
+class ThreadedDispatcher:
+    def __init__(self, reader, callback, workers=1, capacity=DEFAULT_CAPACITY, cpu=None, priority=None,
+                 on_error=_print_error, ordered=True):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.reader = reader  # Cualquier objeto con `wait(timeout)` y `read_batch()`
+        self.cpu = cpu  # CPU a la que se fija el hilo lector (None = sin fijar)
+        self.priority = priority  # Prioridad SCHED_FIFO del hilo lector (None = planificación normal)
+        self.ordered = ordered  # True: reparto por línea; False: lotes por turno
+        self.realtime = False  # True si se pudo aplicar SCHED_FIFO
+        self.received = 0  # Eventos leídos por el hilo lector
+        self.error = None  # Error que detuvo al hilo lector, si lo hubo
+        self.on_error = on_error
+        self._workers = [_Worker(index, callback, capacity, on_error) for index in range(workers)]
+        self._running = False
+        self._thread = threading.Thread(target=self._run, name='gpio-reader', daemon=True)
+
+    def start(self):
+        self._running = True
+        for worker in self._workers:
+            worker.running = True
+            worker.thread.start()
+        self._thread.start()
+
+    # Detiene el lector y espera a que los trabajadores terminen lo pendiente
+    def stop(self):
+        self._running = False
+        self._thread.join()
+        for worker in self._workers:
+            worker.running = False
+            worker.wakeup.set()
+            worker.thread.join()
+
+    # Informa de un error del hilo lector sin dejar que un fallo al informar lo detenga
+    def _report(self, error):
+        try:
+            self.on_error(error, [])
+        except Exception:
+            pass
+
+    # Ajustes de tiempo real; pid 0 en Linux se refiere al hilo que hace la llamada
+    def _setup_thread(self):
+        if self.cpu is not None:
+            try:
+                os.sched_setaffinity(0, {self.cpu})
+            except OSError as error:  # CPU inexistente o fuera del cpuset: se sigue sin fijar
+                self._report(error)
+        if self.priority is not None:
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+                self.realtime = True
+            except PermissionError:  # Sin CAP_SYS_NICE se sigue con la planificación normal
+                pass
+            except OSError as error:  # Prioridad fuera de rango: también se sigue sin tiempo real
+                self._report(error)
+
+    def _run(self):
+        self._setup_thread()
+        try:
+            if self.ordered:
+                self._run_by_line()
+            else:
+                self._run_round_robin()
+        except Exception as error:  # Sin este informe, el hilo lector terminaría sin que nadie lo viera
+            self.error = error
+            self._report(error)
+
+    # Reparto por línea: conserva el orden de los flancos de cada pin
+    def _run_by_line(self):
+        reader = self.reader
+        workers = self._workers
+        count = len(workers)
+        while self._running:
+            if not reader.wait(POLL_TIMEOUT):
+                continue
+            batch = reader.read_batch()
+            self.received += len(batch)
+            touched = set()
+            for event in batch:
+                index = event.line % count
+                workers[index].ring.push(event)
+                touched.add(index)
+            for index in touched:
+                workers[index].wakeup.set()
+
+    # Reparto por turno: cada lote completo al siguiente trabajador
+    def _run_round_robin(self):
+        reader = self.reader
+        workers = self._workers
+        count = len(workers)
+        index = 0
+        while self._running:
+            if not reader.wait(POLL_TIMEOUT):
+                continue
+            batch = reader.read_batch()
+            if not batch:
+                continue
+            self.received += len(batch)
+            worker = workers[index]
+            push = worker.ring.push
+            for event in batch:
+                push(event)
+            worker.wakeup.set()
+            index = (index + 1) % count
+
+    # Profundidad de las colas, descartes y eventos procesados
+    def stats(self):
+        return {
+            'received': self.received,
+            'processed': sum(worker.processed for worker in self._workers),
+            'queue_depth': [len(worker.ring) for worker in self._workers],
+            'max_depth': max(worker.ring.max_depth for worker in self._workers),
+            'dropped': sum(worker.ring.dropped for worker in self._workers),
+            'errors': sum(worker.errors for worker in self._workers),
+            'realtime': self.realtime,
+            'reader_error': self.error,
+        }
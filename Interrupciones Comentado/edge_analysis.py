@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Análisis vectorizado de flancos capturados: frecuencia, ciclo de trabajo, anchos de pulso y rebotes
+# Requiere NumPy (pip install numpy). Trabaja sobre arrays de marcas de tiempo (int64, ns) y tipos de
+# flanco (1 = subida, 2 = bajada) de una sola línea; cada métrica es un puñado de operaciones sobre
+# arrays completos, sin un bucle de Python por flanco.
+# Uso: python3 edge_analysis.py button_edges.bin --line 17 --debounce 0.2 --window 1.0
+
+import argparse  # Importa argparse para analizar una grabación desde la línea de comandos
+from collections import deque  # Cola de lotes de la ventana reciente
+
+import numpy as np  # Importa NumPy para las operaciones vectorizadas
+
+from edge_recorder import HEADER, MAGIC, RECORD  # Formato binario de las grabaciones
+from event_reader import FALLING_EDGE, RISING_EDGE  # Tipos de flanco normalizados
+
+NS_PER_S = 1000000000  # Nanosegundos por segundo
+
+# Tipo estructurado equivalente a un registro de `edge_recorder`, para leer una grabación sin copiarla
+RECORD_DTYPE = np.dtype([('line', '<u2'), ('edge', 'u1'), ('pad', 'u1'), ('timestamp_ns', '<i8')])
+
+
+# Lee una grabación de `edge_recorder` como array estructurado (campos line, edge, timestamp_ns)
+def load_recording(path):
+    header = np.fromfile(path, dtype=np.uint8, count=HEADER.size).tobytes()
+    if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, RECORD.size):
+        raise ValueError(f"{path}: not an edge recording")
+    records = np.fromfile(path, dtype=RECORD_DTYPE, offset=HEADER.size)
+    end = np.flatnonzero(records['edge'] == 0)  # Huecos sin escribir de un fichero que no se cerró
+    return records[:end[0]] if end.size else records
+
+
+# Marcas de tiempo y tipos de flanco de una línea, como arrays contiguos
+def line_arrays(records, line=None):
+    if line is not None:
+        records = records[records['line'] == line]
+    return np.ascontiguousarray(records['timestamp_ns'], dtype=np.int64), np.ascontiguousarray(records['edge'])
+
+
+# Convierte un lote de `EdgeEvent` (por ejemplo, el que entrega `EventReader.read_batch()`) en arrays
+def events_to_arrays(events):
+    count = len(events)
+    timestamps = np.fromiter((event.timestamp_ns for event in events), dtype=np.int64, count=count)
+    edges = np.fromiter((event.edge for event in events), dtype=np.uint8, count=count)
+    return timestamps, edges
+
+
+# Periodos (ns) entre flancos consecutivos del mismo tipo; por defecto, de subida
+def periods(timestamps, edges, edge=RISING_EDGE):
+    return np.diff(timestamps[edges == edge])
+
+
+# Frecuencia media (Hz) a partir del primer y el último flanco del tipo indicado; 0 si hay menos de dos
+def frequency(timestamps, edges, edge=RISING_EDGE):
+    selected = timestamps[edges == edge]
+    if selected.size < 2:
+        return 0.0
+    return (selected.size - 1) * NS_PER_S / float(selected[-1] - selected[0])
+
+
+# Anchos de pulso (ns): `level=1` mide de cada subida a la bajada siguiente, `level=0` al revés
+# Solo cuentan los pares consecutivos correctos; un flanco perdido no produce un ancho falso
+def pulse_widths(timestamps, edges, level=1):
+    start, end = (RISING_EDGE, FALLING_EDGE) if level else (FALLING_EDGE, RISING_EDGE)
+    pairs = np.flatnonzero((edges[:-1] == start) & (edges[1:] == end))
+    return timestamps[pairs + 1] - timestamps[pairs]
+
+
+# Ciclo de trabajo (0-1): tiempo en alto entre el tiempo total de los pulsos completos medidos
+def duty_cycle(timestamps, edges):
+    high = pulse_widths(timestamps, edges, 1).sum()
+    low = pulse_widths(timestamps, edges, 0).sum()
+    total = high + low
+    return float(high) / float(total) if total else 0.0
+
+
+# Histograma de anchos de pulso: devuelve (cuentas, límites en ns)
+# `bins` puede ser un número de intervalos o los límites explícitos, como en `np.histogram`
+def width_histogram(widths, bins=20, range_ns=None):
+    return np.histogram(widths, bins=bins, range=range_ns)
+
+
+# Estadísticas de rebotes: dos flancos separados menos de `period_ns` pertenecen a la misma ráfaga
+# Devuelve el número de ráfagas con rebotes, los flancos que son rebotes, el mayor número de flancos
+# en una ráfaga y la duración media y máxima (ns) de las ráfagas con rebotes
+def bounce_stats(timestamps, period_ns):
+    if timestamps.size < 2:
+        return {'bursts': 0, 'bounces': 0, 'max_edges': int(timestamps.size),
+                'mean_duration_ns': 0.0, 'max_duration_ns': 0}
+    close = np.diff(timestamps) < period_ns  # True si el flanco i+1 rebota respecto al i
+    burst = np.concatenate(([0], np.cumsum(~close)))  # Etiqueta de ráfaga de cada flanco
+    sizes = np.bincount(burst)
+    first = np.concatenate(([0], np.cumsum(sizes)[:-1]))  # Primer flanco de cada ráfaga
+    durations = timestamps[first + sizes - 1] - timestamps[first]
+    bouncing = sizes > 1
+    return {
+        'bursts': int(bouncing.sum()),
+        'bounces': int(close.sum()),
+        'max_edges': int(sizes.max()),
+        'mean_duration_ns': float(durations[bouncing].mean()) if bouncing.any() else 0.0,
+        'max_duration_ns': int(durations.max()),
+    }
+
+
+# Frecuencia (Hz) en ventanas deslizantes de `window_ns` que terminan cada `step_ns`
+# Devuelve (fin de cada ventana, frecuencia); cada ventana son dos búsquedas binarias, no un recorrido
+def sliding_frequency(timestamps, edges, window_ns, step_ns, edge=RISING_EDGE):
+    selected = timestamps[edges == edge]
+    if selected.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    ends = np.arange(selected[0] + window_ns, selected[-1] + step_ns, step_ns, dtype=np.int64)
+    counts = np.searchsorted(selected, ends, 'right') - np.searchsorted(selected, ends - window_ns, 'right')
+    return ends, counts * (NS_PER_S / window_ns)
+
+
+# Tiempo acumulado en alto hasta cada instante de `times`, a partir de los pulsos altos completos
+def _high_time(starts, ends, cumulative, times):
+    done = np.searchsorted(ends, times, 'right')  # Pulsos terminados antes de cada instante
+    high = cumulative[done]
+    pending = done < starts.size
+    partial = np.zeros(times.shape, dtype=np.int64)
+    index = done[pending]
+    partial[pending] = np.maximum(times[pending] - starts[index], 0)  # Pulso en curso en ese instante
+    return high + partial
+
+
+# Ciclo de trabajo en ventanas deslizantes de `window_ns` que terminan cada `step_ns`
+def sliding_duty(timestamps, edges, window_ns, step_ns):
+    pairs = np.flatnonzero((edges[:-1] == RISING_EDGE) & (edges[1:] == FALLING_EDGE))
+    if pairs.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    starts, ends = timestamps[pairs], timestamps[pairs + 1]
+    cumulative = np.concatenate(([0], np.cumsum(ends - starts)))
+    windows = np.arange(timestamps[0] + window_ns, timestamps[-1] + step_ns, step_ns, dtype=np.int64)
+    high = _high_time(starts, ends, cumulative, windows) - _high_time(starts, ends, cumulative, windows - window_ns)
+    return windows, high / window_ns
+
+
+# Resumen de una captura completa de una línea
+def summarize(timestamps, edges, debounce_ns):
+    high = pulse_widths(timestamps, edges, 1)
+    return {
+        'edges': int(timestamps.size),
+        'duration_s': float(timestamps[-1] - timestamps[0]) / NS_PER_S if timestamps.size else 0.0,
+        'frequency_hz': frequency(timestamps, edges),
+        'duty_cycle': duty_cycle(timestamps, edges),
+        'high_width_ns': {'min': int(high.min()), 'median': float(np.median(high)), 'max': int(high.max())}
+        if high.size else None,
+        'bounce': bounce_stats(timestamps, debounce_ns),
+    }
+
+
+# Clase que acumula métricas a medida que llegan lotes de flancos (por ejemplo, desde un lector de eventos)
+# En POO, esta clase guarda el estado entre lotes: el último flanco del lote anterior (para que los
+# periodos y pulsos que cruzan el límite entre lotes cuenten), los totales acumulados y la cola de lotes
+# de la última ventana de `window_ns` para las métricas recientes. Cada lote se procesa vectorizado y solo
+# una vez; la ventana se une en un array al pedir `stats()`
+class StreamingAnalyzer:
+    def __init__(self, window_ns=NS_PER_S, debounce_ns=0, width_bins=None):
+        self.window_ns = window_ns  # Duración de la ventana de las métricas recientes
+        self.debounce_ns = debounce_ns  # Separación mínima entre flancos para no contarlos como rebote
+        # Límites fijos del histograma de anchos en alto (ns), para poder sumarlo lote a lote
+        self.width_bins = np.asarray(width_bins if width_bins is not None else
+                                     np.logspace(3, 10, 29), dtype=np.float64)
+        self.width_counts = np.zeros(self.width_bins.size - 1, dtype=np.int64)
+        self.edges = 0  # Flancos procesados
+        self.rising = 0  # Flancos de subida procesados
+        self.bounces = 0  # Flancos separados del anterior menos de `debounce_ns`
+        self.high_ns = 0  # Tiempo total en alto de los pulsos completos
+        self.low_ns = 0  # Tiempo total en bajo de los pulsos completos
+        self._first_rising = None  # Primer y último flanco de subida, para la frecuencia media
+        self._last_rising = None
+        self._last = None  # (marca de tiempo, tipo) del último flanco procesado
+        # Lotes (marcas de tiempo, tipos) que cubren la ventana actual; se descartan lotes enteros cuando
+        # quedan fuera y el recorte exacto se hace solo al pedir `stats()`
+        self._chunks = deque()
+
+    # Procesa un lote de marcas de tiempo y tipos de flanco de una línea, en orden
+    # El coste depende solo del tamaño del lote, no de cuántos flancos haya en la ventana
+    def update(self, timestamps, edges):
+        timestamps = np.array(timestamps, dtype=np.int64)  # Copia: el lote se guarda en la ventana
+        edges = np.array(edges, dtype=np.uint8)
+        if timestamps.size == 0:
+            return
+        # Con el último flanco anterior delante, las diferencias que cruzan el límite del lote también cuentan
+        if self._last is not None:
+            joined_ts = np.concatenate(((self._last[0],), timestamps))
+            joined_edges = np.concatenate(((self._last[1],), edges))
+        else:
+            joined_ts, joined_edges = timestamps, edges
+        self._last = (timestamps[-1], edges[-1])
+        self.edges += timestamps.size
+        if self.debounce_ns:
+            self.bounces += int((np.diff(joined_ts) < self.debounce_ns).sum())
+        high = pulse_widths(joined_ts, joined_edges, 1)
+        self.high_ns += int(high.sum())
+        self.low_ns += int(pulse_widths(joined_ts, joined_edges, 0).sum())
+        self.width_counts += np.histogram(high, bins=self.width_bins)[0]
+        rising = timestamps[edges == RISING_EDGE]
+        if rising.size:
+            self.rising += rising.size
+            if self._first_rising is None:
+                self._first_rising = int(rising[0])
+            self._last_rising = int(rising[-1])
+        # La ventana conserva los lotes con algún flanco de los últimos `window_ns`
+        self._chunks.append((timestamps, edges))
+        limit = timestamps[-1] - self.window_ns
+        while self._chunks[0][0][-1] < limit:
+            self._chunks.popleft()
+
+    # Flancos de la última ventana de `window_ns`, como arrays contiguos
+    def window(self):
+        if not self._chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        timestamps = np.concatenate([chunk[0] for chunk in self._chunks])
+        edges = np.concatenate([chunk[1] for chunk in self._chunks])
+        start = np.searchsorted(timestamps, timestamps[-1] - self.window_ns, 'left')
+        return timestamps[start:], edges[start:]
+
+    # Manejador de lotes de `EdgeEvent`, para usarlo con `EventReader.run()` o `edge_recorder.replay()`
+    def feed(self, events):
+        self.update(*events_to_arrays(events))
+
+    # Métricas acumuladas desde el principio y de la última ventana
+    def stats(self):
+        total = self.high_ns + self.low_ns
+        span = (self._last_rising or 0) - (self._first_rising or 0)
+        timestamps, edges = self.window()
+        return {
+            'edges': self.edges,
+            'bounces': self.bounces,
+            'frequency_hz': (self.rising - 1) * NS_PER_S / span if span else 0.0,
+            'duty_cycle': self.high_ns / total if total else 0.0,
+            'window_frequency_hz': frequency(timestamps, edges),
+            'window_duty_cycle': duty_cycle(timestamps, edges),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Análisis vectorizado de una grabación de flancos')
+    parser.add_argument('file', help='grabación de edge_recorder.py')
+    parser.add_argument('--line', type=int, default=None, help='línea a analizar (por defecto, todas)')
+    parser.add_argument('--debounce', type=float, default=0.2, help='separación mínima entre flancos (s)')
+    parser.add_argument('--window', type=float, default=1.0, help='ventana deslizante (s)')
+    parser.add_argument('--bins', type=int, default=10, help='intervalos del histograma de anchos')
+    args = parser.parse_args()
+
+    timestamps, edges = line_arrays(load_recording(args.file), args.line)
+    if timestamps.size == 0:
+        print("no edges")
+        return
+    for key, value in summarize(timestamps, edges, int(args.debounce * NS_PER_S)).items():
+        print(f"{key}: {value}")
+    window_ns = int(args.window * NS_PER_S)
+    ends, hz = sliding_frequency(timestamps, edges, window_ns, window_ns)
+    if hz.size:
+        print(f"frequency per {args.window:g} s window: min {hz.min():.2f} Hz, max {hz.max():.2f} Hz")
+    widths = pulse_widths(timestamps, edges, 1)
+    if widths.size:
+        counts, bounds = width_histogram(widths, args.bins)
+        for count, low, high in zip(counts, bounds[:-1], bounds[1:]):
+            print(f"{low / 1e6:12.3f} - {high / 1e6:12.3f} ms {count:>10}")
+
+
+if __name__ == '__main__':
+    main()
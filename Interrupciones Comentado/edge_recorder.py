@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Grabación de flancos en un registro binario de ancho fijo y reproducción posterior
+# Uso:
+#   python3 edge_recorder.py record --chip gpiochip4 --offset 17 button_edges.bin
+#   python3 edge_recorder.py replay button_edges.bin --debounce 0.2 [--realtime]
+
+import argparse  # Importa argparse para los modos de grabación y reproducción
+import itertools  # Importa itertools para crear los `EdgeEvent` de una grabación sin un bucle en Python
+import mmap  # Importa mmap para escribir los registros en memoria, sin una llamada al sistema por flanco
+import os  # Importa os para crear, truncar y rotar los ficheros
+import struct  # Importa struct para el formato binario de ancho fijo
+import time  # Importa time para reproducir los flancos con su temporización original
+
+from event_reader import EdgeEvent  # Registro de flanco normalizado (línea, flanco, marca de tiempo)
+
+# Formato del fichero: una cabecera y después registros de 12 bytes en little-endian
+# Cada registro guarda el offset de la línea (uint16), el tipo de flanco (uint8, 1 = subida, 2 = bajada),
+# un byte de relleno y la marca de tiempo del kernel en ns (int64), en el mismo orden que `EdgeEvent`.
+# El fichero se crea con su tamaño máximo y los huecos quedan a cero: el primer registro con flanco 0
+# marca el final, así que un fichero sigue siendo legible aunque el proceso termine sin cerrarlo
+MAGIC = b'GPIOEDG1'  # Identificador y versión del formato
+HEADER = struct.Struct('<8sI4x')  # Identificador y tamaño de registro
+RECORD = struct.Struct('<HBxq')  # (línea, flanco, marca de tiempo en ns)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024  # Tamaño de cada fichero antes de rotar (unos 1,4 millones de flancos)
+DEFAULT_BACKUPS = 3  # Ficheros antiguos que se conservan al rotar (`path.1` es el más reciente)
+DEFAULT_BATCH_SIZE = 4096  # Flancos entregados por llamada al reproducir tan rápido como sea posible
+
+
+# Clase que añade flancos a un fichero proyectado en memoria y lo rota al llenarse
+# En POO, esta clase oculta el formato y la rotación: `record_batch()` solo copia cada flanco con
+# `pack_into` en la proyección, sin llamadas al sistema; el kernel escribe las páginas a disco por su cuenta.
+# Al llenarse, el fichero se recorta a lo usado y se rota como `logging.handlers.RotatingFileHandler`
+class EdgeRecorder:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        if max_bytes < HEADER.size + RECORD.size:
+            raise ValueError(f"max_bytes must be at least {HEADER.size + RECORD.size}")
+        self.path = path
+        self.backups = backups
+        self.capacity = (max_bytes - HEADER.size) // RECORD.size  # Registros por fichero
+        self.records = 0  # Flancos grabados en total
+        self.rotations = 0  # Ficheros completados y rotados
+        self._map = None
+        # Una grabación anterior con flancos no se sobrescribe: se rota como un fichero lleno
+        # (con `backups=0` se descarta); una que solo tiene la cabecera se reutiliza
+        if os.path.exists(path) and os.path.getsize(path) > HEADER.size:
+            self._shift_backups()
+        self._open()
+
+    def _open(self):
+        size = HEADER.size + self.capacity * RECORD.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)  # Fichero disperso: los huecos se leen como ceros
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)  # La proyección sigue siendo válida sin el descriptor
+        HEADER.pack_into(self._map, 0, MAGIC, RECORD.size)
+        self._position = HEADER.size
+        self._end = size
+
+    # Cierra el fichero actual recortándolo a los registros escritos
+    def _close_file(self):
+        used = self._position
+        self._map.close()
+        self._map = None
+        os.truncate(self.path, used)
+
+    # Desplaza los ficheros anteriores (`path.1` -> `path.2`...) y pasa el actual a `path.1`
+    def _shift_backups(self):
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+
+    # Cierra el fichero lleno, lo rota y abre uno nuevo
+    def _rotate(self):
+        self._close_file()
+        self._shift_backups()
+        self.rotations += 1
+        self._open()
+
+    # Graba un lote de `EdgeEvent`; es lo único que se hace en el camino caliente
+    def record_batch(self, events):
+        pack_into = RECORD.pack_into  # Referencias locales para acelerar el bucle caliente
+        size = RECORD.size
+        buffer, position, end = self._map, self._position, self._end
+        for line, edge, timestamp_ns in events:
+            if position == end:
+                self._position = position
+                self._rotate()
+                buffer, position, end = self._map, self._position, self._end
+            pack_into(buffer, position, line, edge, timestamp_ns)
+            position += size
+        self._position = position
+        self.records += len(events)
+
+    def record(self, event):
+        self.record_batch((event,))
+
+    # Pide al kernel que escriba a disco las páginas modificadas (msync); no hace falta en el camino caliente
+    def flush(self):
+        self._map.flush()
+
+    # Cierra el fichero actual, recortado a lo escrito, como un destructor en POO
+    def close(self):
+        if self._map is not None:
+            self._close_file()
+
+
+# Lector que graba cada lote antes de entregarlo; envuelve un EventReader, un DebouncedInput, etc.
+class RecordingReader:
+    def __init__(self, reader, recorder):
+        self._reader = reader
+        self.recorder = recorder
+
+    # Los demás atributos (fileno, release, stats...) se delegan en el lector envuelto
+    def __getattr__(self, name):
+        return getattr(self._reader, name)
+
+    def wait(self, timeout=None):
+        return self._reader.wait(timeout)
+
+    def read_batch(self):
+        batch = self._reader.read_batch()
+        if batch:
+            self.recorder.record_batch(batch)
+        return batch
+
+
+# Ficheros de una grabación rotada, del más antiguo al más reciente
+def recorded_files(path, backups=DEFAULT_BACKUPS):
+    files = [f"{path}.{index}" for index in range(backups, 0, -1) if os.path.exists(f"{path}.{index}")]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+# Lee todos los flancos de un fichero y los devuelve como una lista de `EdgeEvent`
+def load(path):
+    with open(path, 'rb') as record_file:
+        data = record_file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: truncated header")
+    magic, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path}: not an edge recording")
+    body = memoryview(data)[HEADER.size:]
+    count = len(body) // RECORD.size  # Un registro a medias al final se descarta
+    # Los huecos sin escribir están a cero: el final es el primer registro sin tipo de flanco.
+    # Los registros válidos son un prefijo del fichero, así que basta una búsqueda binaria sobre el byte del flanco
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if body[middle * RECORD.size + 2] == 0:
+            high = middle
+        else:
+            low = middle + 1
+    return list(itertools.starmap(EdgeEvent, RECORD.iter_unpack(body[:low * RECORD.size])))
+
+
+# Entrega los flancos grabados a `handler(lote)`, igual que un lector de eventos en cada despertar
+# `speed=None` reproduce tan rápido como sea posible, en lotes de `batch_size`; `speed=1.0` respeta la
+# temporización original (2.0 al doble de velocidad...) y agrupa en un lote los flancos ya vencidos,
+# como los acumularía la cola del kernel. Devuelve el número de flancos entregados
+def replay(events, handler, speed=None, batch_size=DEFAULT_BATCH_SIZE, clock=time.monotonic_ns):
+    if not events:
+        return 0
+    if speed is None:
+        for start in range(0, len(events), batch_size):
+            handler(events[start:start + batch_size])
+        return len(events)
+
+    origin = events[0].timestamp_ns
+    started = clock()
+    index = 0
+    total = len(events)
+    while index < total:
+        due = started + (events[index].timestamp_ns - origin) / speed
+        delay = due - clock()
+        if delay > 0:
+            time.sleep(delay / 1e9)
+        elapsed = (clock() - started) * speed + origin
+        end = index + 1
+        while end < total and events[end].timestamp_ns <= elapsed:
+            end += 1
+        handler(events[index:end])
+        index = end
+    return total
+
+
+# Graba los flancos de una línea hasta CTRL+C
+def _record(args):
+    import gpiod
+    from event_reader import EventReader
+
+    chip = gpiod.Chip(args.chip)
+    line = chip.get_line(args.offset)
+    line.request(consumer='EdgeRecorder', type=gpiod.LINE_REQ_EV_BOTH_EDGES)
+    recorder = EdgeRecorder(args.file, args.max_bytes, args.backups)
+    reader = RecordingReader(EventReader(line, both_edges=True), recorder)
+    try:
+        while True:
+            if reader.wait(1):
+                reader.read_batch()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+        line.release()
+        chip.close()
+        print(f"{recorder.records} edges recorded, {recorder.rotations} rotations, "
+              f"{reader.dropped} dropped by the kernel")
+
+
+# Reproduce una grabación (con sus ficheros rotados) a través del filtro de rebotes de 7/8
+def _replay(args):
+    from debounce import SoftwareDebouncer
+
+    events = []
+    for path in recorded_files(args.file, args.backups):
+        events.extend(load(path))
+    debouncer = SoftwareDebouncer(args.debounce)
+    accepted = []
+
+    def handler(batch):
+        accepted.extend(debouncer.filter(batch))
+
+    start = time.perf_counter()
+    count = replay(events, handler, 1.0 if args.realtime else None)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"{count} edges replayed in {elapsed:.3f} s ({rate / 1e6:.2f} M edges/s): "
+          f"{len(accepted)} accepted, {debouncer.suppressed} suppressed as bounces")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grabación y reproducción de flancos')
+    modes = parser.add_subparsers(dest='mode', required=True)
+    record = modes.add_parser('record', help='graba los flancos de una línea hasta CTRL+C')
+    record.add_argument('file', help='fichero de grabación')
+    record.add_argument('--chip', default='gpiochip4', help='chip GPIO a usar')
+    record.add_argument('--offset', type=int, default=17, help='línea a grabar')
+    record.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES, help='tamaño de cada fichero')
+    record.add_argument('--backups', type=int, default=DEFAULT_BACKUPS, help='ficheros antiguos que se conservan')
+    replay_mode = modes.add_parser('replay', help='reproduce una grabación a través del filtro de rebotes')
+    replay_mode.add_argument('file', help='fichero de grabación')
+    replay_mode.add_argument('--debounce', type=float, default=0.2, help='periodo de debounce (s)')
+    replay_mode.add_argument('--realtime', action='store_true', help='respeta la temporización original')
+    replay_mode.add_argument('--backups', type=int, default=DEFAULT_BACKUPS, help='ficheros antiguos a incluir')
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        _record(args)
+    else:
+        _replay(args)
+
+
+if __name__ == '__main__':
+    main()
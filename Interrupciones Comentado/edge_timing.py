@@ -0,0 +1,46 @@
+from event_reader import RISING_EDGE, FALLING_EDGE  # Tipos de flanco normalizados del lector de eventos
+
+NS_PER_MS = 1000000  # Nanosegundos por milisegundo, para mostrar duraciones legibles
+
+
+# Clasifica un flanco a partir del tipo que trae el propio evento, sin volver a leer la línea
+# `active_low` indica que el botón pone la línea a 0 al pulsarse (por ejemplo, con pull-up)
+def is_press(event, active_low=False):
+    return (event.edge == FALLING_EDGE) if active_low else (event.edge == RISING_EDGE)
+
+
+# Clase que sigue el estado del botón usando solo el tipo de flanco y la marca de tiempo del kernel
+# En POO, esta clase encapsula el estado (pulsado o no) y los tiempos de la última pulsación,
+# de modo que las duraciones se miden con la precisión del kernel y sin llamadas extra al sistema
+class PressTracker:
+    def __init__(self, on_press=None, on_release=None, active_low=False):
+        self.on_press = on_press  # Callback on_press(event, interval_ns): intervalo desde la pulsación anterior
+        self.on_release = on_release  # Callback on_release(event, duration_ns): tiempo que estuvo pulsado
+        self.press_edge = FALLING_EDGE if active_low else RISING_EDGE  # Flanco que corresponde a pulsar
+        self.pressed = False  # Estado actual del botón según los flancos recibidos
+        self.press_ns = None  # Marca de tiempo (ns) de la última pulsación
+        self.last_interval_ns = None  # Tiempo entre las dos últimas pulsaciones
+        self.last_duration_ns = None  # Duración de la última pulsación completa
+
+    # Procesa un lote de eventos `EdgeEvent` en orden de llegada
+    def feed(self, events):
+        press_edge = self.press_edge
+        for event in events:
+            timestamp_ns = event.timestamp_ns
+            if event.edge == press_edge:
+                if self.pressed:  # Flanco repetido (se perdió el de liberación); se ignora
+                    continue
+                interval_ns = None if self.press_ns is None else timestamp_ns - self.press_ns
+                self.pressed = True
+                self.press_ns = timestamp_ns
+                self.last_interval_ns = interval_ns
+                if self.on_press is not None:
+                    self.on_press(event, interval_ns)
+            else:
+                if not self.pressed:  # Liberación sin pulsación previa conocida; se ignora
+                    continue
+                duration_ns = timestamp_ns - self.press_ns
+                self.pressed = False
+                self.last_duration_ns = duration_ns
+                if self.on_release is not None:
+                    self.on_release(event, duration_ns)
@@ -0,0 +1,259 @@
+import select  # Importa select para esperar sobre los descriptores de las líneas sin hacer polling
+from collections import namedtuple  # Importa namedtuple para crear registros de evento ligeros
+from operator import itemgetter  # Importa itemgetter para ordenar los lotes por marca de tiempo
+
+# Tipos de flanco normalizados, iguales para libgpiod v1 y v2
+RISING_EDGE = 1  # Flanco de subida
+FALLING_EDGE = 2  # Flanco de bajada
+
+# Registro de un flanco: offset de la línea, tipo de flanco y marca de tiempo del kernel (ns)
+EdgeEvent = namedtuple('EdgeEvent', ['line', 'edge', 'timestamp_ns'])
+
+# En libgpiod v1 `event_read_multiple()` devuelve como máximo 16 eventos por lectura
+V1_READ_MAX = 16
+
+# Tamaño por defecto del lote leído de una sola vez en libgpiod v2
+DEFAULT_BATCH_SIZE = 64
+
+_timestamp = itemgetter(2)  # Clave de ordenación: la marca de tiempo de un `EdgeEvent`
+# Construye un `EdgeEvent` desde C, sin pasar por el `__new__` en Python de namedtuple (la mitad de coste)
+_new_event = tuple.__new__
+
+
+# Clase que vacía la cola de eventos del kernel en cada despertar y entrega los flancos por lotes
+# En POO, esta clase encapsula la diferencia entre libgpiod v1 (una línea, un descriptor)
+# y libgpiod v2 (una petición `LineRequest` con un único descriptor y un buffer reutilizable)
+class EventReader:
+    def __init__(self, source, batch_size=DEFAULT_BATCH_SIZE, both_edges=False):
+        # `source` puede ser una línea v1, una lista/LineBulk de líneas v1 o un `LineRequest` v2
+        # Máximo de eventos por lectura en v2 (el buffer se fija al pedir la línea); en v1 con varias líneas,
+        # límite aproximado del lote para que la entrada continua no alargue sin fin cada despertar
+        self.batch_size = batch_size
+        self.both_edges = both_edges  # Si se piden ambos flancos, dos flancos iguales seguidos indican pérdida
+        self.events = 0  # Número total de flancos entregados a los callbacks
+        self.wakeups = 0  # Número de despertares con al menos un flanco
+        self.dropped = 0  # Número de flancos que el kernel descartó (cola llena)
+        self.attach(source)
+
+    # Asocia el lector a otra fuente conservando el objeto y sus contadores; lo usa `LineGroup.reconfigure`
+    # cuando vuelve a pedir las líneas, para que quien guardó el lector no se quede con descriptores cerrados
+    def attach(self, source, both_edges=None):
+        if both_edges is not None:
+            self.both_edges = both_edges
+        import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+        if hasattr(source, 'read_edge_events'):  # libgpiod v2: un descriptor para toda la petición
+            self._request = source
+            self._lines = []
+            self._fds = [source.fd]
+            self._rising = gpiod.EdgeEvent.Type.RISING_EDGE
+            self._last_seqno = 0  # Último número de secuencia global visto, para contar pérdidas
+            self._read = self._read_v2
+        else:  # libgpiod v1: un descriptor por línea
+            lines = [source] if hasattr(source, 'event_read_multiple') else list(source)
+            self._request = None
+            self._lines = [(line.event_get_fd(), line, line.offset()) for line in lines]
+            self._fds = [fd for fd, _, _ in self._lines]
+            self._rising = gpiod.LineEvent.RISING_EDGE
+            self._last_edge = {}  # Último flanco visto por línea, para detectar pérdidas en modo ambos flancos
+            self._read = self._read_v1_line if len(lines) == 1 else self._read_v1
+        self._held = []  # Flancos ya leídos que se entregan en el lote siguiente para no desordenar los lotes
+        self._ready = False  # True si `wait()` acaba de ver eventos: la primera lectura no necesita otro select
+
+    # Devuelve el descriptor de la primera línea, útil para registrarlo en otros bucles de eventos
+    def fileno(self):
+        return self._fds[0]
+
+    # Todos los descriptores vigilados (uno en v2; uno por línea en v1), para esperar varios lectores a la vez
+    @property
+    def fds(self):
+        return list(self._fds)
+
+    # Espera hasta que haya eventos pendientes o venza `timeout` (segundos, None = sin límite)
+    def wait(self, timeout=None):
+        if self._held:
+            return True
+        ready, _, _ = select.select(self._fds, [], [], timeout)
+        self._ready = bool(ready)
+        return self._ready
+
+    # Lee todos los flancos pendientes sin bloquear y los devuelve como una lista de `EdgeEvent`
+    # El coste fijo por despertar (llamadas al sistema, creación de objetos) se paga una vez por lote:
+    # con un flanco por despertar debe costar lo mismo que `event_wait()` + `event_read()`
+    def read_batch(self):
+        batch = self._read()
+        if batch:
+            self.events += len(batch)
+            self.wakeups += 1
+        return batch
+
+    def _read_v2(self):
+        request = self._request
+        rising = self._rising
+        batch = []
+        append = batch.append  # Referencia local para acelerar el bucle caliente
+        last_seqno = self._last_seqno
+        ready = self._ready or request.wait_edge_events(0)
+        self._ready = False
+        # Una sola lectura masiva por iteración; se repite solo si el lote salió lleno
+        while ready:
+            events = request.read_edge_events(self.batch_size)
+            for event in events:
+                seqno = event.global_seqno
+                if last_seqno and seqno != last_seqno + 1:  # Hueco en la secuencia: el kernel descartó eventos
+                    self.dropped += seqno - last_seqno - 1
+                last_seqno = seqno
+                append(_new_event(EdgeEvent, (event.line_offset,
+                                              RISING_EDGE if event.event_type == rising else FALLING_EDGE,
+                                              event.timestamp_ns)))
+            if len(events) < self.batch_size:
+                break
+            ready = request.wait_edge_events(0)
+        self._last_seqno = last_seqno
+        return batch
+
+    # Una sola línea v1: sin ordenación ni diccionarios por flanco; el último flanco visto se guarda al final
+    def _read_v1_line(self):
+        if not self._ready:
+            ready, _, _ = select.select(self._fds, [], [], 0)
+            if not ready:
+                return []
+        self._ready = False
+        _, line, offset = self._lines[0]
+        rising = self._rising
+        both_edges = self.both_edges
+        last = self._last_edge.get(offset)
+        dropped = 0
+        batch = []
+        append = batch.append  # Referencia local para acelerar el bucle caliente
+        while True:
+            events = line.event_read_multiple()
+            for event in events:
+                edge = RISING_EDGE if event.type == rising else FALLING_EDGE
+                if edge == last and both_edges:  # Dos flancos iguales seguidos: se perdió al menos uno
+                    dropped += 1
+                last = edge
+                append(_new_event(EdgeEvent, (offset, edge, event.sec * 1000000000 + event.nsec)))
+            # Una lectura incompleta ya vació la cola; con entrada continua el lote se corta en `batch_size`
+            if len(events) < V1_READ_MAX or len(batch) >= self.batch_size:
+                break
+            ready, _, _ = select.select(self._fds, [], [], 0)
+            if not ready:
+                break
+        self._last_edge[offset] = last
+        self.dropped += dropped
+        return batch
+
+    # Lee una vez la cola de cada línea v1 lista; anota la marca de tiempo de su último flanco en `last_read`
+    # y devuelve True si alguna lectura salió llena (puede quedar más en esa cola)
+    def _read_lines(self, ready, batch, last_read):
+        rising = self._rising
+        both_edges = self.both_edges
+        last_edge = self._last_edge
+        append = batch.append  # Referencia local para acelerar el bucle caliente
+        full = False
+        for fd, line, offset in self._lines:
+            if fd not in ready:
+                continue
+            events = line.event_read_multiple()
+            for event in events:
+                edge = RISING_EDGE if event.type == rising else FALLING_EDGE
+                if both_edges:
+                    if last_edge.get(offset) == edge:  # Dos flancos iguales seguidos: se perdió al menos uno
+                        self.dropped += 1
+                    last_edge[offset] = edge
+                append(_new_event(EdgeEvent, (offset, edge, event.sec * 1000000000 + event.nsec)))
+            if events:
+                last_read[fd] = batch[-1][2]
+            full = full or len(events) == V1_READ_MAX
+        return full
+
+    # Varias líneas v1, cada una con su descriptor y su cola
+    def _read_v1(self):
+        self._ready = False  # Hace falta el select para saber qué líneas están listas
+        batch = self._held  # Flancos retenidos en el lote anterior (ver más abajo), más antiguos que los nuevos
+        self._held = []
+        fds = self._fds
+        last_read = {}  # Marca de tiempo del último flanco leído de cada descriptor en este lote
+
+        # Cada línea tiene su propia cola: se repite hasta que ninguna tenga eventos, para que un flanco más
+        # antiguo de otra línea no quede para el lote siguiente detrás de uno más reciente de esta, pero solo
+        # hasta unos `batch_size` flancos: con entrada continua el resto queda para el despertar siguiente
+        cut = False
+        ready, _, _ = select.select(fds, [], [], 0)
+        while ready:
+            self._read_lines(ready, batch, last_read)
+            if len(batch) >= self.batch_size:
+                cut = True
+                break
+            ready, _, _ = select.select(fds, [], [], 0)
+
+        # El lote se ordena por tiempo, como en v2
+        # (son tramos ya ordenados, así que la ordenación es casi una mezcla lineal)
+        if cut:
+            # Al cortar, las colas que aún tienen flancos pueden guardar alguno más antiguo que los últimos
+            # leídos de otras líneas. Se lee una vez cada línea lista que no se haya leído en este lote, para
+            # conocer su flanco más antiguo, y solo se entrega lo que no sea posterior al último flanco leído
+            # de ninguna línea con flancos pendientes; el resto se retiene para el lote siguiente
+            ready, _, _ = select.select(fds, [], [], 0)
+            self._read_lines([fd for fd in ready if fd not in last_read], batch, last_read)
+            batch.sort(key=_timestamp)
+            ready, _, _ = select.select(fds, [], [], 0)
+            pending = [last_read[fd] for fd in ready if fd in last_read]
+            if pending:
+                cutoff = min(pending)
+                index = len(batch)
+                while index and batch[index - 1][2] > cutoff:
+                    index -= 1
+                self._held = batch[index:]
+                del batch[index:]
+        elif batch:
+            batch.sort(key=_timestamp)
+        return batch
+
+    # Bucle principal: espera, vacía la cola y entrega el lote completo al callback
+    # Si se indica `timeout`, `on_timeout()` se llama cada vez que vence sin eventos
+    def run(self, callback, timeout=None, on_timeout=None):
+        while True:
+            if self.wait(timeout):
+                batch = self.read_batch()
+                if batch:
+                    callback(batch)
+            elif on_timeout is not None:
+                on_timeout()
+
+
+# Comprobación del orden entre lotes con varias líneas v1 sobre el simulador: python3 event_reader.py
+# 150 flancos en la línea 5 mezclados con 10 en la línea 6 (más de dos lotes): cada lote y la sucesión de
+# lotes deben salir ordenados por tiempo, sin perder ni repetir flancos
+def _check():
+    import random
+    import gpio_stub
+    gpio_stub.install()
+    gpio_stub.KERNEL_QUEUE_SIZE = 256  # Cabe todo el tren sin descartes; las lecturas siguen siendo de 16
+
+    chip = gpio_stub.Chip('gpiochip4')
+    lines = [chip.get_line(5), chip.get_line(6)]
+    for line in lines:
+        line.request(consumer='check', type=gpio_stub.LINE_REQ_EV_BOTH_EDGES)
+    try:
+        order = [5] * 150 + [6] * 10
+        random.Random(1).shuffle(order)
+        for offset in order:
+            chip.inject(offset, chip.get_line(offset).get_value() ^ 1)
+        reader = EventReader(lines, both_edges=True)
+        batches = []
+        while reader.wait(0):
+            batches.append(reader.read_batch())
+        timestamps = [event.timestamp_ns for batch in batches for event in batch]
+        assert len(batches) > 1, [len(batch) for batch in batches]
+        assert len(timestamps) == len(order), (len(timestamps), len(order))
+        assert timestamps == sorted(timestamps), "timestamps go backwards between batches"
+        assert [event.line for batch in batches for event in batch] == order
+        assert reader.dropped == 0, reader.dropped
+    finally:
+        chip.close()
+    print("event reader check passed:", [len(batch) for batch in batches])
+
+
+if __name__ == '__main__':
+    _check()
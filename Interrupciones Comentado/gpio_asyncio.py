@@ -0,0 +1,77 @@
+import asyncio  # Importa asyncio para integrar las líneas GPIO en un bucle de eventos
+from collections import deque  # Cola de eventos ya leídos y pendientes de entregar
+
+from event_reader import EventReader  # Lector que vacía la cola de eventos del kernel en cada despertar
+
+
+# Descriptores que hay que vigilar para `reader`: con libgpiod v1 hay uno por línea, así que una fuente de
+# varias líneas (EventReader sobre una lista, LineGroup, o un envoltorio con `.reader`) los expone en `fds`
+def _source_fds(reader):
+    fds = getattr(reader, 'fds', None)
+    if fds is None:
+        fds = getattr(getattr(reader, 'reader', None), 'fds', None)
+    return list(fds) if fds is not None else [reader.fileno()]
+
+
+# Clase que adapta una línea GPIO a asyncio registrando sus descriptores con `loop.add_reader()`
+# En POO, esta clase actúa como un adaptador: el bucle de asyncio avisa cuando un descriptor es legible,
+# se vacía la cola del kernel de una vez y los eventos se entregan a quien los espera con `await`.
+# Así muchas líneas y la E/S de red comparten un solo hilo sin polling ni un hilo por pin
+class AsyncLine:
+    def __init__(self, source):
+        # `source` puede ser cualquier objeto con `fileno()` y `read_batch()` (EventReader, LineGroup,
+        # DebouncedInput) o una línea/petición de gpiod, que se envuelve en un EventReader
+        self.reader = source if hasattr(source, 'read_batch') else EventReader(source)
+        self._fds = _source_fds(self.reader)  # Descriptores que vigila el bucle de eventos (uno por línea en v1)
+        self._pending = deque()  # Eventos leídos que aún no se han entregado
+        self._ready = asyncio.Event()  # Se activa cuando hay eventos pendientes
+        self._loop = None  # Bucle de eventos en el que está registrado el descriptor
+        self._watching = False  # True mientras el descriptor está registrado con `add_reader`
+
+    # Registra los descriptores en el bucle en ejecución si todavía no lo están
+    def _watch(self):
+        if not self._watching:
+            self._loop = asyncio.get_running_loop()
+            for fd in self._fds:
+                self._loop.add_reader(fd, self._on_readable)
+            self._watching = True
+
+    # Deja de vigilar los descriptores; mientras nadie consuma, los eventos esperan en la cola del kernel
+    def _unwatch(self):
+        if self._watching:
+            for fd in self._fds:
+                self._loop.remove_reader(fd)
+            self._watching = False
+
+    # Callback del bucle de eventos: un descriptor es legible, se vacía la cola del kernel de una vez
+    def _on_readable(self):
+        batch = self.reader.read_batch()
+        if batch:
+            self._pending.extend(batch)
+            self._unwatch()  # No se vuelve a leer hasta que se consuma lo pendiente
+            self._ready.set()
+
+    # Espera el siguiente flanco como mucho `timeout` segundos (None = sin límite)
+    # Devuelve el `EdgeEvent` o None si vence el tiempo
+    async def wait_edge(self, timeout=None):
+        if not self._pending:
+            self._ready.clear()
+            self._watch()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._pending.popleft()
+
+    # Generador asíncrono de flancos: `async for event in line.events()`
+    # Entrega sin esperar todos los eventos del lote ya leído antes de volver a ceder el control
+    async def events(self):
+        while True:
+            event = await self.wait_edge()
+            yield event
+            while self._pending:
+                yield self._pending.popleft()
+
+    # Quita los descriptores del bucle de eventos (no libera la línea, que sigue siendo de su dueño)
+    def close(self):
+        self._unwatch()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Cliente mínimo del proceso auxiliar (gpio_helper.py): solo importa módulos en C para arrancar rápido
+# Uso: python3 -S gpio_client.py toggle 18          (-S evita cargar site y ahorra unos milisegundos)
+#      python3 -S gpio_client.py pulse 18 0.5
+#      python3 -S gpio_client.py read 17
+# Varias órdenes en una misma conexión, separadas por comas: python3 -S gpio_client.py set 18 1, read 17
+
+import _socket  # Importa el módulo en C de sockets: `socket` carga además enum y selectors (más de 10 ms)
+import sys  # Importa sys para leer la orden y devolver el código de salida
+
+DEFAULT_SOCKET = '/tmp/gpio-helper.sock'  # Ruta por defecto del socket, la misma que usa gpio_helper.py
+
+
+# Envía las órdenes por una sola conexión y devuelve las respuestas en el mismo orden
+def send(commands, path=DEFAULT_SOCKET):
+    client = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+        client.sendall(''.join(command + '\n' for command in commands).encode())
+        data = b''
+        while data.count(b'\n') < len(commands):
+            chunk = client.recv(4096)
+            if not chunk:
+                raise ConnectionError("the helper closed the connection")
+            data += chunk
+    finally:
+        client.close()
+    return data.decode().splitlines()
+
+
+def main():
+    import os  # Ya está cargado por el intérprete; solo se usa para la ruta del socket
+    path = os.environ.get('GPIO_HELPER_SOCKET', DEFAULT_SOCKET)
+    commands = [command.strip() for command in ' '.join(sys.argv[1:]).split(',') if command.strip()]
+    if not commands:
+        sys.stderr.write("usage: gpio_client.py <set|toggle|pulse|read|ping> ...\n")
+        return 2
+    replies = send(commands, path)
+    for reply in replies:
+        print(reply)
+    return 0 if all(reply.startswith('ok') for reply in replies) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
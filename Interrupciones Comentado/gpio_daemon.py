@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# Demonio GPIO: un solo proceso para muchos botones y LEDs descritos en un fichero de configuración
+# Uso: python3 gpio_daemon.py daemon_example.json
+# Cada entrada del fichero asocia una línea de entrada con una salida y un comportamiento:
+#   toggle : cada pulsación alterna la salida (como 7_event_led_toggle.py)
+#   follow : la salida sigue al botón mientras está pulsado (como 6_event_led_button.py)
+#   blink  : cada pulsación activa o desactiva el parpadeo de la salida (como 8_event_blink.py)
+
+import abc  # Importa abc para declarar `Rule.handle` como método que cada comportamiento debe definir
+import argparse  # Importa argparse para leer la ruta del fichero de configuración
+import json  # Importa json para cargar la configuración declarativa
+import select  # Importa select para esperar a la vez sobre los descriptores de todos los chips
+
+from async_log import AsyncLog  # Registro por lotes en un hilo aparte, sin print() en el camino caliente
+from debounce import DEBOUNCE_TIME, SoftwareDebouncer  # Filtro de rebotes por marcas de tiempo del kernel
+from edge_timing import is_press  # Clasifica el flanco con el tipo que trae el propio evento
+from line_group import INPUT, OUTPUT, LineGroup, open_chip  # Grupo de líneas pedido en una sola petición
+from line_manager import exit_on_signals  # CTRL+C y SIGTERM salen por `finally`
+from metrics import InstrumentedReader, Registry, serve_http  # Contadores, histogramas y endpoint de métricas
+from output_scheduler import OutputScheduler  # Programador de salidas por vencimientos, sin esperas bloqueantes
+
+DEFAULT_CHIP = 'gpiochip4'  # Chip usado si una entrada no indica otro, el de los ejemplos
+BLINK_TIME = 0.5  # Semiperiodo de parpadeo por defecto, el mismo que usa 8_event_blink.py
+CONSUMER = 'gpio-daemon'  # Nombre con el que se piden las líneas al kernel
+
+
+# Salidas de un chip pedidas en bloque; los cambios de un despertar se escriben con una sola llamada
+class _OutputBank:
+    def __init__(self, chip, offsets):
+        self.offsets = sorted(set(offsets))  # Varias reglas pueden compartir una salida
+        self.values = [0] * len(self.offsets)  # Último valor pedido para cada salida
+        self.dirty = False  # True si hay valores pendientes de escribir
+        # Un único objeto por salida: `OutputScheduler` guarda su estado por objeto, así que dos reglas
+        # sobre la misma salida deben recibir el mismo
+        self._pins = {offset: _OutputPin(self, index) for index, offset in enumerate(self.offsets)}
+        self.group = LineGroup(chip, self.offsets, OUTPUT, consumer=CONSUMER)
+
+    # Devuelve el objeto con `set_value()` de una salida, para las reglas y el programador de salidas
+    def pin(self, offset):
+        return self._pins[offset]
+
+    # Escribe todas las salidas si alguna cambió desde la última escritura
+    def flush(self):
+        if self.dirty:
+            self.group.set_values(self.values)
+            self.dirty = False
+
+
+# Una salida dentro de un `_OutputBank`: solo anota el valor, la escritura la hace `flush()`
+class _OutputPin:
+    __slots__ = ('bank', 'index')
+
+    def __init__(self, bank, index):
+        self.bank = bank
+        self.index = index
+
+    @property
+    def value(self):
+        return self.bank.values[self.index]
+
+    def set_value(self, value):
+        self.bank.values[self.index] = value
+        self.bank.dirty = True
+
+
+# Regla base: una entrada, una salida y el filtro de rebotes propio de la entrada
+# En POO, es una clase abstracta: cada comportamiento de `BEHAVIOURS` la extiende definiendo `handle()`
+class Rule(abc.ABC):
+    def __init__(self, name, output, debounce, active_low, log, scheduler):
+        self.name = name  # Nombre de la regla, para el registro
+        self.output = output  # Salida controlada por la regla
+        self.active_low = active_low  # True si el botón pone la línea a 0 al pulsarse
+        self.debouncer = SoftwareDebouncer(debounce, active_low=active_low) if debounce else None
+        self.log = log
+        self.scheduler = scheduler
+
+    # Procesa un flanco de la entrada, descartándolo si es un rebote
+    def feed(self, event):
+        if self.debouncer is not None and not self.debouncer.filter((event,)):
+            return
+        self.handle(event, is_press(event, self.active_low))
+
+    # Reacciona a un flanco ya filtrado; `pressed` indica si el botón quedó pulsado
+    @abc.abstractmethod
+    def handle(self, event, pressed):
+        pass
+
+
+# Cada pulsación alterna la salida
+class ToggleRule(Rule):
+    def handle(self, event, pressed):
+        if pressed:
+            value = 1 - self.output.value
+            self.output.set_value(value)
+            self.log.event(event, "{}: LED {}", (self.name, 'on' if value else 'off'))
+
+
+# La salida sigue al botón
+class FollowRule(Rule):
+    def handle(self, event, pressed):
+        self.output.set_value(1 if pressed else 0)
+        self.log.event(event, f"{self.name}: button pressed!" if pressed else f"{self.name}: button released!")
+
+
+# Cada pulsación activa o desactiva el parpadeo de la salida
+class BlinkRule(Rule):
+    def __init__(self, name, output, debounce, active_low, log, scheduler, blink_time=BLINK_TIME):
+        super().__init__(name, output, debounce, active_low, log, scheduler)
+        self.blink_time = blink_time  # Tiempo encendido y apagado en cada ciclo
+        self.blinking = False
+
+    def handle(self, event, pressed):
+        if not pressed:
+            return
+        self.blinking = not self.blinking
+        if self.blinking:
+            self.scheduler.blink(self.output, self.blink_time, self.blink_time)
+        else:
+            self.scheduler.stop(self.output, 0)
+        self.log.event(event, "{}: blinking {}", (self.name, 'enabled' if self.blinking else 'disabled'))
+
+
+# Comportamientos admitidos y su debounce por defecto (6_event_led_button.py no filtra rebotes)
+BEHAVIOURS = {
+    'toggle': (ToggleRule, DEBOUNCE_TIME),
+    'follow': (FollowRule, 0),
+    'blink': (BlinkRule, DEBOUNCE_TIME),
+}
+
+
+# Carga y valida la configuración; devuelve un diccionario con la lista `pins` completa con los valores por defecto
+# Formato: {"metrics_port": 9100, "pins": [{"name": ..., "chip": ..., "input": 17, "output": 18,
+#           "behaviour": "toggle", "debounce": 0.2, "active_low": false, "blink_time": 0.5}, ...]}
+def load_config(path):
+    with open(path, encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    pins = []
+    used = set()
+    for index, entry in enumerate(config.get('pins', [])):
+        behaviour = entry.get('behaviour')
+        if behaviour not in BEHAVIOURS:
+            raise ValueError(f"pins[{index}]: behaviour must be one of {tuple(BEHAVIOURS)}")
+        if 'input' not in entry or 'output' not in entry:
+            raise ValueError(f"pins[{index}]: 'input' and 'output' are required")
+        pin = {
+            'name': entry.get('name', f"pin{entry['input']}"),
+            'chip': entry.get('chip', DEFAULT_CHIP),
+            'input': int(entry['input']),
+            'output': int(entry['output']),
+            'behaviour': behaviour,
+            'debounce': float(entry.get('debounce', BEHAVIOURS[behaviour][1])),
+            'active_low': bool(entry.get('active_low', False)),
+        }
+        if pin['debounce'] < 0:
+            raise ValueError(f"pins[{index}]: debounce must not be negative")
+        if behaviour == 'blink':
+            pin['blink_time'] = float(entry.get('blink_time', BLINK_TIME))
+            if pin['blink_time'] <= 0:
+                raise ValueError(f"pins[{index}]: blink_time must be positive")
+        key = (pin['chip'], pin['input'])
+        if key in used:
+            raise ValueError(f"pins[{index}]: input {pin['input']} of {pin['chip']} is already used")
+        used.add(key)
+        pins.append(pin)
+    if not pins:
+        raise ValueError("the configuration has no pins")
+    # Una línea no puede ser a la vez entrada y salida (varias reglas sí pueden compartir una salida)
+    for index, pin in enumerate(pins):
+        if (pin['chip'], pin['output']) in used:
+            raise ValueError(f"pins[{index}]: output {pin['output']} of {pin['chip']} is also used as an input")
+    return {'metrics_port': config.get('metrics_port'), 'pins': pins}
+
+
+# Clase que sirve todas las reglas de la configuración desde un único bucle
+# En POO, esta clase agrupa los recursos de muchos pines: abre cada chip una sola vez, pide todas sus
+# entradas en un `LineGroup` (un descriptor por chip en libgpiod v2) y todas sus salidas en otro, y
+# espera sobre los descriptores de todos los chips con un solo `select()`. El parpadeo usa el mismo
+# `OutputScheduler` para todas las salidas y los cambios de cada despertar se escriben en bloque
+class GpioDaemon:
+    def __init__(self, pins, log, registry=None):
+        self.log = log
+        self.scheduler = OutputScheduler()
+        self._chips = {}  # Chips abiertos, por nombre
+        self._banks = []  # Salidas en bloque de cada chip
+        self._inputs = []  # (nombre del chip, lector de entradas, reglas por offset) de cada chip
+        self._fds = {}  # Descriptor -> índice en `_inputs`
+        try:
+            self._setup(pins, registry)
+        except BaseException:  # Si algo falla a medias, no se dejan líneas pedidas
+            self.close()
+            raise
+
+    def _setup(self, pins, registry):
+        by_chip = {}
+        for pin in pins:
+            by_chip.setdefault(pin['chip'], []).append(pin)
+        for chip_name, chip_pins in by_chip.items():
+            chip = open_chip(chip_name)
+            self._chips[chip_name] = chip
+            bank = _OutputBank(chip, [pin['output'] for pin in chip_pins])
+            self._banks.append(bank)
+            rules = {}
+            for pin in chip_pins:
+                rule_class = BEHAVIOURS[pin['behaviour']][0]
+                extra = {'blink_time': pin['blink_time']} if 'blink_time' in pin else {}
+                rules[pin['input']] = rule_class(pin['name'], bank.pin(pin['output']), pin['debounce'],
+                                                 pin['active_low'], self.log, self.scheduler, **extra)
+            reader = LineGroup(chip, sorted(rules), INPUT, edge='both', consumer=CONSUMER)
+            if registry is not None:
+                reader = InstrumentedReader(reader, registry, chip_name)
+            self._inputs.append((chip_name, reader, rules))
+            for fd in reader.reader.fds:
+                self._fds[fd] = len(self._inputs) - 1
+
+    # Número de líneas pedidas (entradas y salidas) entre todos los chips
+    @property
+    def lines(self):
+        return (sum(len(rules) for _, _, rules in self._inputs) +
+                sum(len(bank.offsets) for bank in self._banks))
+
+    # Una iteración del bucle: espera flancos o el próximo vencimiento de las salidas, los procesa y
+    # escribe en bloque las salidas que cambiaron. Devuelve el número de flancos procesados
+    def run_once(self, timeout=None):
+        scheduled = self.scheduler.timeout()
+        if scheduled is not None and (timeout is None or scheduled < timeout):
+            timeout = scheduled
+        ready, _, _ = select.select(list(self._fds), [], [], timeout)
+        count = 0
+        for index in {self._fds[fd] for fd in ready}:
+            _, reader, rules = self._inputs[index]
+            batch = reader.read_batch()
+            for event in batch:
+                rules[event.line].feed(event)
+            count += len(batch)
+        self.scheduler.run_due()
+        for bank in self._banks:
+            bank.flush()
+        return count
+
+    # Bucle principal; termina con una excepción (por ejemplo, SystemExit desde el manejador de señales)
+    def run(self):
+        while True:
+            self.run_once()
+
+    # Estadísticas por chip: flancos, despertares, rebotes y descartes del kernel
+    def stats(self):
+        result = {}
+        for chip_name, reader, rules in self._inputs:
+            events = reader.reader
+            result[chip_name] = {
+                'lines': len(rules),
+                'wakeups': events.wakeups,
+                'events': events.events,
+                'suppressed': sum(rule.debouncer.suppressed for rule in rules.values() if rule.debouncer),
+                'dropped': events.dropped,
+            }
+        return result
+
+    # Libera todas las líneas y cierra los chips, como un destructor en POO; se puede llamar varias veces
+    def close(self):
+        for _, reader, _ in self._inputs:
+            reader.release()
+        for bank in self._banks:
+            bank.group.release()
+        for chip in self._chips.values():
+            chip.close()
+        self._inputs, self._banks, self._chips, self._fds = [], [], {}, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Demonio GPIO configurado por fichero')
+    parser.add_argument('config', help='fichero JSON con los pines y sus comportamientos')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    log = AsyncLog()
+    registry = None
+    if config['metrics_port']:  # Métricas en http://127.0.0.1:metrics_port/ en formato Prometheus
+        registry = Registry()
+        serve_http(registry, config['metrics_port'])
+    daemon = GpioDaemon(config['pins'], log, registry)
+
+    # CTRL+C o SIGTERM interrumpen la espera y salen por el bloque `finally`, que libera los recursos
+    exit_on_signals()
+
+    # Mensaje de arranque directo (no por el registro asíncrono) para saber cuándo el demonio está listo
+    print(f"Serving {len(config['pins'])} pins ({daemon.lines} lines) on {len(daemon.stats())} chips", flush=True)
+    try:
+        daemon.run()
+    finally:
+        stats = daemon.stats()
+        daemon.close()
+        log.close()
+        for chip_name, chip_stats in stats.items():
+            print(chip_name, chip_stats)
+
+
+if __name__ == '__main__':
+    main()
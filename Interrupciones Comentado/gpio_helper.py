@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Proceso auxiliar persistente: mantiene abiertos los chips y las líneas pedidas y atiende órdenes por un
+# socket Unix, para que las invocaciones cortas (cron, servicios oneshot de systemd) no paguen cada vez el
+# arranque del intérprete, la importación de gpiod y la apertura del chip.
+# Uso: python3 gpio_helper.py [--socket /tmp/gpio-helper.sock] [--chip gpiochip4]
+#      python3 -S gpio_client.py toggle 18
+#      printf 'toggle 18\n' | socat - UNIX-CONNECT:/tmp/gpio-helper.sock   (sin arrancar ningún intérprete)
+#
+# Protocolo: una orden por línea de texto y una respuesta por orden ("ok [valor]" o "error <mensaje>").
+# La línea se indica como "offset" (en el chip por defecto) o "chip:offset".
+#   set <línea> <0|1>               escribe la salida
+#   toggle <línea>                  invierte la salida y devuelve el valor nuevo
+#   pulse <línea> <segundos> [0|1]  pone el valor (1 por defecto) durante ese tiempo, sin bloquear al auxiliar
+#   read <línea>                    lee el valor (la línea se pide como entrada si aún no estaba pedida)
+#   ping                            comprueba que el auxiliar responde
+
+import argparse  # Importa argparse para leer la ruta del socket y el chip por defecto
+import os  # Importa os para borrar un socket anterior y fijar sus permisos
+import select  # Importa select para atender el socket y las conexiones desde un único bucle
+import socket  # Importa socket para el socket Unix de órdenes
+
+from line_group import INPUT, OUTPUT  # Direcciones de las líneas
+from line_manager import LineManager, exit_on_signals  # Dueño de chips y peticiones, con limpieza garantizada
+from output_scheduler import OutputScheduler  # Programador de salidas por vencimientos, sin esperas bloqueantes
+
+DEFAULT_SOCKET = os.environ.get('GPIO_HELPER_SOCKET', '/tmp/gpio-helper.sock')  # Ruta por defecto del socket
+DEFAULT_CHIP = 'gpiochip4'  # Chip usado cuando la orden solo indica el offset
+CONSUMER = 'gpio-helper'  # Nombre con el que se piden las líneas al kernel
+MAX_LINE = 1024  # Longitud máxima de una orden; una conexión que la supere se cierra
+
+
+# Línea pedida por el auxiliar; si una orden necesita la otra dirección, el gestor reconfigura la petición
+class _HelperLine:
+    def __init__(self, lines, key, direction):
+        self.lines = lines  # Gestor dueño de la petición
+        self.key = key  # (chip, offset)
+        self.value = 0  # Último valor escrito (solo salidas)
+        self.configure(direction)
+
+    # Pide la línea en la dirección indicada, reutilizando la petición existente
+    def configure(self, direction):
+        self.group = self.lines.request(*self.key, direction, default=self.value)
+        self.direction = direction
+
+    # Interfaz de salida que usa `OutputScheduler`
+    def set_value(self, value):
+        self.group.set_values([value])
+        self.value = value
+
+    def get_value(self):
+        return self.group.get_values()[0]
+
+
+# Clase que atiende las órdenes de los clientes desde un único bucle con `select()`
+# En POO, esta clase es dueña de todos los recursos: el gestor de líneas (chips abiertos una sola vez,
+# líneas pedidas bajo demanda y reutilizadas entre órdenes), conexiones de clientes y el programador de los pulsos
+class GpioHelper:
+    def __init__(self, path=DEFAULT_SOCKET, chip=DEFAULT_CHIP, mode=0o660):
+        self.path = path
+        self.default_chip = chip
+        self.commands = 0  # Órdenes atendidas
+        self.scheduler = OutputScheduler()
+        self.lines = LineManager(consumer=CONSUMER)  # Chips y peticiones de líneas
+        self._lines = {}  # Líneas usadas, por (chip, offset)
+        self._clients = {}  # Conexión -> bytes recibidos aún sin una orden completa
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        os.chmod(path, mode)  # Solo el dueño y su grupo pueden mandar órdenes
+        self._server.listen(16)
+        self._server.setblocking(False)
+
+    # Clave (chip, offset) de una línea escrita como "offset" o "chip:offset"
+    def _key(self, name):
+        chip_name, _, offset = name.rpartition(':')
+        return chip_name or self.default_chip, int(offset)
+
+    # Devuelve la línea pedida en la dirección indicada, pidiéndola o reconfigurándola si hace falta
+    def _line(self, name, direction):
+        key = self._key(name)
+        line = self._lines.get(key)
+        if line is None:
+            line = _HelperLine(self.lines, key, direction)
+            self._lines[key] = line
+        elif line.direction != direction:
+            if line.direction == OUTPUT:
+                self.scheduler.stop(line, line.value)  # Un pulso pendiente no debe escribir en una entrada
+            try:
+                line.configure(direction)
+            except OSError:
+                del self._lines[key]  # El gestor ya descartó la petición fallida
+                raise
+        return line
+
+    # Ejecuta una orden y devuelve la respuesta (sin el salto de línea)
+    def execute(self, command):
+        words = command.split()
+        if not words:
+            return "error empty command"
+        name, args = words[0], words[1:]
+        try:
+            if name == 'ping' and not args:
+                return "ok"
+            if name == 'set' and len(args) == 2:
+                line = self._line(args[0], OUTPUT)
+                self.scheduler.stop(line, 1 if int(args[1]) else 0)  # Cancela un pulso en curso y escribe
+                return "ok"
+            if name == 'toggle' and len(args) == 1:
+                line = self._line(args[0], OUTPUT)
+                self.scheduler.stop(line, 1 - line.value)
+                return f"ok {line.value}"
+            if name == 'pulse' and len(args) in (2, 3):
+                line = self._line(args[0], OUTPUT)
+                value = (1 if int(args[2]) else 0) if len(args) == 3 else 1
+                self.scheduler.pulse(line, float(args[1]), value)
+                return "ok"
+            if name == 'read' and len(args) == 1:
+                line = self._lines.get(self._key(args[0]))
+                if line is None:
+                    line = self._line(args[0], INPUT)
+                return f"ok {line.get_value()}"
+        except Exception as error:  # Una orden fallida no debe terminar el auxiliar: se responde con el error
+            return f"error {error}"
+        return f"error unknown command: {command.strip()}"
+
+    # Atiende una conexión con datos: ejecuta cada orden completa y responde en el mismo orden
+    def _serve(self, client):
+        try:
+            data = client.recv(4096)
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(client)
+            return
+        buffer = self._clients[client] + data
+        *commands, rest = buffer.split(b'\n')
+        if len(rest) > MAX_LINE:
+            self._drop(client)
+            return
+        self._clients[client] = rest
+        if commands:
+            replies = []
+            for command in commands:
+                replies.append(self.execute(command.decode('utf-8', 'replace')))
+                self.commands += 1
+            try:
+                client.sendall(('\n'.join(replies) + '\n').encode())
+            except OSError:
+                self._drop(client)
+
+    def _drop(self, client):
+        del self._clients[client]
+        client.close()
+
+    # Una iteración del bucle: espera conexiones, órdenes o el próximo vencimiento de un pulso
+    def run_once(self, timeout=None):
+        scheduled = self.scheduler.timeout()
+        if scheduled is not None and (timeout is None or scheduled < timeout):
+            timeout = scheduled
+        ready, _, _ = select.select([self._server, *self._clients], [], [], timeout)
+        for sock in ready:
+            if sock is self._server:
+                try:
+                    client, _ = self._server.accept()
+                except BlockingIOError:  # Otro proceso se llevó la conexión
+                    continue
+                client.setblocking(True)  # Las respuestas son cortas; se escriben de una vez
+                self._clients[client] = b''
+            else:
+                self._serve(sock)
+        self.scheduler.run_due()
+
+    def run(self):
+        while True:
+            self.run_once()
+
+    # Cierra las conexiones, libera las líneas y los chips y borra el socket, como un destructor en POO
+    def close(self):
+        for client in list(self._clients):
+            self._drop(client)
+        self._lines = {}
+        self.lines.close()
+        self._server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Proceso auxiliar GPIO con órdenes por socket Unix')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='ruta del socket Unix')
+    parser.add_argument('--chip', default=DEFAULT_CHIP, help='chip usado cuando la orden solo indica el offset')
+    args = parser.parse_args()
+
+    helper = GpioHelper(args.socket, args.chip)
+
+    # CTRL+C o SIGTERM interrumpen la espera y salen por el bloque `finally`, que libera los recursos
+    exit_on_signals()
+
+    print(f"Listening on {args.socket}", flush=True)  # Mensaje de arranque, para saber cuándo está listo
+    try:
+        helper.run()
+    finally:
+        helper.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import os  # Importa os para crear la tubería que hace de descriptor de eventos de cada línea
+import select  # Importa select para esperar sobre el descriptor como con una línea real
+import sys  # Importa sys para poder sustituir el módulo gpiod por este simulador
+import threading  # Importa threading para proteger la cola de eventos frente al hilo que inyecta flancos
+import time  # Importa time para sellar los eventos con el reloj monotónico, como el kernel
+from collections import deque  # Cola de eventos de cada línea
+
+# Simulador de la API de libgpiod v1 (la que usan los ejemplos) para ejecutar sin una Raspberry Pi
+# Cada línea tiene una tubería como descriptor, de modo que select/poll/asyncio funcionan igual que con
+# el kernel, y una cola limitada como la del kernel: si se llena, los flancos nuevos se descartan.
+# Los flancos se generan desde otro hilo con `Chip.inject(offset, valor)`.
+# Para que los demás módulos lo usen en lugar de gpiod basta con llamar a `install()` antes de importarlos
+
+# Tipos de petición, con los mismos nombres que en gpiod v1
+LINE_REQ_DIR_AS_IS = 1
+LINE_REQ_DIR_IN = 2
+LINE_REQ_DIR_OUT = 3
+LINE_REQ_EV_FALLING_EDGE = 4
+LINE_REQ_EV_RISING_EDGE = 5
+LINE_REQ_EV_BOTH_EDGES = 6
+
+KERNEL_QUEUE_SIZE = 16  # Capacidad de la cola de eventos por línea (la del uAPI v1 del kernel)
+READ_MAX = 16  # Eventos que devuelve como máximo `event_read_multiple()`, como en libgpiod v1
+NUM_LINES = 54  # Número de líneas del chip simulado (como gpiochip4 en la Raspberry Pi 5)
+
+
+# Evento de flanco, con los mismos atributos que `gpiod.LineEvent` de v1
+class LineEvent:
+    RISING_EDGE = 1
+    FALLING_EDGE = 2
+
+    def __init__(self, type, sec, nsec, source):
+        self.type = type  # Tipo de flanco
+        self.sec = sec  # Marca de tiempo: segundos
+        self.nsec = nsec  # Marca de tiempo: nanosegundos
+        self.source = source  # Línea que generó el evento
+
+
+# Línea simulada, con los mismos métodos que `gpiod.Line` de v1
+class Line:
+    def __init__(self, chip, offset):
+        self._chip = chip
+        self._offset = offset
+        self._value = 0  # Valor actual de la línea
+        self._type = None  # Tipo de petición; None si la línea no está pedida
+        self._queue = deque()  # Cola de eventos pendientes
+        self._lock = threading.Lock()
+        self._rfd = self._wfd = None  # Extremos de la tubería que hace de descriptor de eventos
+        self.dropped = 0  # Flancos descartados porque la cola estaba llena
+
+    def offset(self):
+        return self._offset
+
+    def request(self, consumer=None, type=LINE_REQ_DIR_IN, flags=0, default_vals=None, default_val=None):
+        if self._type is not None:
+            raise OSError(16, 'Device or resource busy')
+        self._type = type
+        if type == LINE_REQ_DIR_OUT:
+            self._value = default_val if default_val is not None else (default_vals or [0])[0]
+        if type in (LINE_REQ_EV_RISING_EDGE, LINE_REQ_EV_FALLING_EDGE, LINE_REQ_EV_BOTH_EDGES):
+            self._rfd, self._wfd = os.pipe()
+            os.set_blocking(self._wfd, False)
+
+    def release(self):
+        if self._rfd is not None:
+            os.close(self._rfd)
+            os.close(self._wfd)
+            self._rfd = self._wfd = None
+        self._queue.clear()
+        self._type = None
+
+    def is_requested(self):
+        return self._type is not None
+
+    def get_value(self):
+        return self._value
+
+    def set_value(self, value):
+        if self._type != LINE_REQ_DIR_OUT:
+            raise PermissionError(1, 'Operation not permitted')
+        self._value = 1 if value else 0
+
+    # Cambio de dirección sin soltar la línea (libgpiod >= 1.5); como en el kernel, no se permite en
+    # líneas pedidas con eventos, que tienen su propio descriptor
+    def set_direction_input(self):
+        self._set_direction(LINE_REQ_DIR_IN)
+
+    def set_direction_output(self, value=None):
+        self._set_direction(LINE_REQ_DIR_OUT)
+        self._value = 1 if value else 0
+
+    def _set_direction(self, type):
+        if self._type not in (LINE_REQ_DIR_IN, LINE_REQ_DIR_OUT, LINE_REQ_DIR_AS_IS):
+            raise PermissionError(1, 'Operation not permitted')
+        self._type = type
+
+    def event_get_fd(self):
+        return self._rfd
+
+    def event_wait(self, sec=0, nsec=0):
+        self._check_events()
+        ready, _, _ = select.select([self._rfd], [], [], sec + nsec / 1e9)
+        return bool(ready)
+
+    # Como el kernel, leer o esperar eventos de una línea liberada (o pedida sin eventos) da EBADF
+    def _check_events(self):
+        if self._rfd is None:
+            raise OSError(9, 'Bad file descriptor')
+
+    def event_read(self):
+        return self._read(1)[0]
+
+    def event_read_multiple(self):
+        return self._read(READ_MAX)
+
+    # Lectura bloqueante de hasta `count` eventos, como read() sobre el descriptor del kernel
+    def _read(self, count):
+        self._check_events()
+        os.read(self._rfd, 1)  # Bloquea hasta que haya al menos un evento
+        with self._lock:
+            events = [self._queue.popleft()]
+            extra = min(count - 1, len(self._queue))
+            for _ in range(extra):
+                events.append(self._queue.popleft())
+        while extra:  # Consume un byte por evento extra; alguno puede estar aún por escribirse
+            extra -= len(os.read(self._rfd, extra))
+        return events
+
+    # Cambia el valor de entrada y, si corresponde, encola el flanco con la hora monotónica actual
+    def _inject(self, value):
+        value = 1 if value else 0
+        if value == self._value:
+            return False
+        self._value = value
+        edge = LineEvent.RISING_EDGE if value else LineEvent.FALLING_EDGE
+        if self._type == LINE_REQ_EV_BOTH_EDGES or \
+                (self._type == LINE_REQ_EV_RISING_EDGE and value) or \
+                (self._type == LINE_REQ_EV_FALLING_EDGE and not value):
+            timestamp_ns = time.monotonic_ns()
+            with self._lock:
+                if len(self._queue) >= KERNEL_QUEUE_SIZE:
+                    self.dropped += 1
+                    return True
+                self._queue.append(LineEvent(edge, timestamp_ns // 1000000000, timestamp_ns % 1000000000, self))
+            os.write(self._wfd, b'x')
+        return True
+
+
+# Conjunto de líneas, con los mismos métodos que `gpiod.LineBulk` de v1
+class LineBulk:
+    def __init__(self, lines):
+        self._lines = list(lines)
+
+    def __iter__(self):
+        return iter(self._lines)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def to_list(self):
+        return list(self._lines)
+
+    def request(self, consumer=None, type=LINE_REQ_DIR_IN, flags=0, default_vals=None):
+        for index, line in enumerate(self._lines):
+            line.request(consumer=consumer, type=type, flags=flags,
+                         default_val=default_vals[index] if default_vals else None)
+
+    def release(self):
+        for line in self._lines:
+            line.release()
+
+    def get_values(self):
+        return [line.get_value() for line in self._lines]
+
+    def set_values(self, values):
+        for line, value in zip(self._lines, values):
+            line.set_value(value)
+
+    def set_direction_input(self):
+        for line in self._lines:
+            line.set_direction_input()
+
+    def set_direction_output(self, values=None):
+        for index, line in enumerate(self._lines):
+            line.set_direction_output(values[index] if values else None)
+
+    def event_wait(self, sec=0, nsec=0):
+        fds = {line.event_get_fd(): line for line in self._lines}
+        ready, _, _ = select.select(list(fds), [], [], sec + nsec / 1e9)
+        return LineBulk(fds[fd] for fd in ready) if ready else None
+
+
+# Chip simulado, con los mismos métodos que `gpiod.Chip` de v1 más `inject()` para generar flancos
+class Chip:
+    def __init__(self, name, num_lines=NUM_LINES):
+        self._name = name
+        self._lines = [Line(self, offset) for offset in range(num_lines)]
+        self.leaked = 0  # Líneas que seguían pedidas al cerrar el chip (las libera `close()`, como libgpiod v1)
+
+    def name(self):
+        return self._name
+
+    def num_lines(self):
+        return len(self._lines)
+
+    def get_line(self, offset):
+        return self._lines[offset]
+
+    def get_lines(self, offsets):
+        return LineBulk(self._lines[offset] for offset in offsets)
+
+    def close(self):
+        for line in self._lines:
+            if line.is_requested():
+                self.leaked += 1
+                line.release()
+
+    # Genera un flanco en la entrada `offset`; devuelve False si el valor no cambia
+    def inject(self, offset, value):
+        return self._lines[offset]._inject(value)
+
+    # Total de flancos descartados por colas llenas en todas las líneas
+    @property
+    def dropped(self):
+        return sum(line.dropped for line in self._lines)
+
+
+# Sustituye el módulo `gpiod` por este simulador para los módulos que se importen después
+def install():
+    sys.modules['gpiod'] = sys.modules[__name__]
@@ -0,0 +1,271 @@
+import enum  # Importa enum para los tipos de dirección, flanco y valor de libgpiod v2
+import errno  # Importa errno para los códigos de error que devolvería el kernel
+import os  # Importa os para crear la tubería que hace de descriptor de eventos de cada petición
+import select  # Importa select para esperar sobre el descriptor como con una petición real
+import sys  # Importa sys para poder sustituir el módulo gpiod por este simulador
+import threading  # Importa threading para proteger la cola de eventos frente al hilo que inyecta flancos
+import time  # Importa time para sellar los eventos con el reloj monotónico, como el kernel
+import types  # Importa types para crear el submódulo `gpiod.line`
+from collections import deque  # Cola de eventos de cada petición
+from datetime import timedelta  # Los periodos de libgpiod v2 se expresan como timedelta
+
+# Simulador de la API de libgpiod v2 (uAPI v2 del kernel) para ejecutar sin una Raspberry Pi
+# A diferencia de v1, cada petición (`LineRequest`) agrupa varias líneas con un único descriptor y una
+# única cola de eventos de `event_buffer_size` flancos, que se puede reconfigurar sin soltar las líneas.
+# Como en el kernel, si la cola se llena se descarta el flanco más antiguo, y el hueco se ve en `global_seqno`.
+# El simulador no admite debounce en el kernel: pedirlo da OSError, como en un chip sin esa función.
+# Para que los demás módulos lo usen en lugar de gpiod basta con llamar a `install()` antes de importarlos
+
+LINES_MAX = 64  # Líneas como máximo por petición (GPIO_V2_LINES_MAX)
+EVENTS_PER_LINE = 16  # Cola por defecto: 16 flancos por línea de la petición
+DEFAULT_READ_EVENTS = 64  # Eventos que lee `read_edge_events()` si no se indica otra cosa
+NUM_LINES = 54  # Número de líneas del chip simulado (como gpiochip4 en la Raspberry Pi 5)
+
+
+class Direction(enum.Enum):
+    AS_IS = 1
+    INPUT = 2
+    OUTPUT = 3
+
+
+class Edge(enum.Enum):
+    NONE = 1
+    RISING = 2
+    FALLING = 3
+    BOTH = 4
+
+
+class Value(enum.Enum):
+    INACTIVE = 0
+    ACTIVE = 1
+
+
+# Submódulo `gpiod.line`, donde libgpiod v2 define los tipos anteriores
+line = types.ModuleType('gpiod.line')
+line.Direction, line.Edge, line.Value = Direction, Edge, Value
+
+
+# Configuración de una o varias líneas, con los mismos argumentos que `gpiod.LineSettings` de v2
+class LineSettings:
+    def __init__(self, direction=Direction.AS_IS, edge_detection=Edge.NONE, output_value=Value.INACTIVE,
+                 debounce_period=timedelta(0), **kwargs):
+        self.direction = direction
+        self.edge_detection = edge_detection
+        self.output_value = output_value
+        self.debounce_period = debounce_period
+        self.extra = kwargs  # bias, drive, active_low...: se aceptan y no se simulan
+
+
+# Evento de flanco, con los mismos atributos que `gpiod.EdgeEvent` de v2
+class EdgeEvent:
+    class Type(enum.Enum):
+        RISING_EDGE = 1
+        FALLING_EDGE = 2
+
+    __slots__ = ('event_type', 'timestamp_ns', 'line_offset', 'global_seqno', 'line_seqno')
+
+    def __init__(self, event_type, timestamp_ns, line_offset, global_seqno, line_seqno):
+        self.event_type = event_type  # Tipo de flanco
+        self.timestamp_ns = timestamp_ns  # Marca de tiempo del kernel (ns)
+        self.line_offset = line_offset  # Línea que generó el evento
+        self.global_seqno = global_seqno  # Número de secuencia dentro de la petición
+        self.line_seqno = line_seqno  # Número de secuencia dentro de la línea
+
+
+# Petición de varias líneas, con los mismos métodos que `gpiod.LineRequest` de v2
+class LineRequest:
+    def __init__(self, chip, offsets, settings, consumer, event_buffer_size):
+        self._chip = chip
+        self.offsets = offsets  # Offsets de las líneas, en el orden de la petición
+        self.consumer = consumer
+        self._settings = settings  # Configuración vigente de cada offset
+        self._queue = deque()  # Cola de eventos de toda la petición
+        self._size = event_buffer_size  # Capacidad de la cola
+        self._lock = threading.Lock()
+        self._seqno = 0  # Último número de secuencia global asignado
+        self._line_seqno = dict.fromkeys(offsets, 0)  # Último número de secuencia de cada línea
+        self._rfd, self._wfd = os.pipe()  # Un único descriptor para todos los eventos de la petición
+        os.set_blocking(self._wfd, False)
+        self.dropped = 0  # Flancos descartados porque la cola estaba llena
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+
+    @property
+    def fd(self):
+        self._check_open()
+        return self._rfd
+
+    @property
+    def num_lines(self):
+        return len(self.offsets)
+
+    def _check_open(self):
+        if self._rfd is None:
+            raise OSError(errno.EBADF, 'Line request released')
+
+    def get_value(self, offset):
+        self._check_open()
+        return Value(self._chip._values[offset])
+
+    def get_values(self, lines=None):
+        self._check_open()
+        return [Value(self._chip._values[offset]) for offset in (self.offsets if lines is None else lines)]
+
+    def set_value(self, offset, value):
+        self.set_values({offset: value})
+
+    def set_values(self, values):
+        self._check_open()
+        for offset in values:
+            if self._settings[offset].direction != Direction.OUTPUT:
+                raise PermissionError(errno.EPERM, 'Operation not permitted')
+        for offset, value in values.items():
+            self._chip._values[offset] = Value(value).value
+
+    # Cambia la configuración de las líneas sin soltarlas: el descriptor y la cola de eventos se conservan
+    def reconfigure_lines(self, config):
+        self._check_open()
+        settings = self._chip._settings_by_offset(config)
+        if set(settings) != set(self.offsets):
+            raise ValueError("the configuration must cover every requested line")
+        for offset, line_settings in settings.items():
+            if line_settings.direction == Direction.OUTPUT:
+                self._chip._values[offset] = Value(line_settings.output_value).value
+        self._settings = settings
+
+    # Espera hasta que haya eventos o venza `timeout` (segundos o timedelta; None = sin límite)
+    def wait_edge_events(self, timeout=None):
+        self._check_open()
+        if isinstance(timeout, timedelta):
+            timeout = timeout.total_seconds()
+        ready, _, _ = select.select([self._rfd], [], [], timeout)
+        return bool(ready)
+
+    # Lectura bloqueante de hasta `max_events` eventos, como read() sobre el descriptor del kernel
+    def read_edge_events(self, max_events=None):
+        self._check_open()
+        count = max_events or DEFAULT_READ_EVENTS
+        os.read(self._rfd, 1)  # Bloquea hasta que haya al menos un evento
+        with self._lock:
+            events = [self._queue.popleft()]
+            extra = min(count - 1, len(self._queue))
+            for _ in range(extra):
+                events.append(self._queue.popleft())
+        while extra:  # Consume un byte por evento extra; alguno puede estar aún por escribirse
+            extra -= len(os.read(self._rfd, extra))
+        return events
+
+    def release(self):
+        if self._rfd is None:
+            return
+        os.close(self._rfd)
+        os.close(self._wfd)
+        self._rfd = self._wfd = None
+        self._chip._release(self)
+
+    # Encola un flanco de `offset` si su configuración lo pide; con la cola llena se pierde el más antiguo
+    def _edge(self, offset, value):
+        detect = self._settings[offset].edge_detection
+        if not (detect == Edge.BOTH or (detect == Edge.RISING and value) or (detect == Edge.FALLING and not value)):
+            return
+        timestamp_ns = time.monotonic_ns()
+        with self._lock:
+            self._seqno += 1
+            self._line_seqno[offset] += 1
+            event = EdgeEvent(EdgeEvent.Type.RISING_EDGE if value else EdgeEvent.Type.FALLING_EDGE,
+                              timestamp_ns, offset, self._seqno, self._line_seqno[offset])
+            if len(self._queue) >= self._size:
+                self._queue.popleft()
+                self._queue.append(event)
+                self.dropped += 1
+                self._chip.dropped += 1
+                return
+            self._queue.append(event)
+        os.write(self._wfd, b'x')
+
+
+# Chip simulado, con los mismos métodos que `gpiod.Chip` de v2 más `inject()` para generar flancos
+class Chip:
+    def __init__(self, path, num_lines=NUM_LINES):
+        if not path.startswith('/dev/'):  # libgpiod v2 abre el dispositivo por su ruta
+            raise FileNotFoundError(errno.ENOENT, 'No such file or directory', path)
+        self.path = path
+        self._values = [0] * num_lines  # Valor actual de cada línea
+        self._owners = {}  # Petición que tiene pedida cada línea
+        self._closed = False
+        self.dropped = 0  # Flancos descartados por colas llenas en todas las peticiones
+        self.leaked = 0  # Líneas que seguían pedidas al cerrar el chip (cerrarlo no las libera)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    # Convierte la configuración {offset o tupla de offsets: LineSettings} en una por offset
+    def _settings_by_offset(self, config):
+        settings = {}
+        for key, line_settings in config.items():
+            line_settings = line_settings or LineSettings()
+            if line_settings.debounce_period:
+                raise OSError(errno.ENOTSUP, 'Debounce not supported by the simulated chip')
+            for offset in (key if isinstance(key, tuple) else (key,)):
+                if not 0 <= offset < len(self._values):
+                    raise ValueError(f"invalid line offset {offset}")
+                settings[offset] = line_settings
+        return settings
+
+    def request_lines(self, config, consumer=None, event_buffer_size=None, output_values=None):
+        if self._closed:
+            raise OSError(errno.EBADF, 'Chip closed')
+        settings = self._settings_by_offset(config)
+        offsets = list(settings)
+        if not 0 < len(offsets) <= LINES_MAX:
+            raise ValueError(f"a request must have between 1 and {LINES_MAX} lines")
+        if event_buffer_size and event_buffer_size > LINES_MAX * EVENTS_PER_LINE:
+            raise OSError(errno.EINVAL, 'Invalid argument')
+        if any(offset in self._owners for offset in offsets):
+            raise OSError(errno.EBUSY, 'Device or resource busy')
+        request = LineRequest(self, offsets, settings, consumer,
+                              event_buffer_size or len(offsets) * EVENTS_PER_LINE)
+        for offset, line_settings in settings.items():
+            if line_settings.direction == Direction.OUTPUT:
+                value = (output_values or {}).get(offset, line_settings.output_value)
+                self._values[offset] = Value(value).value
+            self._owners[offset] = request
+        return request
+
+    def _release(self, request):
+        for offset in request.offsets:
+            if self._owners.get(offset) is request:
+                del self._owners[offset]
+
+    # True si la línea está pedida por alguna petición
+    def is_requested(self, offset):
+        return offset in self._owners
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.leaked += len(self._owners)
+
+    # Genera un flanco en la entrada `offset`; devuelve False si el valor no cambia
+    def inject(self, offset, value):
+        value = 1 if value else 0
+        if value == self._values[offset]:
+            return False
+        self._values[offset] = value
+        request = self._owners.get(offset)
+        if request is not None:
+            request._edge(offset, value)
+        return True
+
+
+# Sustituye el módulo `gpiod` por este simulador para los módulos que se importen después
+def install():
+    sys.modules['gpiod'] = sys.modules[__name__]
+    sys.modules['gpiod.line'] = line
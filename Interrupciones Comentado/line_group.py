@@ -0,0 +1,165 @@
+from event_reader import EventReader  # Lector que vacía la cola de eventos del kernel en cada despertar
+
+# Direcciones y flancos admitidos por un grupo de líneas
+INPUT = 'input'  # Líneas de entrada
+OUTPUT = 'output'  # Líneas de salida
+EDGES = ('rising', 'falling', 'both')  # Tipos de detección de flancos para entradas
+
+
+# Abre un chip por nombre ('gpiochip4') o por ruta ('/dev/gpiochip4')
+# libgpiod v1 acepta ambos; el `Chip` de libgpiod v2 solo acepta la ruta del dispositivo
+def open_chip(name):
+    import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+    if hasattr(gpiod.Chip, 'request_lines') and '/' not in name:
+        name = '/dev/' + name
+    return gpiod.Chip(name)
+
+
+# Comprueba una combinación de dirección y flancos antes de pedir o reconfigurar las líneas
+def _check(direction, edge):
+    if direction not in (INPUT, OUTPUT):
+        raise ValueError(f"direction must be '{INPUT}' or '{OUTPUT}'")
+    if edge is not None and (direction == OUTPUT or edge not in EDGES):
+        raise ValueError(f"edge must be one of {EDGES} and only applies to inputs")
+
+
+# Traduce dirección y flanco al tipo de petición de libgpiod v1
+def _v1_request_type(direction, edge):
+    import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+    if direction == OUTPUT:
+        return gpiod.LINE_REQ_DIR_OUT
+    if edge is None:
+        return gpiod.LINE_REQ_DIR_IN
+    return {'rising': gpiod.LINE_REQ_EV_RISING_EDGE,
+            'falling': gpiod.LINE_REQ_EV_FALLING_EDGE,
+            'both': gpiod.LINE_REQ_EV_BOTH_EDGES}[edge]
+
+
+# Traduce dirección y flanco a la configuración de libgpiod v2
+def _v2_settings(direction, edge, default):
+    import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+    if direction == OUTPUT:
+        return gpiod.LineSettings(direction=gpiod.line.Direction.OUTPUT,
+                                  output_value=gpiod.line.Value(default))
+    return gpiod.LineSettings(direction=gpiod.line.Direction.INPUT,
+                              edge_detection={None: gpiod.line.Edge.NONE,
+                                              'rising': gpiod.line.Edge.RISING,
+                                              'falling': gpiod.line.Edge.FALLING,
+                                              'both': gpiod.line.Edge.BOTH}[edge])
+
+
+# Clase que pide muchas líneas de un chip en una sola petición
+# En POO, esta clase agrupa varios pines para leer o escribir todos sus valores con una sola llamada
+# (`get_values`/`set_values`) en lugar de una llamada al sistema por línea. Con libgpiod v2 todo el grupo
+# comparte un único descriptor para los eventos; con v1 el kernel da un descriptor por línea y el
+# lector de eventos los vigila todos con una sola llamada a `select()`.
+# `event_buffer_size` fija en v2 la cola de eventos de la petición (por defecto el kernel da 16 por línea,
+# hasta 1024); en v1 cada línea tiene siempre su cola de 16 y el parámetro no tiene efecto
+class LineGroup:
+    def __init__(self, chip, offsets, direction=INPUT, edge=None, consumer='LineGroup', default=0,
+                 event_buffer_size=None):
+        _check(direction, edge)
+        self.offsets = list(offsets)  # Offsets de las líneas, en el orden en que se leen y escriben
+        self.direction = direction  # Dirección común del grupo
+        self.edge = edge  # Flancos que generan eventos (None = sin eventos)
+        self.reader = None  # Lector de eventos, solo si se piden flancos
+        self._event_reader = None  # Lector creado la primera vez que se piden flancos; se reutiliza
+        self.consumer = consumer  # Nombre con el que se piden las líneas, para volver a pedirlas
+
+        if hasattr(chip, 'request_lines'):  # libgpiod v2: una petición y un descriptor para todo el grupo
+            import gpiod  # Importación diferida: solo se carga gpiod al usar el hardware
+            self._v2 = True
+            self._lines = chip.request_lines(consumer=consumer, event_buffer_size=event_buffer_size, config={
+                tuple(self.offsets): _v2_settings(direction, edge, default)})
+            self._active = gpiod.line.Value.ACTIVE
+            self._inactive = gpiod.line.Value.INACTIVE
+        else:  # libgpiod v1: una petición en bloque (`LineBulk`)
+            self._v2 = False
+            self._lines = chip.get_lines(self.offsets)
+            self._request_v1(default)
+        self._make_reader()
+
+    # Pide el bloque de líneas v1 con la dirección y los flancos actuales del grupo
+    def _request_v1(self, default):
+        kwargs = {'consumer': self.consumer, 'type': _v1_request_type(self.direction, self.edge)}
+        if self.direction == OUTPUT:
+            kwargs['default_vals'] = [default] * len(self.offsets)
+        self._lines.request(**kwargs)
+
+    # Crea el lector la primera vez que hay flancos y después lo reasocia a la petición actual, de modo que
+    # el mismo objeto `reader` (y sus contadores) sirve durante toda la vida del grupo. Sin flancos `reader`
+    # vale None; el lector anterior vuelve a funcionar cuando se piden flancos de nuevo
+    def _make_reader(self):
+        if self.edge is None:
+            self.reader = None
+            return
+        source = self._lines if self._v2 else self._lines.to_list()
+        if self._event_reader is None:
+            self._event_reader = EventReader(source, both_edges=(self.edge == 'both'))
+        else:
+            self._event_reader.attach(source, both_edges=(self.edge == 'both'))
+        self.reader = self._event_reader
+
+    # Cambia la dirección o los flancos del grupo sin soltar las líneas si el kernel lo permite:
+    # con libgpiod v2 siempre (`reconfigure_lines` sobre la misma petición y el mismo descriptor); con v1
+    # solo entre entrada y salida sin eventos (`set_direction_*`, libgpiod >= 1.5), porque el uAPI v1 da
+    # los eventos en un descriptor aparte y cambiar los flancos obliga a liberar y pedir de nuevo.
+    # El objeto `reader` se conserva (ver `_make_reader`), pero tras volver a pedir las líneas en v1 sus
+    # descriptores (`reader.fds`) son otros: quien los registró en otro bucle (select, asyncio) debe
+    # volver a leerlos. Devuelve True si se reconfiguró en el sitio y False si hubo que volver a pedir las líneas
+    def reconfigure(self, direction=INPUT, edge=None, default=0):
+        _check(direction, edge)
+        if self._v2:
+            self._lines.reconfigure_lines({tuple(self.offsets): _v2_settings(direction, edge, default)})
+            in_place = True
+        elif self.edge is None and edge is None and hasattr(self._lines, 'set_direction_output'):
+            if direction == OUTPUT:
+                self._lines.set_direction_output([default] * len(self.offsets))
+            else:
+                self._lines.set_direction_input()
+            in_place = True
+        else:
+            self._lines.release()
+            self.direction, self.edge = direction, edge
+            self._request_v1(default)
+            in_place = False
+        self.direction, self.edge = direction, edge
+        self._make_reader()
+        return in_place
+
+    # Lee los valores de todas las líneas con una sola llamada; devuelve una lista de 0/1
+    def get_values(self):
+        if self._v2:
+            active = self._active
+            return [1 if value == active else 0 for value in self._lines.get_values()]
+        return self._lines.get_values()
+
+    # Escribe los valores de todas las líneas con una sola llamada; `values` sigue el orden de `offsets`
+    def set_values(self, values):
+        if self._v2:
+            active, inactive = self._active, self._inactive
+            self._lines.set_values({offset: active if value else inactive
+                                    for offset, value in zip(self.offsets, values)})
+        else:
+            self._lines.set_values(list(values))
+
+    # Escribe el mismo valor en todas las líneas; con una sola línea el grupo se usa como una línea suelta
+    # (por ejemplo con `OutputScheduler`, que solo necesita `set_value`)
+    def set_value(self, value):
+        self.set_values([1 if value else 0] * len(self.offsets))
+
+    # Devuelve el descriptor del grupo (en v1, el de la primera línea)
+    def fileno(self):
+        return self.reader.fileno()
+
+    # Espera flancos en cualquier línea del grupo (segundos, None = sin límite)
+    def wait(self, timeout=None):
+        return self.reader.wait(timeout)
+
+    # Lee de una vez los flancos pendientes de todas las líneas del grupo
+    def read_batch(self):
+        return self.reader.read_batch()
+
+    # Libera todas las líneas del grupo, como un destructor en POO
+    def release(self):
+        self._lines.release()
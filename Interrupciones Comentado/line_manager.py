@@ -0,0 +1,120 @@
+import signal  # Importa signal para convertir CTRL+C y SIGTERM en una salida ordenada
+import sys  # Importa sys para terminar con SystemExit desde el manejador de señales
+
+from line_group import INPUT, LineGroup, open_chip  # Grupo de líneas pedido en una sola petición
+
+
+# Convierte las señales de terminación en `SystemExit`, para que los bloques `with` y `finally` liberen
+# los recursos al salir; sustituye al `signal_handler` que cada script repetía con sus `release()`
+def exit_on_signals(signals=(signal.SIGINT, signal.SIGTERM)):
+    def signal_handler(sig, frame):
+        sys.exit(0)  # Finaliza el programa de manera controlada, deshaciendo los bloques `with`
+
+    for sig in signals:
+        signal.signal(sig, signal_handler)
+
+
+# Clase dueña de los chips y de las peticiones de líneas de un programa
+# En POO, esta clase es un gestor de contexto: abre cada chip una sola vez, guarda cada petición por
+# (chip, offsets) y la reutiliza al pedirla de nuevo. Si cambia la dirección o los flancos, reconfigura la
+# petición existente en lugar de liberarla y pedirla otra vez (ver `LineGroup.reconfigure`). Al salir del
+# bloque `with` (normalmente, por una excepción o por `exit_on_signals()`) ejecuta las limpiezas
+# registradas, en orden inverso, libera todas las líneas y cierra los chips
+class LineManager:
+    def __init__(self, consumer='LineManager'):
+        self.consumer = consumer  # Nombre con el que se piden las líneas al kernel
+        self.requests = 0  # Peticiones nuevas al kernel
+        self.reused = 0  # Peticiones devueltas tal cual desde la caché
+        self.reconfigured = 0  # Cambios de modo hechos sin soltar las líneas
+        self.rerequested = 0  # Cambios de modo que obligaron a liberar y volver a pedir
+        self._chips = {}  # Chips abiertos, por nombre
+        self._groups = {}  # Peticiones activas, por (chip, offsets)
+        self._callbacks = []  # Limpiezas adicionales registradas con `callback()`
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    # Devuelve el chip `name` ('gpiochip4' o '/dev/gpiochip4'), abriéndolo la primera vez
+    def chip(self, name):
+        if self.closed:
+            raise ValueError("line manager is closed")
+        chip = self._chips.get(name)
+        if chip is None:
+            chip = self._chips[name] = open_chip(name)
+        return chip
+
+    # Devuelve el `LineGroup` de `offsets` (un offset o una lista) en el modo indicado; si ya estaba
+    # pedido se reutiliza y, si el modo es otro, se reconfigura. `default` es el valor inicial de las salidas
+    def request(self, chip_name, offsets, direction=INPUT, edge=None, default=0):
+        offsets = (offsets,) if isinstance(offsets, int) else tuple(offsets)
+        key = (chip_name, offsets)
+        group = self._groups.get(key)
+        if group is None:
+            group = LineGroup(self.chip(chip_name), offsets, direction, edge, self.consumer, default)
+            self._groups[key] = group
+            self.requests += 1
+        elif group.direction == direction and group.edge == edge:
+            self.reused += 1
+        else:
+            try:
+                in_place = group.reconfigure(direction, edge, default)
+            except Exception:
+                # La petición puede haber quedado a medias: se descarta para no reutilizarla
+                del self._groups[key]
+                try:
+                    group.release()
+                except OSError:
+                    pass
+                raise
+            if in_place:
+                self.reconfigured += 1
+            else:
+                self.rerequested += 1
+        return group
+
+    # Libera una petición antes de cerrar el gestor (por ejemplo, para cederla a otro proceso)
+    def release(self, chip_name, offsets):
+        offsets = (offsets,) if isinstance(offsets, int) else tuple(offsets)
+        self._groups.pop((chip_name, offsets)).release()
+
+    # Registra una limpieza adicional (por ejemplo, `log.close`) que se ejecuta al cerrar el gestor
+    def callback(self, function, *args):
+        self._callbacks.append((function, args))
+        return function
+
+    def stats(self):
+        return {
+            'chips': len(self._chips),
+            'groups': len(self._groups),
+            'requests': self.requests,
+            'reused': self.reused,
+            'reconfigured': self.reconfigured,
+            'rerequested': self.rerequested,
+        }
+
+    # Ejecuta las limpiezas registradas, libera todas las líneas y cierra los chips, como un destructor en POO.
+    # Sigue aunque un paso falle, para no dejar recursos abiertos, y relanza el primer error al terminar.
+    # Se puede llamar varias veces
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Primero las limpiezas registradas (aún pueden escribir en las líneas), después líneas y chips
+        steps = [lambda function=function, args=args: function(*args)
+                 for function, args in reversed(self._callbacks)]
+        steps += [group.release for group in self._groups.values()]
+        steps += [chip.close for chip in self._chips.values()]
+        self._groups, self._chips, self._callbacks = {}, {}, []
+        error = None
+        for step in steps:
+            try:
+                step()
+            except Exception as exc:
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
@@ -0,0 +1,222 @@
+import bisect  # Importa bisect para encontrar el bucket de un histograma sin recorrerlos todos
+import os  # Importa os para borrar un socket Unix anterior
+import re  # Importa re para convertir nombres libres (chips, callbacks) en nombres de métrica válidos
+import socketserver  # Importa socketserver para exportar las métricas por un socket Unix
+import threading  # Importa threading para atender las consultas sin bloquear el bucle de eventos
+import time  # Importa time para medir latencias y duraciones en nanosegundos
+from http.server import BaseHTTPRequestHandler, HTTPServer  # Endpoint HTTP de texto estilo Prometheus
+
+# Límites de los buckets de latencia en nanosegundos: de 1 µs a 100 ms
+LATENCY_BUCKETS_NS = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000,
+                      1000000, 2000000, 5000000, 10000000, 20000000, 50000000, 100000000)
+# Observaciones que un histograma acumula sin repartir en buckets (unos 2 MB); al llegar aquí se reparten
+# en el momento. Con consultas cada pocos segundos el reparto se hace siempre en el hilo que exporta
+PENDING_MAX = 65536
+
+_monotonic_ns = time.monotonic_ns  # Referencia de módulo para el camino caliente
+
+
+# Convierte un nombre libre en una parte válida de un nombre de métrica ([a-zA-Z0-9_])
+# Por ejemplo '/dev/gpiochip4' -> 'dev_gpiochip4' y 'gpio-sim.0' -> 'gpio_sim_0'
+def metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]+', '_', str(name)).strip('_')
+
+
+# Contador monótono; lo incrementa un único hilo (el del bucle de eventos), así que no necesita cerrojos
+class Counter:
+    __slots__ = ('name', 'help', 'value')
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self):
+        return f"# HELP {self.name} {self.help}\n# TYPE {self.name} counter\n{self.name} {self.value}\n"
+
+
+# Valor leído de una función en el momento de exportar, sin coste en el camino caliente
+# `kind` es 'gauge' para valores instantáneos y 'counter' para totales que solo crecen (por ejemplo, los
+# eventos descartados que ya cuenta el lector)
+class Gauge:
+    __slots__ = ('name', 'help', 'read', 'kind')
+
+    def __init__(self, name, help, read, kind='gauge'):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+
+    def render(self):
+        return f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n{self.name} {self.read()}\n"
+
+
+# Histograma de buckets fijos. `observe()` solo anota el valor; la búsqueda del bucket se hace al exportar
+# (en el hilo que atiende la consulta) o cada `PENDING_MAX` observaciones si nadie consulta
+# `scale` convierte los valores al exportar (por defecto, de nanosegundos a segundos)
+class Histogram:
+    __slots__ = ('name', 'help', 'bounds', 'scale', 'counts', 'sum', 'count', '_pending', '_lock')
+
+    def __init__(self, name, help, bounds=LATENCY_BUCKETS_NS, scale=1e-9):
+        self.name = name
+        self.help = help
+        self.bounds = tuple(bounds)
+        self.scale = scale
+        self.counts = [0] * (len(self.bounds) + 1)  # El último bucket recoge los valores mayores (+Inf)
+        self.sum = 0
+        self.count = 0
+        self._pending = []  # Observaciones aún sin repartir en buckets
+        self._lock = threading.Lock()  # Solo entre quienes reparten: el hilo que observa y el que exporta
+
+    def observe(self, value_ns):
+        pending = self._pending
+        pending.append(value_ns)
+        if len(pending) >= PENDING_MAX:
+            self.fold()
+
+    # Reparte las observaciones pendientes en sus buckets. Solo se borran las que se han repartido, así
+    # que lo que el hilo caliente anote mientras tanto queda para la próxima vez
+    def fold(self):
+        with self._lock:
+            pending = self._pending
+            values = pending[:len(pending)]
+            del pending[:len(values)]
+            counts, bounds = self.counts, self.bounds
+            for value in values:
+                counts[bisect.bisect_left(bounds, value)] += 1
+            self.sum += sum(values)
+            self.count += len(values)
+
+    # Exporta con buckets acumulados; las latencias en segundos, la unidad habitual en Prometheus
+    def render(self):
+        self.fold()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound * self.scale:g}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum * self.scale:g}")
+        lines.append(f"{self.name}_count {self.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro de métricas; `enabled=False` hace que la instrumentación no envuelva nada
+class Registry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+
+    # Con `read`, el total lo lleva otro objeto y se lee al exportar (sin coste en el camino caliente)
+    def counter(self, name, help, read=None):
+        metric = Counter(name, help) if read is None else Gauge(name, help, read, 'counter')
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help, read):
+        metric = Gauge(name, help, read)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, bounds=LATENCY_BUCKETS_NS, scale=1e-9):
+        metric = Histogram(name, help, bounds, scale)
+        self._metrics.append(metric)
+        return metric
+
+    # Instantánea en formato de texto de Prometheus
+    def render(self):
+        return "".join(metric.render() for metric in self._metrics)
+
+
+# Envuelve un callback para medir cuánto tarda en ejecutarse; el `_count` del histograma son las llamadas
+def instrument(registry, name, callback):
+    if not registry.enabled:
+        return callback
+    duration = registry.histogram(f"gpio_{metric_name(name)}_duration_seconds", f"Tiempo de ejecución de {name}")
+    clock = time.perf_counter_ns
+    pending = duration._pending  # `observe()` en línea: anotar el valor sin otra llamada en Python
+    append = pending.append
+    fold = duration.fold
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            append(clock() - start)
+            if len(pending) >= PENDING_MAX:
+                fold()
+
+    wrapper.__name__ = callback.__name__
+    return wrapper
+
+
+# Lector de eventos instrumentado: envuelve un EventReader o un DebouncedInput
+# Por cada lote solo anota la latencia desde el flanco más antiguo (marca de tiempo del kernel) hasta que el
+# lote se entrega. Eventos, despertares, descartes y rebotes ya los cuentan el lector y el debounce: se leen
+# al exportar. El tamaño medio del lote es events_total / wakeups_total
+class InstrumentedReader:
+    def __init__(self, reader, registry, name='button'):
+        self._reader = reader
+        self.enabled = registry.enabled
+        prefix = f"gpio_{metric_name(name)}"
+        inner = getattr(reader, 'reader', reader)  # El EventReader que cuenta eventos, despertares y descartes
+        suppressed = lambda: getattr(reader, 'suppressed', 0)  # Rebotes descartados por el debounce, si lo hay
+        registry.counter(f"{prefix}_events_total", "Flancos entregados", lambda: inner.events - suppressed())
+        registry.counter(f"{prefix}_wakeups_total", "Despertares con al menos un flanco", lambda: inner.wakeups)
+        registry.counter(f"{prefix}_dropped_total", "Flancos descartados por cola llena", lambda: inner.dropped)
+        registry.counter(f"{prefix}_debounce_rejected_total", "Rebotes descartados", suppressed)
+        self.latency = registry.histogram(f"{prefix}_wake_latency_seconds",
+                                          "Latencia desde el flanco hasta la entrega del lote")
+        self._pending = self.latency._pending  # `observe()` en línea en `read_batch`
+
+    # Los demás atributos (fileno, release, stats, suppressed...) se delegan en el lector envuelto
+    def __getattr__(self, name):
+        return getattr(self._reader, name)
+
+    def wait(self, timeout=None):
+        return self._reader.wait(timeout)
+
+    def read_batch(self):
+        batch = self._reader.read_batch()
+        if batch and self.enabled:
+            pending = self._pending
+            pending.append(_monotonic_ns() - batch[0][2])
+            if len(pending) >= PENDING_MAX:
+                self.latency.fold()
+        return batch
+
+
+# Exporta las métricas por HTTP (GET de cualquier ruta) en un hilo aparte; devuelve el servidor
+def serve_http(registry, port=9100, host='127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # Sin escrituras a stderr por cada consulta
+            pass
+
+    server = HTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Exporta las métricas por un socket Unix: cada conexión recibe una instantánea y se cierra
+def serve_unix(registry, path):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.wfile.write(registry.render().encode())
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socketserver.UnixStreamServer(path, Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,100 @@
+import heapq  # Importa heapq para mantener los vencimientos ordenados en un montículo
+import itertools  # Importa itertools para desempatar vencimientos iguales por orden de llegada
+import time  # Importa time para usar el reloj monotónico
+
+
+# Estado de la salida de una línea: secuencia de pasos (valor, duración) y repeticiones pendientes
+class _OutputState:
+    def __init__(self, line, steps, repeat, generation):
+        self.line = line  # Línea GPIO de salida (objeto con `set_value(valor)`)
+        self.steps = steps  # Lista de pasos (valor, duración en segundos)
+        self.repeat = repeat  # Ciclos restantes; None = indefinidamente
+        self.index = 0  # Paso actual dentro de la secuencia
+        self.generation = generation  # Identificador único del patrón; invalida vencimientos de patrones sustituidos
+
+
+# Clase que programa las salidas (parpadeos, ciclos de trabajo y pulsos) sobre un montículo de vencimientos
+# En POO, esta clase separa el tiempo de las salidas del bucle de eventos: el bucle espera la entrada
+# con `timeout()` como límite y llama a `run_due()` al despertar, sin ningún `time.sleep()`.
+# Cada vencimiento se calcula a partir del anterior (tiempo absoluto), así que el error no se acumula
+class OutputScheduler:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock  # Reloj monotónico usado para todos los vencimientos
+        self._heap = []  # Montículo de (vencimiento, orden, clave de línea, generación)
+        self._states = {}  # Estado de salida por línea
+        self._order = itertools.count()  # Contador para desempatar vencimientos iguales
+        self._generations = itertools.count()  # Contador de patrones, nunca repite identificador
+
+    # Programa una secuencia de pasos (valor, duración) en `line`, repetida `repeat` veces (None = siempre)
+    # Sustituye cualquier patrón que la línea tuviera antes. Un ciclo debe durar más de 0 s: si no,
+    # `run_due()` nunca alcanzaría el reloj y bloquearía el bucle de eventos
+    def pattern(self, line, steps, repeat=None):
+        steps = list(steps)
+        if not steps or any(duration < 0 for _, duration in steps) or sum(duration for _, duration in steps) <= 0:
+            raise ValueError("pattern steps must have non-negative durations and a positive total duration")
+        key = id(line)
+        state = _OutputState(line, steps, repeat, next(self._generations))
+        self._states[key] = state
+        now = self.clock()
+        value, duration = state.steps[0]
+        line.set_value(value)  # El primer paso se aplica inmediatamente
+        heapq.heappush(self._heap, (now + duration, next(self._order), key, state.generation))
+
+    # Parpadeo: `on_time` encendido y `off_time` apagado, `count` veces (None = indefinidamente)
+    def blink(self, line, on_time, off_time, count=None):
+        self.pattern(line, [(1, on_time), (0, off_time)], count)
+
+    # Salida tipo PWM de baja frecuencia: periodo en segundos y ciclo de trabajo entre 0 y 1
+    def duty(self, line, period, duty_cycle):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        if duty_cycle <= 0:
+            self.stop(line, 0)
+        elif duty_cycle >= 1:
+            self.stop(line, 1)
+        else:
+            self.blink(line, period * duty_cycle, period * (1 - duty_cycle))
+
+    # Pulso único: pone `value` durante `width` segundos y después el valor contrario
+    def pulse(self, line, width, value=1):
+        self.pattern(line, [(value, width), (1 - value, 0)], 1)
+
+    # Cancela el patrón de la línea y deja la salida fija en `value`
+    def stop(self, line, value=0):
+        self._states.pop(id(line), None)  # Los vencimientos pendientes se descartan al no tener estado
+        line.set_value(value)
+
+    # Segundos hasta el próximo vencimiento (0 si ya venció), o None si no hay salidas programadas
+    # Se usa como timeout de la espera de eventos para que la entrada y las salidas compartan un bucle
+    def timeout(self):
+        heap = self._heap
+        while heap:
+            deadline, _, key, generation = heap[0]
+            state = self._states.get(key)
+            if state is None or state.generation != generation:  # Vencimiento de un patrón sustituido
+                heapq.heappop(heap)
+                continue
+            return max(0.0, deadline - self.clock())
+        return None
+
+    # Ejecuta todos los pasos cuyo vencimiento ya pasó y programa los siguientes
+    def run_due(self):
+        heap = self._heap
+        now = self.clock()
+        while heap and heap[0][0] <= now:
+            deadline, _, key, generation = heapq.heappop(heap)
+            state = self._states.get(key)
+            if state is None or state.generation != generation:
+                continue
+            state.index += 1
+            if state.index == len(state.steps):  # Fin de un ciclo del patrón
+                state.index = 0
+                if state.repeat is not None:
+                    state.repeat -= 1
+                    if state.repeat <= 0:
+                        del self._states[key]
+                        continue
+            value, duration = state.steps[state.index]
+            state.line.set_value(value)
+            # El siguiente vencimiento parte del anterior, no de `now`, para que no haya deriva
+            heapq.heappush(heap, (deadline + duration, next(self._order), key, generation))
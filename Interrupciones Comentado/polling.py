@@ -0,0 +1,90 @@
+import time  # Importa time para el reloj monotónico, las esperas y el tiempo de CPU
+
+
+# Clase que muestrea una línea sin interrupciones a una frecuencia objetivo
+# En POO, esta clase encapsula el bucle de polling: cada muestra tiene un vencimiento absoluto
+# (inicio + n * periodo), así que el retardo de una iteración no se arrastra a las siguientes.
+# Si la línea no cambia durante `idle_after` segundos el periodo se duplica hasta `min_rate_hz`,
+# y vuelve a la frecuencia objetivo en cuanto hay un cambio. Solo se avisa cuando el valor cambia: la
+# primera lectura solo fija el valor de partida, sin avisar
+class AdaptivePoller:
+    def __init__(self, read, on_change, rate_hz=100.0, min_rate_hz=10.0, idle_after=1.0):
+        self.read = read  # Función que devuelve el valor actual de la línea (por ejemplo `line.get_value`)
+        self.on_change = on_change  # Callback on_change(valor, marca_ns) llamado solo en los cambios
+        self.base_period = 1.0 / rate_hz  # Periodo objetivo cuando la línea está activa
+        self.max_period = 1.0 / min_rate_hz  # Periodo máximo al que se retrocede en reposo
+        self.idle_after = idle_after  # Segundos sin cambios antes de empezar a retroceder
+        self.period = self.base_period  # Periodo actual
+        self.value = None  # Último valor leído (None hasta la lectura inicial de `run()`)
+        self.samples = 0  # Número de muestras tomadas
+        self.changes = 0  # Número de cambios notificados
+        self.overruns = 0  # Vencimientos perdidos porque el bucle llegó tarde
+        self._lateness_sum = 0.0  # Suma del retraso de cada despertar respecto a su vencimiento
+        self._lateness_max = 0.0  # Mayor retraso observado
+        self._running = False
+        self._start = None  # Instante de inicio (monotónico) y tiempo de CPU inicial
+        self._cpu_start = None
+
+    # Detiene el bucle al terminar la muestra en curso (por ejemplo desde un manejador de señales)
+    def stop(self):
+        self._running = False
+
+    # Bucle de muestreo; si se indica `duration` (segundos) termina al cumplirse
+    def run(self, duration=None):
+        clock = time.monotonic
+        read = self.read
+        self._running = True
+        self._start = clock()
+        self._cpu_start = time.process_time()
+        end = None if duration is None else self._start + duration
+        deadline = self._start
+        last_change = self._start
+        if self.value is None:  # Valor de partida: el estado inicial de la línea no es un cambio
+            self.value = read()
+            self.samples += 1
+            deadline += self.period
+        while self._running:
+            now = clock()
+            if deadline > now:
+                time.sleep(deadline - now)  # Espera hasta el vencimiento absoluto
+                now = clock()
+            lateness = now - deadline
+            self._lateness_sum += lateness
+            if lateness > self._lateness_max:
+                self._lateness_max = lateness
+
+            value = read()
+            self.samples += 1
+            if value != self.value:
+                self.value = value
+                self.changes += 1
+                last_change = now
+                self.period = self.base_period  # Actividad: vuelve a la frecuencia objetivo
+                self.on_change(value, time.monotonic_ns())
+            elif now - last_change > self.idle_after and self.period < self.max_period:
+                self.period = min(self.period * 2, self.max_period)  # Reposo: retrocede
+
+            deadline += self.period
+            if deadline < now:  # Se perdieron vencimientos; se salta al siguiente sin recuperar
+                missed = int((now - deadline) / self.period) + 1
+                self.overruns += missed
+                deadline += missed * self.period
+            if end is not None and now >= end:
+                break
+        self._running = False
+
+    # Estadísticas para comparar el polling con los ejemplos por eventos
+    def stats(self):
+        elapsed = time.monotonic() - self._start if self._start is not None else 0.0
+        cpu = time.process_time() - self._cpu_start if self._cpu_start is not None else 0.0
+        samples = self.samples or 1
+        return {
+            'samples': self.samples,
+            'changes': self.changes,
+            'rate_hz': self.samples / elapsed if elapsed else 0.0,
+            'jitter_mean_us': self._lateness_sum / samples * 1e6,
+            'jitter_max_us': self._lateness_max * 1e6,
+            'overruns': self.overruns,
+            'cpu_s': cpu,
+            'cpu_per_sample_us': cpu / samples * 1e6,
+        }
@@ -0,0 +1,195 @@
+import time  # Importa time para descartar la velocidad cuando el encoder lleva tiempo parado
+from collections import deque  # Cola de muestras (marca de tiempo, cuenta) para estimar la velocidad
+
+from line_group import INPUT, LineGroup  # Grupo de líneas pedido en una sola petición
+
+NS_PER_S = 1000000000  # Nanosegundos por segundo
+VELOCITY_WINDOW = 0.1  # Segundos de historia usados para estimar la velocidad
+# Cola de eventos de la petición de A y B con libgpiod v2: la máxima del kernel (16 por línea hasta 64 líneas),
+# para absorber ráfagas de flancos mientras el proceso no lee; con v1 la cola es de 16 por línea
+EVENT_BUFFER_SIZE = 1024
+
+# Tabla de transiciones de cuadratura indexada por (estado anterior << 2) | estado nuevo, con estado = A << 1 | B
+# +1 si A adelanta a B (00 -> 10 -> 11 -> 01 -> 00), -1 en sentido contrario y 0 si no hay cambio o cambian
+# las dos líneas a la vez (transición imposible: se perdió al menos un flanco)
+QUADRATURE_TABLE = (0, -1, +1, 0,
+                    +1, 0, 0, -1,
+                    -1, 0, 0, +1,
+                    0, +1, -1, 0)
+
+
+# Construye las tablas por evento: cada flanco (línea A o B, subida o bajada) sobre cada estado da el estado
+# nuevo y el paso de la tabla de cuadratura; así el bucle caliente son dos accesos a lista por flanco.
+# Código del flanco: 0 = A sube, 1 = A baja, 2 = B sube, 3 = B baja
+def _event_tables():
+    next_state = [0] * 16
+    steps = [0] * 16
+    for state in range(4):
+        for code in range(4):
+            bit = 2 if code < 2 else 1
+            new = (state | bit) if code % 2 == 0 else (state & ~bit)
+            next_state[state << 2 | code] = new
+            steps[state << 2 | code] = QUADRATURE_TABLE[state << 2 | new]
+    return next_state, steps
+
+
+NEXT_STATE, STEPS = _event_tables()
+
+
+# Estimación de la tasa de cambio de un contador a partir de las marcas de tiempo del kernel
+# Guarda una muestra por lote y calcula la pendiente entre la más antigua y la más reciente de la ventana
+class _RateEstimator:
+    def __init__(self, window):
+        self.window_ns = int(window * NS_PER_S)
+        self._samples = deque()
+
+    def add(self, timestamp_ns, value):
+        samples = self._samples
+        samples.append((timestamp_ns, value))
+        limit = timestamp_ns - self.window_ns
+        while len(samples) > 2 and samples[1][0] <= limit:
+            samples.popleft()
+
+    # Unidades por segundo; 0 si no hay flancos en la última ventana
+    def rate(self):
+        samples = self._samples
+        if len(samples) < 2 or time.monotonic_ns() - samples[-1][0] > self.window_ns:
+            return 0.0
+        (first_ns, first), (last_ns, last) = samples[0], samples[-1]
+        return (last - first) * NS_PER_S / (last_ns - first_ns) if last_ns > first_ns else 0.0
+
+
+# Decodificador de cuadratura sin E/S: mantiene el estado (A << 1 | B), la posición y los errores a partir
+# de lotes de `EdgeEvent`, con tablas precalculadas (decodificación x4: una cuenta por flanco).
+# Sirve igual para flancos leídos del kernel que para una grabación reproducida con `edge_recorder.replay()`
+class QuadratureDecoder:
+    def __init__(self, a, state=0, velocity_window=VELOCITY_WINDOW):
+        self.a = a  # Offset de la línea A; cualquier otro offset se trata como la línea B
+        self.state = state  # Estado actual (A << 1 | B)
+        self.position = 0  # Cuentas acumuladas (4 por ciclo completo de cuadratura)
+        self.errors = 0  # Flancos que no corresponden a una transición válida
+        self._velocity = _RateEstimator(velocity_window)
+
+    # Decodifica un lote de `EdgeEvent` de las líneas A y B, en orden
+    def process(self, batch):
+        if not batch:
+            return
+        next_state, steps = NEXT_STATE, STEPS  # Referencias locales para acelerar el bucle caliente
+        a = self.a
+        state = self.state
+        position = self.position
+        errors = 0
+        for line, edge, _ in batch:
+            index = state << 2 | (0 if line == a else 2) | (edge - 1)
+            step = steps[index]
+            if step:
+                position += step
+            else:  # El estado no cambia: falta el flanco contrario de esa línea
+                errors += 1
+            state = next_state[index]
+        self.state = state
+        self.position = position
+        self.errors += errors
+        self._velocity.add(batch[-1].timestamp_ns, position)
+
+    # Velocidad en cuentas por segundo (negativa en sentido contrario)
+    @property
+    def velocity(self):
+        return self._velocity.rate()
+
+
+# Clase que decodifica un encoder de cuadratura a partir de los flancos de sus dos líneas
+# En POO, esta clase añade las líneas al decodificador: pide A y B en un grupo con detección de ambos
+# flancos, lee el estado inicial una vez y después lo mantiene solo con el tipo de cada flanco, sin
+# volver a leer las líneas. Cada despertar vacía la cola del kernel y decodifica el lote completo
+class QuadratureEncoder(QuadratureDecoder):
+    def __init__(self, chip, a, b, consumer='Encoder', velocity_window=VELOCITY_WINDOW,
+                 event_buffer_size=EVENT_BUFFER_SIZE):
+        self.group = LineGroup(chip, [a, b], INPUT, edge='both', consumer=consumer,
+                               event_buffer_size=event_buffer_size)
+        self.reader = self.group.reader  # Lector que vacía la cola de eventos del kernel en cada despertar
+        value_a, value_b = self.group.get_values()
+        super().__init__(a, value_a << 1 | value_b, velocity_window)
+        self.b = b  # Offset de la línea B
+
+    # Devuelve el descriptor del grupo, para registrarlo en otros bucles de eventos
+    def fileno(self):
+        return self.group.fileno()
+
+    # Espera flancos en A o B (segundos, None = sin límite)
+    def wait(self, timeout=None):
+        return self.group.wait(timeout)
+
+    # Lee los flancos pendientes sin decodificarlos (para envolver el encoder en otros lectores)
+    def read_batch(self):
+        return self.group.read_batch()
+
+    # Espera hasta `timeout`, vacía la cola y decodifica; devuelve el número de flancos procesados
+    def update(self, timeout=0):
+        if not self.group.wait(timeout):
+            return 0
+        batch = self.group.read_batch()
+        self.process(batch)
+        return len(batch)
+
+    def stats(self):
+        return {
+            'position': self.position,
+            'velocity': self.velocity,
+            'errors': self.errors,
+            'events': self.reader.events,
+            'wakeups': self.reader.wakeups,
+            'dropped': self.reader.dropped,
+        }
+
+    # Libera las dos líneas, como un destructor en POO
+    def release(self):
+        self.group.release()
+
+
+# Clase que cuenta pulsos de una línea (caudalímetros, tacómetros) y estima su frecuencia
+# Cada despertar suma el tamaño del lote, sin recorrerlo
+class PulseCounter:
+    def __init__(self, chip, offset, edge='rising', consumer='Counter', rate_window=VELOCITY_WINDOW):
+        self.offset = offset  # Offset de la línea
+        self.group = LineGroup(chip, [offset], INPUT, edge=edge, consumer=consumer)
+        self.reader = self.group.reader  # Lector que vacía la cola de eventos del kernel en cada despertar
+        self.count = 0  # Pulsos contados
+        self._rate = _RateEstimator(rate_window)
+
+    def process(self, batch):
+        if batch:
+            self.count += len(batch)
+            self._rate.add(batch[-1].timestamp_ns, self.count)
+
+    def fileno(self):
+        return self.group.fileno()
+
+    def wait(self, timeout=None):
+        return self.group.wait(timeout)
+
+    def read_batch(self):
+        return self.group.read_batch()
+
+    def update(self, timeout=0):
+        if not self.group.wait(timeout):
+            return 0
+        batch = self.group.read_batch()
+        self.process(batch)
+        return len(batch)
+
+    # Frecuencia en pulsos por segundo
+    @property
+    def frequency(self):
+        return self._rate.rate()
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'frequency': self.frequency,
+            'wakeups': self.reader.wakeups,
+            'dropped': self.reader.dropped,
+        }
+
+    def release(self):
+        self.group.release()